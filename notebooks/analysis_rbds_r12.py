@@ -711,34 +711,53 @@ def _(
 
 
 @app.cell
-def _(C, K, M, sp):
-    M_inv = M.inv()
-    λ = sp.Symbol('λ')
-    A = sp.Matrix([[0, 0, 0, 0, 1, 0, 0, 0], [0, 0, 0, 0, 0, 1, 0, 0], [0, 0, 0, 0, 0, 0, 1, 0], [0, 0, 0, 0, 0, 0, 0, 1], [-M_inv * K, -M_inv * C]])
-    pol_caract = A.charpoly(λ).as_expr()
-    raizes = A.eigenvals()
-    poly = sp.Poly(sp.expand(pol_caract), λ)
-    coeffs = [sp.N(c, 6) for c in poly.all_coeffs()]
-    grau = poly.degree()
+def _(
+    c1_otim,
+    c2_otim,
+    c4_otim,
+    k1_otim,
+    k2_otim,
+    k3_otim,
+    k4_otim,
+    k5_otim,
+    m1,
+    m2,
+    m3,
+    m4,
+    np,
+):
+    # Autovalores numéricos de λ²M + λC + K = 0 pela análise modal do pacote
+    # (o polinômio e as raízes simbólicas do SymPy levavam segundos); o
+    # critério de estabilidade tolera o modo de corpo rígido (raiz dupla em 0)
+    from projeto_pesquisa_ebm.modal import modal_analysis as _modal_analysis
+    from projeto_pesquisa_ebm.modal import model_matrices as _model_matrices
+
+    _params = dict(k1=k1_otim, k2=k2_otim, k3=k3_otim, k4=k4_otim, k5=k5_otim,
+                   c1=c1_otim, c2=c2_otim, c4=c4_otim)
+    _modal = _modal_analysis(*_model_matrices(_params, (m1, m2, m3, m4)))
+    raizes = _modal['eigenvalues'][0]
+    # np.poly só para exibir o polinômio característico
+    coeffs = np.poly(raizes).real
+    grau = len(coeffs) - 1
     termos = []
     for _i, coef in enumerate(coeffs):
         exp = grau - _i
         if exp > 1:
-            termos.append(f'{coef}*λ^{exp}')
+            termos.append(f'{coef:.6g}*λ^{exp}')
         elif exp == 1:
-            termos.append(f'{coef}*λ')
+            termos.append(f'{coef:.6g}*λ')
         else:
-            termos.append(f'{coef}')
+            termos.append(f'{coef:.6g}')
     poly_str = ' + '.join(termos)
     # Plotagem do polinômio e raízes:
     print('Polinômio característico:\n')
     print(f'P(λ) = {poly_str}')
     print('\nRaízes:')
     for r in raizes:
-        real = sp.re(r)
-        imag = sp.im(r)
-        sgn = '+' if imag >= 0 else '-'
-        print(f'λ = {real:.8f} {sgn} {abs(imag):.4f}*j')
+        sgn = '+' if r.imag >= 0 else '-'
+        print(f'λ = {r.real:.8f} {sgn} {abs(r.imag):.4f}*j')
+    print(f"\nSistema {'estável' if _modal['stable'][0] else 'instável'} "
+          f"(maior parte real: {_modal['max_real'][0]:.3g})")
     return
 
 
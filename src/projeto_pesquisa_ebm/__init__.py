@@ -13,9 +13,13 @@ from .utils import (
     calculate_acceleration,
     normalize_grf,
     get_data_path,
+    load_subject_info,
+    subject_metadata,
 )
 
-from .models import MassSpringDamperModel
+from .models import MassSpringDamperModel, LiuNigg4MassModel
+from .trial import Trial
+from .experiment import PreparedExperiment
 
 __all__ = [
     "load_markers_data",
@@ -25,6 +29,11 @@ __all__ = [
     "calculate_acceleration",
     "normalize_grf",
     "get_data_path",
+    "load_subject_info",
+    "subject_metadata",
     "MassSpringDamperModel",
+    "LiuNigg4MassModel",
+    "Trial",
+    "PreparedExperiment",
 ]
 
@@ -0,0 +1,202 @@
+"""
+Experimento preparado: referências e MGRF já reamostradas na grade de simulação
+
+Simular e avaliar muitos ganhos (por exemplo em um estudo do Optuna) sobre
+o mesmo ensaio não exige reinterpolar as referências a cada avaliação:
+tudo o que não depende dos ganhos é calculado uma única vez aqui.
+"""
+
+import numpy as np
+
+from .integrators import grid_step
+
+
+class PreparedExperiment:
+    """
+    Referências de posição e MGRF de um ensaio na grade de simulação
+
+    A grade tem ``oversample`` passos por amostra dos marcadores (o notebook
+    usa Euler com ``dt_d/100``, ou seja, oversample=100). As referências são
+    interpoladas linearmente uma única vez; as entradas do sistema em malha
+    fechada são montadas na primeira simulação e reaproveitadas.
+    """
+
+    def __init__(self, time, p_ref, MGRF=None, oversample=1, v_ref=None):
+        """
+        Reamostra as referências na grade de simulação
+
+        Parameters
+        ----------
+        time : np.ndarray
+            Vetor de tempo dos marcadores (s)
+        p_ref : np.ndarray
+            Posições de referência (n, 4) na convenção do modelo
+        MGRF : np.ndarray or None
+            Força de reação do solo no tempo dos marcadores (N)
+        oversample : int
+            Passos de simulação por amostra dos marcadores
+        v_ref : np.ndarray or None
+            Velocidades de referência (n, 4), usadas como condição inicial
+            dos segmentos em ``simulate_segments``
+        """
+        self.data_time = np.asarray(time, dtype=float)
+        self.oversample = int(oversample)
+        if self.oversample > 1:
+            dt = grid_step(self.data_time) / self.oversample
+            n = (len(self.data_time) - 1) * self.oversample + 1
+            self.time = self.data_time[0] + np.arange(n) * dt
+        else:
+            self.time = self.data_time
+        self.p_ref = self._resample(p_ref)
+        self.v_ref = None if v_ref is None else self._resample(v_ref)
+        self.MGRF = None if MGRF is None else self._resample(MGRF)
+        self.dt = grid_step(self.time)
+        self._inputs = None
+
+    def _resample(self, x):
+        x = np.asarray(x, dtype=float)
+        if self.oversample == 1:
+            return np.ascontiguousarray(x)
+        columns = x.reshape(len(x), -1)
+        out = np.empty((len(self.time), columns.shape[1]))
+        for j in range(columns.shape[1]):
+            out[:, j] = np.interp(self.time, self.data_time, columns[:, j])
+        return out.reshape((len(self.time),) + x.shape[1:])
+
+    @classmethod
+    def from_kinematics(cls, kin, MGRF=None, oversample=1):
+        """
+        Monta o experimento a partir da cinemática dos marcadores
+
+        As referências seguem a convenção do modelo (positivo = para baixo,
+        origem na posição média de p1): p_ref_j = mean(p1) - p_j e, se a
+        cinemática tiver v1..v4, v_ref_j = -v_j.
+
+        Parameters
+        ----------
+        kin : dict
+            Cinemática com time, p1..p4 (m, eixo vertical para cima) e,
+            opcionalmente, v1..v4 (m/s)
+        MGRF : np.ndarray or None
+            Força de reação do solo no tempo dos marcadores (N)
+        oversample : int
+            Passos de simulação por amostra dos marcadores
+
+        Returns
+        -------
+        PreparedExperiment
+        """
+        p_ref = np.mean(kin['p1']) - np.column_stack([kin[f'p{j}'] for j in range(1, 5)])
+        v_ref = None
+        if 'v1' in kin:
+            v_ref = -np.column_stack([kin[f'v{j}'] for j in range(1, 5)])
+        return cls(kin['time'], p_ref, MGRF, oversample, v_ref)
+
+    @property
+    def n_steps(self):
+        """Número de instantes da grade de simulação"""
+        return len(self.time)
+
+    def inputs(self, model):
+        """
+        Entradas [p_ref, f, 1] do sistema em malha fechada (calculadas uma vez)
+
+        Parameters
+        ----------
+        model : LiuNigg4MassModel
+            Modelo usado para montar as forças externas
+
+        Returns
+        -------
+        np.ndarray
+            Entradas (n_steps, 9)
+        """
+        if self._inputs is None:
+            self._inputs = model.pi_inputs(self.p_ref, self.MGRF)
+        return self._inputs
+
+    def simulate(self, model, Kp, Ki, method='exact', **options):
+        """
+        Simula o modelo com controladores PI sobre as referências preparadas
+
+        Parameters
+        ----------
+        model : LiuNigg4MassModel
+            Modelo com os parâmetros identificados
+        Kp, Ki : array_like
+            Ganhos proporcionais e integrais (4,)
+        method : str
+            Método de integração
+        **options
+            Repassadas a ``simulate_pi`` (backend, check_every, callback, ...)
+
+        Returns
+        -------
+        dict
+            Resultado de ``LiuNigg4MassModel.simulate_pi``
+        """
+        return model.simulate_pi(self.time, self.p_ref, Kp, Ki, method=method,
+                                 inputs=self.inputs(model), **options)
+
+    def simulate_segments(self, model, Kp, Ki, starts, method='exact', **options):
+        """
+        Simula cada passo separadamente, partindo do estado medido no seu início
+
+        Parameters
+        ----------
+        model : LiuNigg4MassModel
+            Modelo com os parâmetros identificados
+        Kp, Ki : array_like
+            Ganhos proporcionais e integrais (4,)
+        starts : array_like
+            Índices de início dos segmentos nas amostras dos marcadores (por
+            exemplo os contatos iniciais convertidos para 150 Hz)
+        method : str
+            Método de integração
+        **options
+            Repassadas a ``simulate_pi_segments`` (backend, jobs, check_every,
+            limit, ...)
+
+        Returns
+        -------
+        dict
+            Resultado de ``LiuNigg4MassModel.simulate_pi_segments``
+        """
+        starts = np.asarray(starts, dtype=np.intp) * self.oversample
+        return model.simulate_pi_segments(self.time, self.p_ref, Kp, Ki, starts,
+                                          v_ref=self.v_ref, method=method,
+                                          inputs=self.inputs(model), **options)
+
+    def squared_error(self, p_sim, start=0, stop=None):
+        """
+        Soma dos erros quadráticos das posições em um trecho da grade
+
+        Parameters
+        ----------
+        p_sim : np.ndarray
+            Posições simuladas (n, 4), alinhadas com a grade
+        start, stop : int
+            Trecho [start, stop) da grade
+
+        Returns
+        -------
+        float
+        """
+        stop = len(p_sim) if stop is None else stop
+        return float(np.sum((p_sim[start:stop, :4] - self.p_ref[start:stop])**2))
+
+    def score(self, result):
+        """
+        Soma dos MSE de p1..p4 de uma simulação (critério do notebook)
+
+        Parameters
+        ----------
+        result : dict
+            Resultado de ``simulate``
+
+        Returns
+        -------
+        float
+        """
+        p_sim = np.column_stack([result[f'p{j}'] for j in range(1, 5)])
+        return self.squared_error(p_sim) / self.n_steps
@@ -0,0 +1,177 @@
+"""
+Detecção de eventos da marcha (contato inicial e retirada do pé) pela Fy
+
+O contato é detectado com limiar duplo (histerese): começa quando Fy sobe
+acima de ``on_threshold`` e termina quando cai abaixo de ``off_threshold``.
+Entre os dois limiares o estado anterior é mantido, o que evita eventos
+falsos com o ruído da plataforma perto de zero.
+
+A detecção é vetorizada e pode ser feita em blocos (``GaitEventDetector``)
+para gravações de qualquer duração, com o mesmo resultado do processamento
+do sinal inteiro.
+"""
+
+import numpy as np
+
+
+ON_THRESHOLD = 50.0  # N
+OFF_THRESHOLD = 20.0  # N
+
+
+def _contact_state(fy, initial, on_threshold, off_threshold):
+    """Estado de contato (0/1) amostra a amostra, partindo do estado ``initial``"""
+    fy = np.asarray(fy, dtype=float)
+    decisive = np.full(len(fy) + 1, -1, dtype=np.int8)
+    decisive[0] = initial
+    decisive[1:][fy >= on_threshold] = 1
+    decisive[1:][fy <= off_threshold] = 0
+    # Propaga o último valor decisivo (histerese) sem laço em Python
+    idx = np.where(decisive >= 0, np.arange(len(decisive)), 0)
+    np.maximum.accumulate(idx, out=idx)
+    return decisive[idx]
+
+
+class GaitEventDetector:
+    """
+    Detector de contatos em blocos (streaming)
+
+    Cada chamada a ``update`` recebe o próximo bloco de Fy e devolve as
+    fases de apoio completadas nele, com índices relativos ao início da
+    gravação. Apoios que começam em um bloco e terminam em outro são
+    reportados no bloco em que terminam.
+    """
+
+    def __init__(self, on_threshold=ON_THRESHOLD, off_threshold=OFF_THRESHOLD,
+                 min_stance=0):
+        """
+        Inicializa o detector
+
+        Parameters
+        ----------
+        on_threshold : float
+            Fy (N) acima da qual o pé está em contato
+        off_threshold : float
+            Fy (N) abaixo da qual o pé deixou o solo
+        min_stance : int
+            Duração mínima do apoio (amostras); apoios mais curtos são
+            descartados
+        """
+        if off_threshold > on_threshold:
+            raise ValueError("off_threshold deve ser <= on_threshold")
+        self.on_threshold = on_threshold
+        self.off_threshold = off_threshold
+        self.min_stance = int(min_stance)
+        self.reset()
+
+    def reset(self):
+        """Volta ao início da gravação"""
+        self.n_samples = 0
+        self.state = None
+        self.open_strike = None
+
+    def update(self, fy):
+        """
+        Processa o próximo bloco de Fy
+
+        Parameters
+        ----------
+        fy : array_like
+            Bloco da força vertical (N)
+
+        Returns
+        -------
+        tuple
+            (foot_strikes, toe_offs): índices das amostras (int) de início e
+            fim (primeira amostra sem contato) de cada apoio completado
+        """
+        fy = np.asarray(fy, dtype=float)
+        if len(fy) == 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+        if self.state is None:
+            # A gravação pode começar no meio de um apoio: esse apoio não
+            # tem contato inicial e é ignorado
+            self.state = int(fy[0] >= self.on_threshold)
+        state = _contact_state(fy, self.state, self.on_threshold, self.off_threshold)
+        change = np.flatnonzero(np.diff(state)) + self.n_samples
+        rising = state[1:][change - self.n_samples] == 1
+
+        strikes = change[rising]
+        toe_offs = change[~rising]
+        if self.open_strike is not None:
+            strikes = np.concatenate([[self.open_strike], strikes])
+        if len(toe_offs) and (len(strikes) == 0 or toe_offs[0] < strikes[0]):
+            toe_offs = toe_offs[1:]  # fim do apoio em curso no início da gravação
+        n_complete = len(toe_offs)
+        self.open_strike = strikes[n_complete] if len(strikes) > n_complete else None
+        strikes = strikes[:n_complete]
+
+        self.state = int(state[-1])
+        self.n_samples += len(fy)
+        keep = toe_offs - strikes >= self.min_stance
+        return strikes[keep].astype(np.intp), toe_offs[keep].astype(np.intp)
+
+
+def detect_gait_events(fy, rate=None, on_threshold=ON_THRESHOLD,
+                       off_threshold=OFF_THRESHOLD, min_stance=0.0, chunk_size=None):
+    """
+    Contatos iniciais e retiradas do pé a partir da força vertical
+
+    Parameters
+    ----------
+    fy : array_like
+        Força vertical (N), por exemplo ``load_forces_data(...)['Fy']``
+    rate : float or None
+        Taxa de amostragem (Hz); necessária se ``min_stance`` > 0
+    on_threshold : float
+        Fy (N) acima da qual o pé está em contato
+    off_threshold : float
+        Fy (N) abaixo da qual o pé deixou o solo
+    min_stance : float
+        Duração mínima do apoio (s)
+    chunk_size : int or None
+        Processa o sinal em blocos desse tamanho (mesmo resultado, memória
+        limitada); o sinal inteiro de uma vez se None
+
+    Returns
+    -------
+    tuple
+        (foot_strikes, toe_offs): arrays de índices com o mesmo tamanho;
+        só apoios completos (com início e fim dentro da gravação)
+    """
+    if min_stance and rate is None:
+        raise ValueError("rate é necessária para min_stance em segundos")
+    detector = GaitEventDetector(on_threshold, off_threshold,
+                                 int(np.ceil(min_stance * rate)) if min_stance else 0)
+    fy = np.asarray(fy, dtype=float)
+    chunk_size = chunk_size or max(len(fy), 1)
+    strikes, toe_offs = [], []
+    for start in range(0, len(fy), chunk_size):
+        s, t = detector.update(fy[start:start + chunk_size])
+        strikes.append(s)
+        toe_offs.append(t)
+    if not strikes:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    return np.concatenate(strikes), np.concatenate(toe_offs)
+
+
+def stance_windows(foot_strikes, toe_offs, rate, pad=0.0):
+    """
+    Janelas de tempo das fases de apoio
+
+    Parameters
+    ----------
+    foot_strikes, toe_offs : np.ndarray
+        Índices retornados por ``detect_gait_events``
+    rate : float
+        Taxa de amostragem da força (Hz)
+    pad : float
+        Margem (s) adicionada antes e depois de cada apoio
+
+    Returns
+    -------
+    np.ndarray
+        (n_stances, 2) com início e fim (s) de cada apoio
+    """
+    start = np.asarray(foot_strikes) / rate - pad
+    stop = np.asarray(toe_offs) / rate + pad
+    return np.column_stack([np.maximum(start, 0.0), stop])
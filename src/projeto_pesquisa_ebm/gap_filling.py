@@ -0,0 +1,273 @@
+"""
+Preenchimento de lacunas (NaN) nas trajetórias dos marcadores
+
+Marcadores oclusos aparecem como sequências de NaN que se propagam para
+todas as derivadas e ajustes. O preenchimento tem duas etapas:
+
+- Lacunas curtas: spline cúbica pelas amostras válidas; as colunas com o
+  mesmo padrão de lacunas (os 3 eixos de um marcador, marcadores oclusos
+  juntos) são interpoladas em uma única chamada, e a detecção das lacunas
+  é vetorizada para todas as colunas
+- Lacunas longas: reconstrução de corpo rígido a partir dos outros
+  marcadores do mesmo segmento (ajuste de Kabsch quadro a quadro, em lote),
+  combinando as referências antes e depois da lacuna
+
+As estatísticas das lacunas permitem descartar ensaios ruins antes das
+etapas caras (ajuste, otimização dos ganhos).
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.interpolate import CubicSpline
+
+
+MAX_GAP = 0.1  # s, lacunas maiores exigem reconstrução de corpo rígido
+
+# Segmentos do RBDS para a reconstrução de corpo rígido
+RBDS_SEGMENTS = {
+    'pelvis': ('R.ASIS', 'L.ASIS', 'R.PSIS', 'L.PSIS', 'R.Iliac.Crest', 'L.Iliac.Crest'),
+    'R.thigh': ('R.Thigh.Top.Lateral', 'R.Thigh.Bottom.Lateral', 'R.Thigh.Top.Medial',
+                'R.Thigh.Bottom.Medial'),
+    'R.shank': ('R.Shank.Top.Lateral', 'R.Shank.Bottom.Lateral', 'R.Shank.Top.Medial',
+                'R.Shank.Bottom.Medial'),
+    'R.foot': ('R.Heel.Top', 'R.Heel.Bottom', 'R.Heel.Lateral', 'R.MT1', 'R.MT5'),
+    'L.thigh': ('L.Thigh.Top.Lateral', 'L.Thigh.Bottom.Lateral', 'L.Thigh.Top.Medial',
+                'L.Thigh.Bottom.Medial'),
+    'L.shank': ('L.Shank.Top.Lateral', 'L.Shank.Bottom.Lateral', 'L.Shank.Top.Medial',
+                'L.Shank.Bottom.Medial'),
+    'L.foot': ('L.Heel.Top', 'L.Heel.Bottom', 'L.Heel.Lateral', 'L.MT1', 'L.MT5'),
+}
+
+
+def find_gaps(x):
+    """
+    Sequências de NaN em cada coluna
+
+    Parameters
+    ----------
+    x : np.ndarray
+        Sinais (n, ...); as colunas são os demais eixos achatados
+
+    Returns
+    -------
+    tuple
+        (column, start, stop): arrays com a coluna, a primeira amostra
+        ausente e a primeira amostra válida depois de cada lacuna,
+        ordenados por coluna e tempo
+    """
+    return _runs(np.isnan(np.asarray(x, dtype=float)))
+
+
+def _runs(mask):
+    """Sequências de True em cada coluna de ``mask`` (ver ``find_gaps``)"""
+    missing = mask.reshape(len(mask), -1)
+    edges = np.diff(np.pad(missing.T.astype(np.int8), ((0, 0), (1, 1))), axis=1)
+    column, start = np.nonzero(edges == 1)
+    _, stop = np.nonzero(edges == -1)
+    return column, start, stop
+
+
+def _neighbours(valid):
+    """Índices da amostra válida anterior (-1 se não há) e seguinte (n se não há)"""
+    n = len(valid)
+    rows = np.arange(n)[:, None]
+    prev = np.where(valid, rows, -1)
+    np.maximum.accumulate(prev, axis=0, out=prev)
+    following = np.where(valid, rows, n)[::-1]
+    following = np.minimum.accumulate(following, axis=0)[::-1]
+    return prev, following
+
+
+def interpolate_gaps(x, max_gap, method='cubic'):
+    """
+    Preenche as lacunas internas de até ``max_gap`` amostras
+
+    Parameters
+    ----------
+    x : np.ndarray
+        Sinais (n, ...); não é modificado
+    max_gap : int
+        Maior lacuna (amostras) a interpolar
+    method : str
+        'cubic' (spline cúbica) ou 'linear'
+
+    Returns
+    -------
+    np.ndarray
+        Cópia de x com as lacunas curtas preenchidas; lacunas longas e as
+        do início/fim da gravação continuam NaN
+    """
+    if method not in ('cubic', 'linear'):
+        raise ValueError(f"method deve ser 'cubic' ou 'linear', recebido {method!r}")
+    x = np.array(x, dtype=float)
+    flat = x.reshape(len(x), -1)
+    n = len(flat)
+    valid = ~np.isnan(flat)
+    prev, following = _neighbours(valid)
+    fill = ~valid & (prev >= 0) & (following < n) & (following - prev - 1 <= max_gap)
+    i, col = np.nonzero(fill)
+    if len(i) == 0:
+        return x
+    if method == 'linear':
+        a, b = prev[i, col], following[i, col]
+        u = (i - a) / (b - a)
+        flat[i, col] = flat[a, col] + u * (flat[b, col] - flat[a, col])
+        return x
+
+    # Colunas com o mesmo padrão de amostras válidas (por exemplo X, Y e Z de
+    # um marcador) compartilham os nós e são interpoladas por uma única spline
+    groups = {}
+    for c in np.unique(col):
+        groups.setdefault(valid[:, c].tobytes(), []).append(c)
+    for cols in groups.values():
+        knots = np.flatnonzero(valid[:, cols[0]])
+        rows = np.flatnonzero(fill[:, cols[0]])
+        spline = CubicSpline(knots, flat[np.ix_(knots, cols)], axis=0)
+        flat[np.ix_(rows, cols)] = spline(rows)
+    return x
+
+
+def _rigid_transform(reference, frames):
+    """
+    Rotações (k, 3, 3) e centroides (k, 3) levando ``reference`` (d, 3) a
+    cada quadro (k, d, 3)
+    """
+    ref_center = reference.mean(axis=0)
+    centers = frames.mean(axis=1)
+    H = np.einsum('dj,kdl->kjl', reference - ref_center, frames - centers[:, None])
+    U, _, Vt = np.linalg.svd(H)
+    D = np.ones((len(frames), 3))
+    D[:, 2] = np.sign(np.linalg.det(np.matmul(Vt.transpose(0, 2, 1), U.transpose(0, 2, 1))))
+    R = np.matmul(Vt.transpose(0, 2, 1) * D[:, None, :], U.transpose(0, 2, 1))
+    return R, ref_center, centers
+
+
+def rigid_body_fill(markers, marker_names, segments, min_donors=3):
+    """
+    Reconstrói lacunas pelos outros marcadores do mesmo segmento
+
+    Para cada lacuna, os marcadores do segmento visíveis durante toda ela
+    (e nas amostras vizinhas) são os doadores. A posição do marcador em
+    relação aos doadores na amostra anterior e na seguinte à lacuna é
+    transportada quadro a quadro pela transformação rígida de Kabsch, e as
+    duas estimativas são combinadas linearmente ao longo da lacuna.
+
+    Parameters
+    ----------
+    markers : np.ndarray
+        Bloco (n_frames, n_markers, 3); não é modificado
+    marker_names : list of str
+        Nomes dos marcadores
+    segments : dict
+        nome -> marcadores do segmento (ver ``RBDS_SEGMENTS``)
+    min_donors : int
+        Mínimo de doadores para reconstruir (3 definem a orientação)
+
+    Returns
+    -------
+    np.ndarray
+        Cópia de markers com as lacunas reconstruídas onde possível
+    """
+    out = np.array(markers, dtype=float)
+    n = len(out)
+    index = {m: i for i, m in enumerate(marker_names)}
+    missing = np.isnan(out).any(axis=2)
+    columns, starts, stops = _runs(missing)
+    for m, start, stop in zip(columns, starts, stops):
+        a = start - 1 if start > 0 else None
+        b = stop if stop < n else None
+        if a is None and b is None:
+            continue
+        lo, hi = (start if a is None else a), (stop if b is None else b + 1)
+        mates = {index[d] for members in segments.values()
+                 if marker_names[m] in members for d in members if d in index}
+        donors = [d for d in sorted(mates - {m}) if not missing[lo:hi, d].any()]
+        if len(donors) < min_donors:
+            continue
+        frames = out[start:stop][:, donors]
+        estimates = []
+        for ref in (a, b):
+            if ref is None:
+                continue
+            R, ref_center, centers = _rigid_transform(out[ref, donors], frames)
+            estimates.append(np.einsum('kij,j->ki', R, out[ref, m] - ref_center) + centers)
+        if len(estimates) == 2:
+            w = ((np.arange(start, stop) - a) / (b - a))[:, None]
+            out[start:stop, m] = (1 - w) * estimates[0] + w * estimates[1]
+        else:
+            out[start:stop, m] = estimates[0]
+    return out
+
+
+def gap_statistics(markers, rate, marker_names=None):
+    """
+    Estatísticas das lacunas por marcador
+
+    Parameters
+    ----------
+    markers : np.ndarray
+        Bloco (n_frames, n_markers, 3)
+    rate : float
+        Taxa de amostragem (Hz)
+    marker_names : list of str or None
+        Nomes dos marcadores (índice da tabela)
+
+    Returns
+    -------
+    pd.DataFrame
+        Por marcador: n_gaps, missing (quadros), missing_fraction e
+        longest_gap (s)
+    """
+    missing = np.isnan(markers).any(axis=2)
+    n_markers = missing.shape[1]
+    column, start, stop = _runs(missing)
+    n_gaps = np.bincount(column, minlength=n_markers)
+    longest = np.zeros(n_markers)
+    np.maximum.at(longest, column, (stop - start) / rate)
+    if marker_names is None:
+        marker_names = [str(i) for i in range(n_markers)]
+    return pd.DataFrame({'n_gaps': n_gaps, 'missing': missing.sum(axis=0),
+                         'missing_fraction': missing.mean(axis=0), 'longest_gap': longest},
+                        index=pd.Index(list(marker_names), name='marker'))
+
+
+def fill_gaps(markers, rate, marker_names=None, segments=None, max_gap=MAX_GAP,
+              method='cubic'):
+    """
+    Preenche as lacunas de todos os marcadores e relata o que foi feito
+
+    Parameters
+    ----------
+    markers : np.ndarray
+        Bloco (n_frames, n_markers, 3), por exemplo ``Trial.markers``
+    rate : float
+        Taxa de amostragem (Hz)
+    marker_names : list of str or None
+        Nomes dos marcadores; necessários para a reconstrução rígida
+    segments : dict or None
+        Segmentos para as lacunas longas (``RBDS_SEGMENTS`` para o RBDS);
+        sem segmentos só as lacunas curtas são preenchidas
+    max_gap : float
+        Maior lacuna (s) preenchida por interpolação
+    method : str
+        Interpolação das lacunas curtas: 'cubic' ou 'linear'
+
+    Returns
+    -------
+    tuple
+        (marcadores preenchidos, relatório): o relatório é a tabela de
+        ``gap_statistics`` dos dados originais com as colunas
+        interpolated, rigid e remaining (quadros)
+    """
+    markers = np.asarray(markers, dtype=float)
+    report = gap_statistics(markers, rate, marker_names)
+    before = report['missing'].to_numpy()
+    filled = interpolate_gaps(markers, int(np.floor(max_gap * rate + 1e-9)), method)
+    after_interp = np.isnan(filled).any(axis=2).sum(axis=0)
+    if segments and marker_names is not None and after_interp.any():
+        filled = rigid_body_fill(filled, list(marker_names), segments)
+    remaining = np.isnan(filled).any(axis=2).sum(axis=0)
+    report['interpolated'] = before - after_interp
+    report['rigid'] = after_interp - remaining
+    report['remaining'] = remaining
+    return filled, report
@@ -0,0 +1,342 @@
+"""
+Identificação dos parâmetros do modelo de 4 massas de Liu & Nigg (2000)
+
+As equações de movimento (positivo = para baixo, g > 0) são ajustadas
+aos sinais cinemáticos dos marcadores e à MGRF medida:
+
+    m1·a1 = m1·g - MGRF - k1·(p1-p3) - k2·(p1-p2) - c1·(v1-v3) - c2·(v1-v2)
+    m2·a2 = m2·g + k2·(p1-p2) - k3·(p2-p3) + c2·(v1-v2)
+    m3·a3 = m3·g + k1·(p1-p3) + k3·(p2-p3) - (k4+k5)·(p3-p4) + c1·(v1-v3) - c4·(v3-v4)
+    m4·a4 = m4·g + (k4+k5)·(p3-p4) + c4·(v3-v4)
+"""
+
+import numpy as np
+from scipy import sparse
+from scipy.optimize import least_squares, lsq_linear, minimize
+
+
+# Frações da massa corporal de cada segmento (pé, canela, coxa, pelve)
+SEGMENT_MASS_FRACTIONS = (0.0145, 0.0465, 0.1000, 0.1420)
+
+PARAMETER_NAMES = ('k1', 'k2', 'k3', 'k4', 'k5', 'c1', 'c2', 'c4')
+
+# Chutes iniciais e limites usados nos notebooks (analysis_rbds_r12)
+DEFAULT_BOUNDS = {
+    'k1': (4000, 7000), 'k2': (4000, 7000), 'c1': (200, 600), 'c2': (550, 750),
+    'k3': (8000, 12000),
+    'k4': (8000, 12000), 'k5': (16000, 20000), 'c4': (1700, 2100),
+}
+DEFAULT_GUESS = {
+    'k1': 6000, 'k2': 6000, 'c1': 300, 'c2': 650,
+    'k3': 10000,
+    'k4': 10000, 'k5': 18000, 'c4': 1900,
+}
+
+
+def segment_masses(body_mass):
+    """
+    Massas dos quatro segmentos do modelo a partir da massa corporal
+
+    Parameters
+    ----------
+    body_mass : float
+        Massa total do sujeito (kg)
+
+    Returns
+    -------
+    tuple
+        (m1, m2, m3, m4) em kg
+    """
+    return tuple(body_mass * f for f in SEGMENT_MASS_FRACTIONS)
+
+
+def fit_sequential_tnc(kin, MGRF, masses, g=9.81, bounds=None, x0=None):
+    """
+    Ajuste sequencial dos parâmetros, como nos notebooks
+
+    Primeiro k1, k2, c1, c2 (equação da massa 1), depois k3 (massa 2) com
+    k2 e c2 fixos e por fim k4, k5, c4 (massa 3) com k1, k3 e c1 fixos.
+    Cada etapa minimiza a soma dos quadrados dos resíduos com
+    ``scipy.optimize.minimize(method='TNC')``.
+
+    Parameters
+    ----------
+    kin : dict
+        Cinemática com p1..p4, v1..v4, a1..a4 (m, m/s, m/s²)
+    MGRF : np.ndarray
+        Força de reação do solo no tempo dos marcadores (N)
+    masses : tuple
+        (m1, m2, m3, m4) em kg
+    g : float
+        Aceleração da gravidade (m/s², positiva = para baixo)
+    bounds : dict or None
+        Limites por parâmetro; ``DEFAULT_BOUNDS`` se None
+    x0 : dict or None
+        Chutes iniciais por parâmetro; ``DEFAULT_GUESS`` se None
+
+    Returns
+    -------
+    dict
+        Parâmetros k1..k5, c1, c2, c4
+    """
+    bounds = {**DEFAULT_BOUNDS, **(bounds or {})}
+    x0 = {**DEFAULT_GUESS, **(x0 or {})}
+    m1, m2, m3 = masses[:3]
+    p1, p2, p3, p4 = kin['p1'], kin['p2'], kin['p3'], kin['p4']
+    v1, v2, v3, v4 = kin['v1'], kin['v2'], kin['v3'], kin['v4']
+    a1, a2, a3 = kin['a1'], kin['a2'], kin['a3']
+
+    def erro_0(alfa):
+        return np.sum((m1*a1 - (m1*g - MGRF - alfa[0]*(p1 - p3) - alfa[1]*(p1 - p2)
+                                - alfa[2]*(v1 - v3) - alfa[3]*(v1 - v2)))**2)
+
+    names = ('k1', 'k2', 'c1', 'c2')
+    alfa = minimize(erro_0, [x0[n] for n in names], method='TNC',
+                    bounds=[bounds[n] for n in names]).x
+    k1, k2, c1, c2 = alfa
+
+    def erro_1(beta):
+        return np.sum((m2*a2 - (m2*g + k2*(p1 - p2) - beta[0]*(p2 - p3)
+                                + c2*(v1 - v2)))**2)
+
+    k3 = minimize(erro_1, [x0['k3']], method='TNC', bounds=[bounds['k3']]).x[0]
+
+    def erro_2(gama):
+        return np.sum((m3*a3 - (m3*g + k1*(p1 - p3) + k3*(p2 - p3)
+                                - (gama[0] + gama[1])*(p3 - p4) + c1*(v1 - v3)
+                                - gama[2]*(v3 - v4)))**2)
+
+    names = ('k4', 'k5', 'c4')
+    k4, k5, c4 = minimize(erro_2, [x0[n] for n in names], method='TNC',
+                          bounds=[bounds[n] for n in names]).x
+
+    return {'k1': k1, 'k2': k2, 'k3': k3, 'k4': k4, 'k5': k5,
+            'c1': c1, 'c2': c2, 'c4': c4}
+
+
+def equation_regressors(kin, MGRF, masses, g=9.81):
+    """
+    Matrizes de regressores das quatro equações de movimento
+
+    Cada equação é linear nos parâmetros theta = [k1, k2, k3, k4, k5, c1,
+    c2, c4] (ordem de ``PARAMETER_NAMES``), com resíduo r = y - Phi @ theta.
+
+    Parameters
+    ----------
+    kin : dict
+        Cinemática com p1..p4, v1..v4, a1..a4
+    MGRF : np.ndarray
+        Força de reação do solo no tempo dos marcadores (N)
+    masses : tuple
+        (m1, m2, m3, m4) em kg
+    g : float
+        Aceleração da gravidade (m/s², positiva = para baixo)
+
+    Returns
+    -------
+    list of tuple
+        [(Phi_1, y_1), ..., (Phi_4, y_4)] com Phi_e (n, 8) e y_e (n,)
+    """
+    m1, m2, m3, m4 = masses
+    d12 = kin['p1'] - kin['p2']
+    d13 = kin['p1'] - kin['p3']
+    d23 = kin['p2'] - kin['p3']
+    d34 = kin['p3'] - kin['p4']
+    w12 = kin['v1'] - kin['v2']
+    w13 = kin['v1'] - kin['v3']
+    w34 = kin['v3'] - kin['v4']
+    n = len(d12)
+    col = {name: j for j, name in enumerate(PARAMETER_NAMES)}
+
+    def regressor(**columns):
+        Phi = np.zeros((n, len(PARAMETER_NAMES)))
+        for name, values in columns.items():
+            Phi[:, col[name]] = values
+        return Phi
+
+    return [
+        (regressor(k1=-d13, k2=-d12, c1=-w13, c2=-w12),
+         m1*kin['a1'] - m1*g + MGRF),
+        (regressor(k2=d12, k3=-d23, c2=w12),
+         m2*kin['a2'] - m2*g),
+        (regressor(k1=d13, k3=d23, k4=-d34, k5=-d34, c1=w13, c4=-w34),
+         m3*kin['a3'] - m3*g),
+        (regressor(k4=d34, k5=d34, c4=w34),
+         m4*kin['a4'] - m4*g),
+    ]
+
+
+def bounded_lstsq(A, y, lb, ub):
+    """
+    Mínimos quadrados lineares com limites: min ||y - A x||² com lb <= x <= ub
+
+    O problema é primeiro reduzido pela fatoração QR (A = Q R) e o
+    problema pequeno min ||Q^T y - R x||² é resolvido com
+    ``scipy.optimize.lsq_linear`` (BVLS), sem avaliações repetidas da
+    função objetivo sobre todas as amostras.
+
+    Parameters
+    ----------
+    A : np.ndarray
+        Matriz de regressores (n, p)
+    y : np.ndarray
+        Observações (n,)
+    lb, ub : array_like
+        Limites inferior e superior (p,)
+
+    Returns
+    -------
+    dict
+        x (p,), sse (soma dos quadrados dos resíduos), residuals (n,),
+        covariance (p, p) = s² (A^T A)^+ e dof (graus de liberdade)
+    """
+    Q, R = np.linalg.qr(A)
+    Qty = Q.T @ y
+    sol = lsq_linear(R, Qty, bounds=(lb, ub), method='bvls')
+    x = sol.x
+    residuals = y - A @ x
+    sse = float(residuals @ residuals)
+    dof = max(A.shape[0] - A.shape[1], 1)
+    # pinv: colunas idênticas (k4 e k5 só aparecem somados) tornam A^T A singular
+    covariance = sse / dof * np.linalg.pinv(R.T @ R)
+    return {'x': x, 'sse': sse, 'residuals': residuals, 'covariance': covariance,
+            'dof': dof}
+
+
+def fit_sequential_lsq(kin, MGRF, masses, g=9.81, bounds=None, full_output=False):
+    """
+    Ajuste sequencial por mínimos quadrados lineares com limites
+
+    Resolve as mesmas três etapas de ``fit_sequential_tnc`` (equação 1
+    para k1, k2, c1, c2; equação 2 para k3; equação 3 para k4, k5, c4),
+    mas diretamente, já que os resíduos são lineares nos parâmetros.
+
+    Parameters
+    ----------
+    kin : dict
+        Cinemática com p1..p4, v1..v4, a1..a4
+    MGRF : np.ndarray
+        Força de reação do solo no tempo dos marcadores (N)
+    masses : tuple
+        (m1, m2, m3, m4) em kg
+    g : float
+        Aceleração da gravidade (m/s², positiva = para baixo)
+    bounds : dict or None
+        Limites por parâmetro; ``DEFAULT_BOUNDS`` se None
+    full_output : bool
+        Se True, retorna também os resíduos e covariâncias de cada etapa
+
+    Returns
+    -------
+    dict or tuple
+        Parâmetros k1..k5, c1, c2, c4; com full_output, (params, stages),
+        onde stages é uma lista com names, sse, residuals (n,), covariance
+        e dof por etapa
+    """
+    bounds = {**DEFAULT_BOUNDS, **(bounds or {})}
+    regressors = equation_regressors(kin, MGRF, masses, g)
+    col = {name: j for j, name in enumerate(PARAMETER_NAMES)}
+    params = {}
+    stages = []
+    for eq, names in ((0, ('k1', 'k2', 'c1', 'c2')), (1, ('k3',)), (2, ('k4', 'k5', 'c4'))):
+        Phi, y = regressors[eq]
+        # Parâmetros já ajustados nas etapas anteriores passam para o lado de y
+        fixed = [n for n in params if np.any(Phi[:, col[n]])]
+        if fixed:
+            y = y - Phi[:, [col[n] for n in fixed]] @ np.array([params[n] for n in fixed])
+        A = Phi[:, [col[n] for n in names]]
+        lb, ub = np.array([bounds[n] for n in names], dtype=float).T
+        sol = bounded_lstsq(A, y, lb, ub)
+        params.update(zip(names, sol['x']))
+        stages.append({'names': names, 'sse': sol['sse'], 'residuals': sol['residuals'],
+                       'covariance': sol['covariance'], 'dof': sol['dof']})
+    params = {n: float(params[n]) for n in PARAMETER_NAMES}
+    return (params, stages) if full_output else params
+
+
+def joint_jacobian(kin, MGRF, masses, g=9.81):
+    """
+    Jacobiano esparso das quatro equações empilhadas
+
+    Como os resíduos são lineares, o Jacobiano d r / d theta = -Phi é
+    constante: cada equação só depende de 3 a 6 dos 8 parâmetros.
+
+    Parameters
+    ----------
+    kin : dict
+        Cinemática com p1..p4, v1..v4, a1..a4
+    MGRF : np.ndarray
+        Força de reação do solo no tempo dos marcadores (N)
+    masses : tuple
+        (m1, m2, m3, m4) em kg
+    g : float
+        Aceleração da gravidade (m/s², positiva = para baixo)
+
+    Returns
+    -------
+    tuple
+        (J, y): J esparso (4n, 8) em formato CSR e y (4n,), com resíduo
+        r = J @ theta + y
+    """
+    regressors = equation_regressors(kin, MGRF, masses, g)
+    J = sparse.csr_matrix(-np.vstack([Phi for Phi, _ in regressors]))
+    y = np.concatenate([y for _, y in regressors])
+    return J, y
+
+
+def fit_joint(kin, MGRF, masses, g=9.81, bounds=None, x0=None, full_output=False):
+    """
+    Ajuste simultâneo dos 8 parâmetros nas quatro equações de movimento
+
+    Ao contrário do ajuste sequencial, nenhum parâmetro é congelado entre
+    etapas: a soma dos quadrados dos resíduos das quatro equações é
+    minimizada de uma vez com ``scipy.optimize.least_squares`` (região de
+    confiança 'trf') e o Jacobiano analítico esparso de ``joint_jacobian``.
+
+    Parameters
+    ----------
+    kin : dict
+        Cinemática com p1..p4, v1..v4, a1..a4
+    MGRF : np.ndarray
+        Força de reação do solo no tempo dos marcadores (N)
+    masses : tuple
+        (m1, m2, m3, m4) em kg
+    g : float
+        Aceleração da gravidade (m/s², positiva = para baixo)
+    bounds : dict or None
+        Limites por parâmetro; ``DEFAULT_BOUNDS`` se None
+    x0 : dict or None
+        Chutes iniciais por parâmetro; ``DEFAULT_GUESS`` se None
+    full_output : bool
+        Se True, retorna também o resultado do otimizador
+
+    Returns
+    -------
+    dict or tuple
+        Parâmetros k1..k5, c1, c2, c4; com full_output, (params, info),
+        onde info tem sse (por equação), covariance (8, 8), nfev e status
+    """
+    bounds = {**DEFAULT_BOUNDS, **(bounds or {})}
+    x0 = {**DEFAULT_GUESS, **(x0 or {})}
+    lb, ub = np.array([bounds[n] for n in PARAMETER_NAMES], dtype=float).T
+    theta0 = np.clip([x0[n] for n in PARAMETER_NAMES], lb, ub)
+    J, y = joint_jacobian(kin, MGRF, masses, g)
+
+    sol = least_squares(lambda theta: J @ theta + y, theta0, jac=lambda theta: J,
+                        bounds=(lb, ub), method='trf', x_scale='jac')
+    params = {n: float(v) for n, v in zip(PARAMETER_NAMES, sol.x)}
+    if not full_output:
+        return params
+
+    residuals = sol.fun.reshape(4, -1)
+    JtJ = (J.T @ J).toarray()
+    dof = max(J.shape[0] - J.shape[1], 1)
+    info = {
+        'sse': (residuals**2).sum(axis=1),
+        # pinv: k4 e k5 só aparecem somados
+        'covariance': 2 * sol.cost / dof * np.linalg.pinv(JtJ),
+        'nfev': sol.nfev,
+        'status': sol.status,
+        'message': sol.message,
+    }
+    return params, info
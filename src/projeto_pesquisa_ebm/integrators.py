@@ -0,0 +1,852 @@
+"""
+Núcleos de integração numérica para os modelos massa-mola-amortecedor
+
+O módulo concentra os laços de integração usados pelos modelos em
+``models.py``. Cada núcleo existe em duas versões: uma compilada com
+numba (quando instalado) e uma vetorizada em NumPy puro.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.integrate import BDF, LSODA, RK45, Radau
+from scipy.linalg import expm
+
+try:
+    import numba
+except ImportError:  # numba é opcional
+    numba = None
+
+
+BACKENDS = ('auto', 'numba', 'numpy', 'python')
+
+
+def has_numba():
+    """
+    Indica se o backend compilado (numba) está disponível
+
+    Returns
+    -------
+    bool
+        True se numba pode ser importado
+    """
+    return numba is not None
+
+
+def resolve_backend(backend):
+    """
+    Resolve o nome do backend de simulação
+
+    Parameters
+    ----------
+    backend : str
+        'auto', 'numba', 'numpy' ou 'python'
+
+    Returns
+    -------
+    str
+        Backend efetivo ('numba', 'numpy' ou 'python')
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"backend deve ser um de {BACKENDS}, recebido {backend!r}")
+    if backend == 'auto':
+        return 'numba' if has_numba() else 'numpy'
+    if backend == 'numba' and not has_numba():
+        raise ImportError("backend='numba' requer o pacote numba instalado")
+    return backend
+
+
+def _euler_msd_loop(out, dt, m1, m2, k1, k2, c, g, l2):
+    """
+    Laço de Euler explícito do modelo de 2 graus de liberdade
+
+    Atualiza ``out`` (n_steps, 4) in-place a partir da linha 0.
+    As constantes são calculadas uma única vez fora do laço.
+    """
+    k1_m1 = k1 / m1
+    k1_m2 = k1 / m2
+    k2_m2 = k2 / m2
+    c_m2 = c / m2
+    x1 = out[0, 0]
+    x2 = out[0, 1]
+    x3 = out[0, 2]
+    x4 = out[0, 3]
+    for i in range(out.shape[0] - 1):
+        a1 = g - k1_m1 * (x1 - x3)
+        a2 = g + k1_m2 * (x1 - x3) - k2_m2 * (x3 - l2) - c_m2 * x4
+        x1, x2, x3, x4 = x1 + x2 * dt, x2 + a1 * dt, x3 + x4 * dt, x4 + a2 * dt
+        out[i + 1, 0] = x1
+        out[i + 1, 1] = x2
+        out[i + 1, 2] = x3
+        out[i + 1, 3] = x4
+    return out
+
+
+if numba is not None:
+    _euler_msd_loop_jit = numba.njit(cache=True)(_euler_msd_loop)
+else:
+    _euler_msd_loop_jit = None
+
+
+def affine_recurrence(Phi, d, z0, n_steps, block=512):
+    """
+    Avalia a recorrência afim z[i+1] = Phi @ z[i] + d de forma vetorizada
+
+    As potências Phi^j (j < block) são calculadas uma vez; cada bloco de
+    ``block`` passos é então obtido com um único produto matricial a partir
+    do último estado do bloco anterior.
+
+    Parameters
+    ----------
+    Phi : np.ndarray
+        Matriz de transição (n, n)
+    d : np.ndarray
+        Termo constante (n,)
+    z0 : np.ndarray
+        Estado inicial (n,)
+    n_steps : int
+        Número de amostras da trajetória (incluindo z0)
+    block : int
+        Tamanho do bloco de passos avaliado de uma vez
+
+    Returns
+    -------
+    np.ndarray
+        Trajetória (n_steps, n)
+    """
+    Phi = np.asarray(Phi, dtype=float)
+    d = np.asarray(d, dtype=float)
+    n = Phi.shape[0]
+    out = np.empty((n_steps, n))
+    if n_steps == 0:
+        return out
+    block = max(1, min(block, n_steps))
+
+    # P[j] = Phi^j e q[j] = sum_{l<j} Phi^l d, para j = 0..block
+    P = np.empty((block + 1, n, n))
+    q = np.empty((block + 1, n))
+    P[0] = np.eye(n)
+    q[0] = 0.0
+    for j in range(block):
+        P[j + 1] = Phi @ P[j]
+        q[j + 1] = Phi @ q[j] + d
+
+    out[0] = z0
+    start = 0
+    while start < n_steps - 1:
+        stop = min(start + block, n_steps - 1)
+        m = stop - start
+        out[start + 1:stop + 1] = P[1:m + 1] @ out[start] + q[1:m + 1]
+        start = stop
+    return out
+
+
+def msd_state_space(m1, m2, k1, k2, c, g, l2=0.0):
+    """
+    Matrizes de estado do modelo MSD de 2 graus de liberdade
+
+    Parameters
+    ----------
+    m1, m2, k1, k2, c, g : float
+        Parâmetros do modelo (ver ``MassSpringDamperModel``)
+    l2 : float
+        Comprimento de repouso da mola inferior
+
+    Returns
+    -------
+    tuple
+        (A, b) tais que dz/dt = A z + b, com z = [x1, x2, x3, x4]
+    """
+    A = np.array([
+        [0.0, 1.0, 0.0, 0.0],
+        [-k1 / m1, 0.0, k1 / m1, 0.0],
+        [0.0, 0.0, 0.0, 1.0],
+        [k1 / m2, 0.0, -(k1 + k2) / m2, -c / m2],
+    ])
+    b = np.array([0.0, g, 0.0, g + k2 / m2 * l2])
+    return A, b
+
+
+def discretize_zoh(A, B, dt):
+    """
+    Discretização exata de dz/dt = A z + B u com segurador de ordem zero
+
+    Usa a exponencial da matriz aumentada [[A, B], [0, 0]] * dt, de modo
+    que z[k+1] = Ad z[k] + Bd u[k] é exato quando u é constante em cada
+    intervalo.
+
+    Parameters
+    ----------
+    A : np.ndarray
+        Matriz de estado (n, n)
+    B : np.ndarray
+        Matriz de entrada (n, m) ou vetor (n,)
+    dt : float
+        Passo de discretização (s)
+
+    Returns
+    -------
+    tuple
+        (Ad, Bd) com formas (n, n) e (n, m) (ou (n,) se B for vetor)
+    """
+    A = np.asarray(A, dtype=float)
+    B = np.asarray(B, dtype=float)
+    vector_input = B.ndim == 1
+    B2 = B[:, None] if vector_input else B
+    n, m = B2.shape
+    aug = np.zeros((n + m, n + m))
+    aug[:n, :n] = A
+    aug[:n, n:] = B2
+    E = expm(aug * dt)
+    Ad = E[:n, :n]
+    Bd = E[:n, n:]
+    return Ad, (Bd[:, 0] if vector_input else Bd)
+
+
+def euler_msd(z0, n_steps, dt, m1, m2, k1, k2, c, g, l2=0.0, backend='auto'):
+    """
+    Integra o modelo MSD de 2 graus de liberdade com Euler explícito
+
+    Parameters
+    ----------
+    z0 : array_like
+        Estado inicial [x1, x2, x3, x4]
+    n_steps : int
+        Número de amostras da trajetória
+    dt : float
+        Passo de tempo (s)
+    m1, m2, k1, k2, c, g : float
+        Parâmetros do modelo (ver ``MassSpringDamperModel``)
+    l2 : float
+        Comprimento de repouso da mola inferior
+    backend : str
+        'auto', 'numba', 'numpy' ou 'python'
+
+    Returns
+    -------
+    np.ndarray
+        Trajetória (n_steps, 4)
+    """
+    backend = resolve_backend(backend)
+    if backend == 'numpy':
+        # Euler explícito é a recorrência afim z[i+1] = (I + dt*A) z[i] + dt*b
+        A, b = msd_state_space(m1, m2, k1, k2, c, g, l2)
+        return affine_recurrence(np.eye(4) + dt * A, dt * b, np.asarray(z0, dtype=float),
+                                 n_steps)
+
+    out = np.zeros((n_steps, 4))
+    if n_steps == 0:
+        return out
+    out[0] = z0
+    loop = _euler_msd_loop_jit if backend == 'numba' else _euler_msd_loop
+    return loop(out, float(dt), float(m1), float(m2), float(k1), float(k2), float(c),
+                float(g), float(l2))
+
+
+def euler_msd_batch(Z0, n_steps, dt, params, g, l2=0.0):
+    """
+    Integra N conjuntos de parâmetros do modelo MSD simultaneamente
+
+    O estado de todos os conjuntos é mantido em um único array (N, 4) e
+    cada passo de Euler é feito com poucas operações vetorizadas.
+
+    Parameters
+    ----------
+    Z0 : np.ndarray
+        Estados iniciais (N, 4) ou (4,) comum a todos os conjuntos
+    n_steps : int
+        Número de amostras da trajetória
+    dt : float
+        Passo de tempo (s)
+    params : np.ndarray
+        Parâmetros (N, 5) com colunas [m1, m2, k1, k2, c]
+    g : float
+        Aceleração da gravidade (m/s²)
+    l2 : float
+        Comprimento de repouso da mola inferior
+
+    Returns
+    -------
+    np.ndarray
+        Trajetórias (n_steps, N, 4)
+    """
+    params = np.atleast_2d(np.asarray(params, dtype=float))
+    if params.ndim != 2 or params.shape[1] != 5:
+        raise ValueError(f"params deve ter forma (N, 5), recebido {params.shape}")
+    n_sets = params.shape[0]
+    m1, m2, k1, k2, c = params.T
+    k1_m1 = k1 / m1
+    k1_m2 = k1 / m2
+    k2_m2 = k2 / m2
+    c_m2 = c / m2
+
+    out = np.empty((n_steps, n_sets, 4))
+    if n_steps == 0:
+        return out
+    out[0] = np.broadcast_to(np.asarray(Z0, dtype=float), (n_sets, 4))
+    a1 = np.empty(n_sets)
+    a2 = np.empty(n_sets)
+    for i in range(n_steps - 1):
+        z = out[i]
+        x1, x2, x3, x4 = z[:, 0], z[:, 1], z[:, 2], z[:, 3]
+        np.subtract(x1, x3, out=a1)
+        np.multiply(k1_m2, a1, out=a2)
+        a2 += g - k2_m2 * (x3 - l2) - c_m2 * x4
+        a1 *= -k1_m1
+        a1 += g
+        nxt = out[i + 1]
+        nxt[:, 0] = x1 + x2 * dt
+        nxt[:, 1] = x2 + a1 * dt
+        nxt[:, 2] = x3 + x4 * dt
+        nxt[:, 3] = x4 + a2 * dt
+    return out
+
+
+def _linear_recurrence_loop(Phi, W, out):
+    """
+    Laço da recorrência z[i+1] = Phi @ z[i] + W[i]
+
+    Atualiza ``out`` (n_steps, n) in-place a partir da linha 0.
+    """
+    n = Phi.shape[0]
+    z = np.empty(n)
+    for i in range(out.shape[0] - 1):
+        for r in range(n):
+            acc = W[i, r]
+            for s in range(n):
+                acc += Phi[r, s] * out[i, s]
+            z[r] = acc
+        out[i + 1, :] = z
+    return out
+
+
+if numba is not None:
+    _linear_recurrence_loop_jit = numba.njit(cache=True)(_linear_recurrence_loop)
+else:
+    _linear_recurrence_loop_jit = None
+
+
+def linear_recurrence(Phi, W, z0, backend='auto'):
+    """
+    Avalia a recorrência linear forçada z[i+1] = Phi @ z[i] + W[i]
+
+    Parameters
+    ----------
+    Phi : np.ndarray
+        Matriz de transição (n, n)
+    W : np.ndarray
+        Termo forçante (n_steps - 1, n), já multiplicado pelo passo
+    z0 : array_like
+        Estado inicial (n,)
+    backend : str
+        'auto', 'numba' (laço compilado), 'numpy' (um produto matriz-vetor
+        por passo) ou 'python' (laço escalar interpretado, referência)
+
+    Returns
+    -------
+    np.ndarray
+        Trajetória (n_steps, n)
+    """
+    backend = resolve_backend(backend)
+    Phi = np.ascontiguousarray(Phi, dtype=float)
+    W = np.ascontiguousarray(W, dtype=float)
+    out = np.empty((W.shape[0] + 1, Phi.shape[0]))
+    out[0] = z0
+    if backend == 'numba':
+        return _linear_recurrence_loop_jit(Phi, W, out)
+    if backend == 'python':
+        return _linear_recurrence_loop(Phi, W, out)
+    for i in range(W.shape[0]):
+        np.add(Phi @ out[i], W[i], out=out[i + 1])
+    return out
+
+
+FIXED_STEP_METHODS = ('euler', 'rk4', 'exact')
+ADAPTIVE_METHODS = {'rk45': RK45, 'radau': Radau, 'bdf': BDF, 'lsoda': LSODA}
+METHODS = FIXED_STEP_METHODS + tuple(ADAPTIVE_METHODS)
+
+
+def check_method(method):
+    """
+    Valida o nome do método de integração
+
+    Parameters
+    ----------
+    method : str
+        Um dos valores em ``METHODS``
+    """
+    if method not in METHODS:
+        raise ValueError(f"method deve ser um de {METHODS}, recebido {method!r}")
+
+
+def rk4_matrices(A, dt):
+    """
+    Matrizes do passo RK4 para o sistema linear dz/dt = A z + w(t)
+
+    Como o sistema é linear, um passo de RK4 se reduz a
+    z[i+1] = Phi z[i] + Q1 w[i] + Q2 w[i+1/2] + Q3 w[i+1].
+
+    Parameters
+    ----------
+    A : np.ndarray
+        Matriz de estado (n, n)
+    dt : float
+        Passo de tempo (s)
+
+    Returns
+    -------
+    tuple
+        (Phi, Q1, Q2, Q3)
+    """
+    n = A.shape[0]
+    eye = np.eye(n)
+    H = dt * A
+    H2 = H @ H
+    H3 = H2 @ H
+    Phi = eye + H + H2 / 2 + H3 / 6 + H3 @ H / 24
+    Q1 = dt / 6 * (eye + H + H2 / 2 + H3 / 4)
+    Q2 = dt / 6 * (4 * eye + 2 * H + H2 / 2)
+    Q3 = dt / 6 * eye
+    return Phi, Q1, Q2, Q3
+
+
+def grid_step(time):
+    """
+    Passo médio de uma grade de tempo uniforme
+
+    A coluna Time dos arquivos RBDS é arredondada em milissegundos
+    (0, 0.007, 0.013, ...), então o passo é estimado pela duração total
+    em vez da primeira diferença.
+
+    Parameters
+    ----------
+    time : np.ndarray
+        Vetor de tempo (s)
+
+    Returns
+    -------
+    float
+        Passo de tempo (s)
+    """
+    return (time[-1] - time[0]) / (len(time) - 1)
+
+
+def _linear_input(time, G):
+    """Interpolação linear, por índice, das entradas amostradas em grade uniforme"""
+    t0 = time[0]
+    dt = grid_step(time)
+    last = len(time) - 2
+
+    def w(t):
+        s = (t - t0) / dt
+        i = min(max(int(s), 0), last)
+        frac = s - i
+        return G[i] + frac * (G[i + 1] - G[i])
+
+    return w
+
+
+def _fixed_step_system(A, B, U, dt, method, discrete=None):
+    """
+    Recorrência dos métodos de passo fixo: (Phi, forcing, nfev por passo)
+
+    ``forcing(a, b)`` devolve o termo forçante W[a:b] dos intervalos a..b-1,
+    calculado sob demanda (por blocos) a partir das entradas U.
+    """
+    if method == 'euler':
+        Phi = np.eye(A.shape[0]) + dt * A
+        def forcing(a, b):
+            return dt * (U[a:b] @ B.T)
+        return Phi, forcing, 1
+    if method == 'rk4':
+        Phi, Q1, Q2, Q3 = rk4_matrices(A, dt)
+        def forcing(a, b):
+            G = U[a:b + 1] @ B.T
+            return G[:-1] @ Q1.T + (0.5 * (G[:-1] + G[1:])) @ Q2.T + G[1:] @ Q3.T
+        return Phi, forcing, 4
+    Phi, Bd = discrete if discrete is not None else discretize_zoh(A, B, dt)
+    def forcing(a, b):
+        return U[a:b] @ Bd.T
+    return Phi, forcing, 0
+
+
+def _check_solver_options(method, solver_options):
+    """
+    Rejeita opções de solver adaptativo passadas a um método de passo fixo
+
+    Os controles de divergência (check_every, limit, callback), repassados
+    junto com as opções pelos métodos ``simulate`` dos modelos, valem para
+    todos os métodos.
+    """
+    unused = sorted(set(solver_options) - {'check_every', 'limit', 'callback'})
+    if method in FIXED_STEP_METHODS and unused:
+        raise TypeError(f"Opções {unused} só valem para os métodos "
+                        f"adaptativos {tuple(ADAPTIVE_METHODS)}, não para method={method!r}")
+
+
+def _check_progress(z, start, stop, limit, callback):
+    """Verifica z[start:stop]; retorna a mensagem de parada ou ''"""
+    chunk = z[start:stop]
+    if not np.all(np.isfinite(chunk)):
+        return 'divergiu (valores não finitos)'
+    if limit is not None and np.max(np.abs(chunk), initial=0.0) > limit:
+        return f'divergiu (|z| > {limit:g})'
+    if callback is not None and callback(stop - 1, z[:stop]):
+        return 'interrompido pelo callback'
+    return ''
+
+
+def simulate_lti(A, B, time, U, z0, method='euler', backend='auto', discrete=None,
+                 check_every=None, limit=None, callback=None, **solver_options):
+    """
+    Integra dz/dt = A z + B u(t) com a entrada amostrada em uma grade uniforme
+
+    Métodos de passo fixo (a trajetória é avaliada como uma recorrência
+    linear z[i+1] = Phi z[i] + W[i]):
+
+    - 'euler': Euler explícito, u constante pela esquerda
+    - 'rk4': Runge-Kutta de 4ª ordem, u interpolada linearmente
+    - 'exact': discretização exata com segurador de ordem zero
+
+    Métodos adaptativos (solvers de ``scipy.integrate``, u interpolada
+    linearmente, saída densa avaliada em ``time``):
+
+    - 'rk45': Runge-Kutta explícito adaptativo
+    - 'radau', 'bdf': implícitos, adequados a sistemas rígidos (ganhos PI
+      elevados); o Jacobiano constante A é fornecido ao solver
+    - 'lsoda': alterna automaticamente entre métodos rígido e não rígido
+
+    Parameters
+    ----------
+    A : np.ndarray
+        Matriz de estado (n, n)
+    B : np.ndarray
+        Matriz de entrada (n, m)
+    time : np.ndarray
+        Vetor de tempo uniforme (n_steps,)
+    U : np.ndarray
+        Entradas amostradas (n_steps, m)
+    z0 : array_like
+        Estado inicial (n,)
+    method : str
+        Método de integração (ver acima)
+    backend : str
+        Núcleo da recorrência dos métodos de passo fixo
+    discrete : tuple or None
+        (Ad, Bd) já calculados para method='exact'
+    check_every : int or None
+        Intervalo (em amostras da grade) entre verificações de divergência;
+        None verifica só no final. A cada verificação a integração para se
+        houver valores não finitos ou |z| > ``limit``
+    limit : float or None
+        Limite de |z| acima do qual a simulação é considerada divergente
+    callback : callable or None
+        ``callback(i, z[:i + 1])`` chamado a cada verificação (por exemplo
+        para relatar o erro parcial a um trial do Optuna); retornar True
+        interrompe a integração
+    **solver_options
+        Opções repassadas ao solver adaptativo (rtol, atol, max_step, ...)
+
+    Returns
+    -------
+    tuple
+        (z, stats): trajetória (n_steps, n) e dicionário com estatísticas
+        da integração (n_steps, nfev, njev, nlu, success, message). Se a
+        integração parar antes do fim, as linhas restantes de z são NaN
+
+    Raises
+    ------
+    TypeError
+        Se ``solver_options`` for dado com um método de passo fixo
+    """
+    check_method(method)
+    _check_solver_options(method, solver_options)
+    A = np.asarray(A, dtype=float)
+    B = np.asarray(B, dtype=float)
+    U = np.asarray(U, dtype=float)
+    time = np.asarray(time, dtype=float)
+    dt = grid_step(time)
+    n_intervals = len(time) - 1
+    stats = {'method': method, 'n_steps': n_intervals, 'nfev': 0, 'njev': 0, 'nlu': 0,
+             'success': True, 'message': ''}
+
+    check_every = n_intervals if check_every is None else max(int(check_every), 1)
+
+    if method in FIXED_STEP_METHODS:
+        Phi, forcing, nfev_per_step = _fixed_step_system(A, B, U, dt, method, discrete)
+        if check_every >= n_intervals and limit is None and callback is None:
+            z = linear_recurrence(Phi, forcing(0, n_intervals), z0, backend=backend)
+            stats['nfev'] = nfev_per_step * n_intervals
+            stats['success'] = bool(np.all(np.isfinite(z[-1])))
+            return z, stats
+
+        # Integra em blocos de check_every amostras; o termo forçante também
+        # é calculado por bloco, de modo que parar cedo evita todo o resto
+        z = np.full((len(time), A.shape[0]), np.nan)
+        z[0] = z0
+        done = 1
+        message = ''
+        while done < len(time) and not message:
+            stop = min(done + check_every, len(time))
+            z[done - 1:stop] = linear_recurrence(Phi, forcing(done - 1, stop - 1), z[done - 1],
+                                                 backend=backend)
+            message = _check_progress(z, done, stop, limit, callback)
+            done = stop
+        stats.update(n_steps=done - 1, nfev=nfev_per_step * (done - 1), success=not message,
+                     message=message)
+        return z, stats
+
+    w = _linear_input(time, U @ B.T)
+
+    def rhs(t, z):
+        return A @ z + w(t)
+
+    options = dict(solver_options)
+    if method in ('radau', 'bdf'):
+        options.setdefault('jac', A)
+    solver_class = ADAPTIVE_METHODS[method]
+    solver = solver_class(rhs, time[0], np.asarray(z0, dtype=float), time[-1], **options)
+
+    z = np.full((len(time), A.shape[0]), np.nan)
+    z[0] = z0
+    done = checked = 1
+    n_steps = 0
+    stop_message = ''
+    while solver.status == 'running':
+        message = solver.step()
+        n_steps += 1
+        # Avalia a saída densa nos instantes da grade cobertos por este passo
+        j = np.searchsorted(time, solver.t, side='right')
+        if j > done:
+            z[done:j] = solver.dense_output()(time[done:j]).T
+            done = j
+        if done - checked >= check_every or (done == len(time) and done > checked):
+            stop_message = _check_progress(z, checked, done, limit, callback)
+            checked = done
+            if stop_message:
+                break
+    stats.update(n_steps=n_steps, nfev=solver.nfev, njev=solver.njev, nlu=solver.nlu,
+                 success=solver.status == 'finished' and not stop_message,
+                 message=stop_message or message or '')
+    return z, stats
+
+
+def segment_bounds(n_steps, starts):
+    """
+    Limites dos segmentos independentes de uma grade
+
+    Parameters
+    ----------
+    n_steps : int
+        Número de amostras da grade
+    starts : array_like
+        Índices de início dos segmentos (por exemplo os contatos iniciais);
+        o índice 0 é sempre incluído
+
+    Returns
+    -------
+    np.ndarray
+        (n_segments, 2) com [início, fim) de cada segmento
+    """
+    starts = np.asarray(starts, dtype=np.intp).ravel()
+    starts = np.unique(np.concatenate([[0], starts[(starts > 0) & (starts < n_steps)]]))
+    return np.column_stack([starts, np.append(starts[1:], n_steps)])
+
+
+def _segment_recurrence_loop(Phi, W, bounds, Z0, out, every, limit):
+    """
+    Laço da recorrência z[i+1] = Phi @ z[i] + W[i] em cada segmento [a, b)
+
+    Parte de ``Z0[s]`` na linha a de cada segmento e atualiza ``out``
+    (n_steps, n) in-place. A cada ``every`` passos de um segmento verifica
+    as linhas novas como ``_check_progress`` e para na primeira divergência.
+    Retorna (segmento, passos integrados, código): código 0 se concluído,
+    1 se houver valores não finitos e 2 se |z| > ``limit``.
+    """
+    n = Phi.shape[0]
+    z = np.empty(n)
+    n_steps = 0
+    for s in range(bounds.shape[0]):
+        a = bounds[s, 0]
+        b = bounds[s, 1]
+        out[a, :] = Z0[s]
+        checked = a + 1
+        for i in range(a, b - 1):
+            for r in range(n):
+                acc = W[i, r]
+                for c in range(n):
+                    acc += Phi[r, c] * out[i, c]
+                z[r] = acc
+            out[i + 1, :] = z
+            n_steps += 1
+            if i + 2 - checked < every and i + 2 < b:
+                continue
+            for j in range(checked, i + 2):
+                for r in range(n):
+                    if not np.isfinite(out[j, r]):
+                        return s, n_steps, 1
+            for j in range(checked, i + 2):
+                for r in range(n):
+                    if abs(out[j, r]) > limit:
+                        return s, n_steps, 2
+            checked = i + 2
+    return bounds.shape[0], n_steps, 0
+
+
+if numba is not None:
+    _segment_recurrence_loop_jit = numba.njit(cache=True)(_segment_recurrence_loop)
+else:
+    _segment_recurrence_loop_jit = None
+
+
+def _simulate_segment(args):
+    A, B, time, U, z0, method, backend, discrete, check_every, limit, solver_options = args
+    return simulate_lti(A, B, time, U, z0, method=method, backend=backend, discrete=discrete,
+                        check_every=check_every, limit=limit, **solver_options)
+
+
+def simulate_lti_segments(A, B, time, U, Z0, starts, method='exact', backend='auto',
+                          discrete=None, jobs=1, check_every=None, limit=None, callback=None,
+                          **solver_options):
+    """
+    Integra dz/dt = A z + B u(t) em segmentos independentes e os concatena
+
+    Cada segmento [início, fim) parte do seu próprio estado inicial (por
+    exemplo o estado medido no contato inicial de cada passo). Nos métodos
+    de passo fixo, com numba, uma única chamada compilada percorre todos os
+    segmentos; sem numba, os segmentos avançam lado a lado em um laço
+    vetorizado de comprimento igual ao do maior segmento. Nos métodos
+    adaptativos os segmentos são distribuídos em um pool de processos.
+
+    Parameters
+    ----------
+    A : np.ndarray
+        Matriz de estado (n, n)
+    B : np.ndarray
+        Matriz de entrada (n, m)
+    time : np.ndarray
+        Vetor de tempo uniforme (n_steps,)
+    U : np.ndarray
+        Entradas amostradas (n_steps, m)
+    Z0 : np.ndarray
+        Estados iniciais dos segmentos (n_segments, n)
+    starts : array_like
+        Índices de início dos segmentos (ver ``segment_bounds``)
+    method : str
+        Método de integração (ver ``simulate_lti``)
+    backend : str
+        Núcleo dos métodos de passo fixo: 'numba' (laço compilado sobre
+        todos os segmentos) ou 'numpy'/'python' (segmentos lado a lado);
+        nos adaptativos, repassado a ``simulate_lti``
+    discrete : tuple or None
+        (Ad, Bd) já calculados para method='exact'
+    jobs : int or None
+        Processos para os métodos adaptativos; todos os núcleos se None,
+        sem pool se 1
+    check_every : int or None
+        Passos de cada segmento entre verificações de divergência; None
+        verifica só no final (ver ``simulate_lti``). Nos métodos de passo
+        fixo a divergência de qualquer segmento interrompe todos
+    limit : float or None
+        Limite de |z| acima do qual a simulação é considerada divergente
+    callback : None
+        Não suportado: os segmentos não produzem um trecho inicial
+        contínuo da trajetória a relatar
+    **solver_options
+        Opções repassadas ao solver adaptativo
+
+    Returns
+    -------
+    tuple
+        (z, stats): trajetória concatenada (n_steps, n) e estatísticas,
+        com os limites dos segmentos em stats['segments']; as amostras
+        não simuladas após uma parada são NaN
+
+    Raises
+    ------
+    TypeError
+        Se ``callback`` for dado ou ``solver_options`` for dado com um
+        método de passo fixo
+    """
+    check_method(method)
+    _check_solver_options(method, solver_options)
+    if callback is not None:
+        raise TypeError("callback não é suportado na simulação por segmentos")
+    A = np.asarray(A, dtype=float)
+    B = np.asarray(B, dtype=float)
+    U = np.asarray(U, dtype=float)
+    time = np.asarray(time, dtype=float)
+    bounds = segment_bounds(len(time), starts)
+    Z0 = np.asarray(Z0, dtype=float)
+    if Z0.shape != (len(bounds), A.shape[0]):
+        raise ValueError(f"Z0 deve ter forma ({len(bounds)}, {A.shape[0]}), "
+                         f"recebido {Z0.shape}")
+    lengths = bounds[:, 1] - bounds[:, 0]
+    z = np.full((len(time), A.shape[0]), np.nan)
+    stats = {'method': method, 'n_steps': int(np.sum(lengths - 1)), 'nfev': 0, 'njev': 0,
+             'nlu': 0, 'success': True, 'message': '', 'segments': bounds}
+
+    if method in FIXED_STEP_METHODS:
+        Phi, forcing, nfev_per_step = _fixed_step_system(A, B, U, grid_step(time), method,
+                                                         discrete)
+        W = forcing(0, len(time) - 1)
+        L = int(lengths.max())
+        every = L if check_every is None else max(int(check_every), 1)
+        message = ''
+        if resolve_backend(backend) == 'numba':
+            # Um único laço compilado percorre todos os segmentos, sem preenchimento
+            s, n_steps, code = _segment_recurrence_loop_jit(
+                np.ascontiguousarray(Phi), np.ascontiguousarray(W), bounds, Z0, z, every,
+                np.inf if limit is None else float(limit))
+            if code:
+                reason = ('divergiu (valores não finitos)' if code == 1
+                          else f'divergiu (|z| > {limit:g})')
+                message = f"segmento {bounds[s, 0]}: {reason}"
+        else:
+            # Segmentos lado a lado, do mais longo ao mais curto: Zs[i, k] = estado
+            # do k-ésimo segmento no passo i. O laço em Python tem o comprimento do
+            # maior segmento e cada passo avança só os segmentos ainda ativos
+            order = np.argsort(-lengths, kind='stable')
+            n_active = np.sum(lengths[:, None] > np.arange(1, L), axis=0)
+            Ws = np.zeros((L - 1, len(bounds), A.shape[0]))
+            for k, (a, b) in enumerate(bounds[order]):
+                Ws[:b - a - 1, k] = W[a:b - 1]
+            # Amostras após o fim de cada segmento ficam nulas e passam na
+            # verificação de divergência
+            Zs = np.zeros((L, len(bounds), A.shape[0]))
+            Zs[0] = Z0[order]
+            PhiT = Phi.T
+            done = 1
+            while done < L and not message:
+                stop = min(done + every, L)
+                for i in range(done - 1, stop - 1):
+                    k = n_active[i]
+                    np.add(Zs[i, :k] @ PhiT, Ws[i, :k], out=Zs[i + 1, :k])
+                message = _check_progress(Zs, done, stop, limit, None)
+                done = stop
+            for k, (a, b) in enumerate(bounds[order]):
+                z[a:a + min(done, b - a)] = Zs[:min(done, b - a), k]
+            n_steps = int(np.sum(np.minimum(lengths, done) - 1))
+        stats.update(n_steps=n_steps, nfev=nfev_per_step * n_steps, success=not message,
+                     message=message)
+        return z, stats
+
+    # Segmentos de uma única amostra não têm passos a integrar
+    z[bounds[lengths == 1, 0]] = Z0[lengths == 1]
+    bounds_run = bounds[lengths > 1]
+    tasks = [(A, B, time[a:b], U[a:b], z0, method, backend, discrete, check_every, limit,
+              solver_options) for (a, b), z0 in zip(bounds_run, Z0[lengths > 1])]
+    if jobs == 1 or len(tasks) <= 1:
+        results = [_simulate_segment(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(_simulate_segment, tasks))
+    messages = []
+    for (a, b), (zs, seg_stats) in zip(bounds_run, results):
+        z[a:b] = zs
+        for key in ('nfev', 'njev', 'nlu'):
+            stats[key] += seg_stats[key]
+        if not seg_stats['success']:
+            messages.append(f"segmento {a}: {seg_stats['message']}")
+    stats.update(success=not messages, message='; '.join(messages))
+    return z, stats
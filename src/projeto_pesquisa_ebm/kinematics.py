@@ -0,0 +1,115 @@
+"""
+Cinemática de todos os marcadores de um ensaio em uma única passagem
+
+Em vez de extrair colunas e chamar ``np.gradient`` marcador a marcador, o
+bloco (n_frames, n_markers, 3) inteiro é derivado ao longo do eixo 0. Os
+centroides de segmentos (por exemplo o tronco a partir de ASIS/PSIS) são
+uma média ponderada dos marcadores, calculada como um único produto de
+matrizes, e entram no mesmo bloco que os marcadores: posição, velocidade e
+aceleração de marcadores e centroides saem das mesmas operações.
+"""
+
+import numpy as np
+
+from .differentiation import DIFFERENTIATION_METHODS, kinematic_derivatives
+
+
+# Centroides usados nos notebooks (média simples dos marcadores)
+TRUNK_MARKERS = ('R.ASIS', 'L.ASIS', 'R.PSIS', 'L.PSIS')
+
+
+def centroid_weights(segments, marker_names):
+    """
+    Matriz de pesos (n_segments, n_markers) dos centroides
+
+    Parameters
+    ----------
+    segments : dict
+        nome -> sequência de marcadores (nomes ou índices); cada centroide é
+        a média simples dos seus marcadores
+    marker_names : list of str
+        Nomes dos marcadores, na ordem do bloco
+
+    Returns
+    -------
+    np.ndarray
+        Pesos com linhas somando 1
+    """
+    index = {m: i for i, m in enumerate(marker_names)}
+    W = np.zeros((len(segments), len(marker_names)))
+    for s, members in enumerate(segments.values()):
+        missing = [m for m in members if not isinstance(m, (int, np.integer))
+                   and m not in index]
+        if missing:
+            raise KeyError(f"Marcadores não encontrados: {missing}")
+        cols = [m if isinstance(m, (int, np.integer)) else index[m] for m in members]
+        W[s, cols] = 1.0 / len(cols)
+    return W
+
+
+def marker_kinematics(markers, rate, marker_names=None, segments=None, method='gradient',
+                      scale=1.0, out=None, **options):
+    """
+    Posição, velocidade e aceleração de todos os marcadores e centroides
+
+    Parameters
+    ----------
+    markers : np.ndarray
+        Bloco de marcadores (n_frames, n_markers, 3), por exemplo
+        ``Trial.markers``
+    rate : float
+        Taxa de amostragem (Hz)
+    marker_names : list of str or None
+        Nomes dos marcadores; necessários se ``segments`` usa nomes
+    segments : dict or None
+        nome -> marcadores do centroide (ver ``centroid_weights``); os
+        centroides são acrescentados após os marcadores
+    method : str
+        Derivação: 'gradient' (diferenças centrais, como nos notebooks),
+        'savgol', 'butter' ou 'spline' (ver ``differentiation``)
+    scale : float
+        Fator aplicado às posições (1e-3 converte mm para m)
+    out : tuple of np.ndarray or None
+        Buffers (posição, velocidade, aceleração), cada um
+        (n_frames, n_markers + n_segments, 3), reaproveitados entre ensaios;
+        alocados se None. Com 'butter' e 'spline' os filtros do scipy ainda
+        alocam seus resultados, que são copiados para os buffers (ver
+        ``differentiation.kinematic_derivatives``)
+    **options
+        Opções do método de derivação
+
+    Returns
+    -------
+    dict
+        names (marcadores seguidos dos segmentos), position, velocity e
+        acceleration (views dos buffers)
+    """
+    if method not in DIFFERENTIATION_METHODS:
+        raise ValueError(f"method deve ser um de {DIFFERENTIATION_METHODS}, "
+                         f"recebido {method!r}")
+    markers = np.asarray(markers)
+    if markers.ndim != 3 or markers.shape[2] != 3:
+        raise ValueError(f"markers deve ter forma (n_frames, n_markers, 3), "
+                         f"recebido {markers.shape}")
+    n, n_markers, _ = markers.shape
+    segments = dict(segments or {})
+    if marker_names is None:
+        marker_names = [str(i) for i in range(n_markers)]
+    W = centroid_weights(segments, marker_names)
+    shape = (n, n_markers + len(segments), 3)
+    if out is None:
+        out = tuple(np.empty(shape) for _ in range(3))
+    position, velocity, acceleration = out
+    for buffer in out:
+        if buffer.shape != shape:
+            raise ValueError(f"Buffers devem ter forma {shape}, recebido {buffer.shape}")
+
+    np.multiply(markers, scale, out=position[:, :n_markers])
+    if len(segments):
+        # (S, M) @ (n, M, 3) -> (n, S, 3)
+        np.matmul(W, position[:, :n_markers], out=position[:, n_markers:])
+
+    kinematic_derivatives(position, rate, method, out=out, **options)
+
+    return {'names': list(marker_names) + list(segments),
+            'position': position, 'velocity': velocity, 'acceleration': acceleration}
@@ -0,0 +1,321 @@
+"""
+Análise modal numérica do modelo de 4 massas
+
+Substitui o polinômio característico e as raízes simbólicas (SymPy) dos
+notebooks por autovalores numéricos, vetorizados sobre lotes de conjuntos
+de parâmetros:
+
+- Modos não amortecidos: problema generalizado K φ = ω² M φ, resolvido
+  com a fatoração de Cholesky de M e ``np.linalg.eigh`` em lote
+- Amortecimento modal: ζ = φᵀ C φ / (2 ω) com os modos normalizados pela
+  massa (aproximação de amortecimento proporcional)
+- Autovalores exatos do sistema amortecido, λ² M + λ C + K = 0, pela forma
+  de primeira ordem, usados no critério de estabilidade
+- Triagem de estabilidade do sistema em malha fechada com controladores PI
+  para lotes de ganhos candidatos, antes de qualquer simulação
+- Resposta em frequência H(jω) = C (jωI - A)⁻¹ B exata, vetorizada sobre
+  frequências e conjuntos de parâmetros (em vez de simular e estimar o
+  espectro com Welch)
+"""
+
+import numpy as np
+
+from .identification import PARAMETER_NAMES
+
+
+OUTPUT_ORDERS = {'position': 0, 'velocity': 1, 'acceleration': 2}
+
+
+def model_matrices(params, masses):
+    """
+    Matrizes M, K e C do modelo de Liu & Nigg para um lote de parâmetros
+
+    Parameters
+    ----------
+    params : dict or array_like
+        nome -> valor (escalar ou (N,)) para ``PARAMETER_NAMES``, ou array
+        (N, 8) com as colunas nessa ordem
+    masses : array_like
+        (m1, m2, m3, m4) ou (N, 4) em kg
+
+    Returns
+    -------
+    tuple
+        (M, K, C), cada um (N, 4, 4)
+    """
+    if isinstance(params, dict):
+        values = np.broadcast_arrays(*[np.asarray(params[name], dtype=float)
+                                       for name in PARAMETER_NAMES])
+        k1, k2, k3, k4, k5, c1, c2, c4 = (np.atleast_1d(v) for v in values)
+    else:
+        k1, k2, k3, k4, k5, c1, c2, c4 = np.atleast_2d(np.asarray(params, dtype=float)).T
+    masses = np.atleast_2d(np.asarray(masses, dtype=float))
+    N = max(len(k1), len(masses))
+    k45 = k4 + k5
+
+    M = np.zeros((N, 4, 4))
+    M[:, range(4), range(4)] = masses
+    K = np.zeros((N, 4, 4))
+    K[:, 0, 0], K[:, 0, 1], K[:, 0, 2] = k1 + k2, -k2, -k1
+    K[:, 1, 1], K[:, 1, 2] = k2 + k3, -k3
+    K[:, 2, 2], K[:, 2, 3] = k1 + k3 + k45, -k45
+    K[:, 3, 3] = k45
+    C = np.zeros((N, 4, 4))
+    C[:, 0, 0], C[:, 0, 1], C[:, 0, 2] = c1 + c2, -c2, -c1
+    C[:, 1, 1] = c2
+    C[:, 2, 2], C[:, 2, 3] = c1 + c4, -c4
+    C[:, 3, 3] = c4
+    # Simetria: copia o triângulo superior para o inferior
+    upper = np.triu_indices(4, 1)
+    K[:, upper[1], upper[0]] = K[:, upper[0], upper[1]]
+    C[:, upper[1], upper[0]] = C[:, upper[0], upper[1]]
+    return M, K, C
+
+
+def first_order_matrix(M, K, C):
+    """
+    Matriz de estado [[0, I], [-M⁻¹K, -M⁻¹C]] de um lote de sistemas
+
+    Parameters
+    ----------
+    M, K, C : np.ndarray
+        Matrizes (..., n, n)
+
+    Returns
+    -------
+    np.ndarray
+        (..., 2n, 2n)
+    """
+    M, K, C = np.broadcast_arrays(*(np.asarray(X, dtype=float) for X in (M, K, C)))
+    n = M.shape[-1]
+    A = np.zeros(M.shape[:-2] + (2 * n, 2 * n))
+    A[..., :n, n:] = np.eye(n)
+    A[..., n:, :n] = -np.linalg.solve(M, K)
+    A[..., n:, n:] = -np.linalg.solve(M, C)
+    return A
+
+
+def modal_analysis(M, K, C=None, tol=1e-6):
+    """
+    Frequências naturais, amortecimentos, modos e autovalores
+
+    Parameters
+    ----------
+    M, K : np.ndarray
+        Matrizes de massa (simétrica positiva definida) e de rigidez
+        (simétrica), (n, n) ou em lote (N, n, n)
+    C : np.ndarray or None
+        Matriz de amortecimento; sem ela os autovalores são ±jω
+    tol : float
+        Tolerância relativa para modos de corpo rígido (ω ≈ 0) e para a
+        parte real nula no critério de estabilidade; o modo de corpo
+        rígido do modelo (K singular) é uma raiz dupla em zero, que o
+        solver devolve como ±sqrt(eps·|A|)
+
+    Returns
+    -------
+    dict
+        - omega2: autovalores ω² do problema (K, M), crescentes (..., n);
+          negativos indicam rigidez instável
+        - natural_frequency: ω / 2π (Hz), NaN onde ω² < 0
+        - damping_ratio: ζ de cada modo, NaN nos modos de corpo rígido
+        - mode_shapes: modos normalizados pela massa nas colunas (..., n, n)
+        - eigenvalues: autovalores do sistema amortecido (..., 2n)
+        - max_real: maior parte real dos autovalores (...,)
+        - stable: max_real <= tol * max|λ| (...,)
+
+    Examples
+    --------
+    >>> M, K, C = model_matrices(params, segment_masses(80.0))  # params (N, 8)
+    >>> stable = modal_analysis(M, K, C)['stable']
+    """
+    M = np.asarray(M, dtype=float)
+    K = np.asarray(K, dtype=float)
+    C = np.zeros_like(K) if C is None else np.asarray(C, dtype=float)
+    M, K, C = np.broadcast_arrays(M, K, C)
+
+    # K φ = ω² M φ  ->  (L⁻¹ K L⁻ᵀ) ψ = ω² ψ, com M = L Lᵀ e φ = L⁻ᵀ ψ
+    L = np.linalg.cholesky(M)
+    L_inv = np.linalg.inv(L)
+    L_inv_T = np.swapaxes(L_inv, -1, -2)
+    K_tilde = L_inv @ K @ L_inv_T
+    omega2, psi = np.linalg.eigh(0.5 * (K_tilde + np.swapaxes(K_tilde, -1, -2)))
+    shapes = L_inv_T @ psi
+
+    scale = np.max(np.abs(omega2), axis=-1, keepdims=True)
+    rigid = np.abs(omega2) <= tol * scale
+    omega = np.sqrt(np.where(omega2 > 0, omega2, np.nan))
+    omega[rigid] = 0.0
+    modal_damping = np.einsum('...ji,...jk,...ki->...i', shapes, C, shapes)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        zeta = modal_damping / (2.0 * omega)
+    zeta[rigid] = np.nan
+
+    eigenvalues = np.linalg.eigvals(first_order_matrix(M, K, C))
+    max_real = eigenvalues.real.max(axis=-1)
+    stable = max_real <= tol * np.abs(eigenvalues).max(axis=-1)
+    return {
+        'omega2': omega2,
+        'natural_frequency': omega / (2 * np.pi),
+        'damping_ratio': zeta,
+        'mode_shapes': shapes,
+        'eigenvalues': eigenvalues,
+        'max_real': max_real,
+        'stable': stable,
+    }
+
+
+def closed_loop_matrix(M, K, C, Kp, Ki):
+    """
+    Matrizes de estado em malha fechada com PI para um lote de ganhos
+
+    Mesma montagem de ``LiuNigg4MassModel.pi_state_space``, com estado
+    z = [p1..p4, v1..v4, I1..I4] e dI/dt = p_ref - p.
+
+    Parameters
+    ----------
+    M, K, C : np.ndarray
+        Matrizes do modelo (4, 4) ou (N, 4, 4)
+    Kp, Ki : array_like
+        Ganhos (4,) ou (N, 4)
+
+    Returns
+    -------
+    np.ndarray
+        (N, 12, 12)
+    """
+    Kp = np.atleast_2d(np.asarray(Kp, dtype=float))
+    Ki = np.atleast_2d(np.asarray(Ki, dtype=float))
+    M, K, C = (np.asarray(X, dtype=float) for X in (M, K, C))
+    n = M.shape[-1]
+    shape = np.broadcast_shapes(M.shape[:-2], K.shape[:-2], C.shape[:-2],
+                                Kp.shape[:-1], Ki.shape[:-1])
+    diagonal = np.arange(n)
+    K_cl = np.array(np.broadcast_to(K, shape + (n, n)))
+    K_cl[..., diagonal, diagonal] += Kp
+    Ki_diag = np.zeros(shape + (n, n))
+    Ki_diag[..., diagonal, diagonal] = Ki
+
+    A = np.zeros(shape + (3 * n, 3 * n))
+    A[..., :n, n:2 * n] = np.eye(n)
+    A[..., n:2 * n, :n] = -np.linalg.solve(M, K_cl)
+    A[..., n:2 * n, n:2 * n] = -np.linalg.solve(M, np.broadcast_to(C, shape + (n, n)))
+    A[..., n:2 * n, 2 * n:] = np.linalg.solve(M, Ki_diag)
+    A[..., 2 * n:, :n] = -np.eye(n)
+    return A
+
+
+def pi_stability(M, K, C, Kp, Ki, tol=1e-6):
+    """
+    Triagem de estabilidade de ganhos PI candidatos
+
+    Parameters
+    ----------
+    M, K, C : np.ndarray
+        Matrizes do modelo (4, 4) ou (N, 4, 4)
+    Kp, Ki : array_like
+        Ganhos (4,) ou (N, 4)
+    tol : float
+        Tolerância relativa da parte real nula (ver ``modal_analysis``)
+
+    Returns
+    -------
+    tuple
+        (stable (N,), max_real (N,)): critério e maior parte real dos
+        autovalores do sistema em malha fechada
+
+    Examples
+    --------
+    >>> stable, _ = pi_stability(model.M, model.K, model.C, Kp, Ki)  # Kp, Ki (N, 4)
+    >>> candidates = Kp[stable], Ki[stable]
+    """
+    eigenvalues = np.linalg.eigvals(closed_loop_matrix(M, K, C, Kp, Ki))
+    max_real = eigenvalues.real.max(axis=-1)
+    return max_real <= tol * np.abs(eigenvalues).max(axis=-1), max_real
+
+
+def frequency_response(A, B, C, freqs, D=None):
+    """
+    Resposta em frequência H(jω) = C (jωI - A)⁻¹ B + D de sistemas em lote
+
+    Parameters
+    ----------
+    A : np.ndarray
+        Matrizes de estado (..., n, n)
+    B : np.ndarray
+        Matrizes de entrada (..., n, m)
+    C : np.ndarray
+        Matrizes de saída (..., p, n)
+    freqs : array_like
+        Frequências (Hz)
+    D : np.ndarray or None
+        Transmissão direta (..., p, m)
+
+    Returns
+    -------
+    np.ndarray
+        H complexo (..., n_freqs, p, m)
+    """
+    A, B, C = (np.asarray(X, dtype=float) for X in (A, B, C))
+    s = 2j * np.pi * np.asarray(freqs, dtype=float)
+    n = A.shape[-1]
+    S = s[:, None, None] * np.eye(n) - A[..., None, :, :]
+    H = C[..., None, :, :] @ np.linalg.solve(S, np.broadcast_to(B[..., None, :, :],
+                                                                S.shape[:-1] + B.shape[-1:]))
+    if D is not None:
+        H = H + np.asarray(D)[..., None, :, :]
+    return H
+
+
+def mgrf_response(M, K, C, freqs, output='position', Kp=None, Ki=None):
+    """
+    Resposta em frequência da MGRF para p1..p4 (ou v, a) do modelo
+
+    A MGRF (positiva para cima) atua na massa 1 com sinal negativo e as
+    saídas seguem a convenção do modelo (positivo = para baixo). O sistema
+    é resolvido na forma de segunda ordem, (K - ω²M + jωC)⁻¹, equivalente a
+    C (jωI - A)⁻¹ B com matrizes 4x4 em vez de 8x8 ou 12x12. Com ``Kp`` e
+    ``Ki`` é o sistema em malha fechada com PI e referências nulas, cuja
+    rigidez dinâmica ganha Kp + Ki / (jω).
+
+    Parameters
+    ----------
+    M, K, C : np.ndarray
+        Matrizes do modelo (4, 4) ou (N, 4, 4), por exemplo de
+        ``model_matrices``
+    freqs : array_like
+        Frequências (Hz), > 0 (em malha aberta o modelo é livre e H(0) é
+        infinito)
+    output : str
+        'position', 'velocity' ou 'acceleration'
+    Kp, Ki : array_like or None
+        Ganhos PI (4,) ou (N, 4); malha aberta se ambos forem None
+
+    Returns
+    -------
+    np.ndarray
+        H complexo (..., n_freqs, 4), em m/N (ou m/s/N, m/s²/N)
+    """
+    if output not in OUTPUT_ORDERS:
+        raise ValueError(f"output deve ser um de {tuple(OUTPUT_ORDERS)}, recebido {output!r}")
+    freqs = np.asarray(freqs, dtype=float)
+    if np.any(freqs <= 0):
+        raise ValueError("As frequências devem ser > 0")
+    M, K, C = (np.asarray(X, dtype=float) for X in (M, K, C))
+    n = M.shape[-1]
+    s = 2j * np.pi * freqs
+    stiffness = K[..., None, :, :].astype(complex)
+    if Kp is not None or Ki is not None:
+        # Ganhos na diagonal: (..., 1, 4) para Kp, (..., n_freqs, 4) para Ki / s
+        gains = 0.0
+        if Kp is not None:
+            gains = gains + np.asarray(Kp, dtype=float)[..., None, :]
+        if Ki is not None:
+            gains = gains + np.asarray(Ki, dtype=float)[..., None, :] / s[:, None]
+        stiffness = stiffness + gains[..., None] * np.eye(n)
+    dynamic = (stiffness + (s**2)[:, None, None] * M[..., None, :, :]
+               + s[:, None, None] * C[..., None, :, :])
+    force = np.zeros((n, 1))
+    force[0] = -1.0  # f1 = -MGRF
+    H = np.linalg.solve(dynamic, np.broadcast_to(force, dynamic.shape[:-1] + (1,)))[..., 0]
+    return H * s[:, None]**OUTPUT_ORDERS[output]
@@ -5,6 +5,21 @@ Modelos biomecânicos para análise de corrida
 import numpy as np
 from scipy.optimize import minimize
 
+from .integrators import (
+    _check_solver_options,
+    affine_recurrence,
+    check_method,
+    discretize_zoh,
+    euler_msd,
+    euler_msd_batch,
+    grid_step,
+    msd_state_space,
+    segment_bounds,
+    simulate_lti,
+    simulate_lti_segments,
+)
+from .modal import mgrf_response, modal_analysis, pi_stability
+
 
 class MassSpringDamperModel:
     """
@@ -39,6 +54,7 @@ class MassSpringDamperModel:
         self.k2 = k2
         self.c = c
         self.g = g
+        self._discrete_cache = {}
         
     def acceleration_m1(self, x1, x2, x3, x4):
         """
@@ -89,9 +105,35 @@ class MassSpringDamperModel:
                 omega2**2 * (x3 - l2) - 
                 (self.c / self.m2) * x4)
     
-    def simulate(self, t_max, dt, x1_0, x2_0, x3_0, x4_0, F_impulse=None):
+    def discretize(self, dt):
+        """
+        Matrizes de transição exatas (Ad, bd) para o passo dt
+        
+        O resultado é guardado por dt e pelos parâmetros, de forma que a
+        exponencial de matriz é calculada uma única vez por conjunto de
+        parâmetros e alterar um atributo (k1, c, ...) invalida o cache.
+        
+        Parameters
+        ----------
+        dt : float
+            Passo de tempo (s)
+            
+        Returns
+        -------
+        tuple
+            (Ad, bd) tais que z[k+1] = Ad z[k] + bd
+        """
+        params = (self.m1, self.m2, self.k1, self.k2, self.c, self.g)
+        key = (dt,) + params
+        if key not in self._discrete_cache:
+            A, b = msd_state_space(*params)
+            self._discrete_cache[key] = discretize_zoh(A, b, dt)
+        return self._discrete_cache[key]
+    
+    def simulate(self, t_max, dt, x1_0, x2_0, x3_0, x4_0, F_impulse=None, backend='auto',
+                 method='euler', **solver_options):
         """
-        Simula o sistema usando método de Euler
+        Simula o sistema usando o método de integração escolhido
         
         Parameters
         ----------
@@ -109,44 +151,95 @@ class MassSpringDamperModel:
             Velocidade inicial da massa 2
         F_impulse : callable or None
             Função que retorna força de impulso em função do tempo
+        backend : str
+            Núcleo de integração: 'numba' (compilado), 'numpy' (vetorizado),
+            'python' (laço interpretado) ou 'auto' (numba se instalado,
+            senão numpy)
+        method : str
+            'euler' (Euler explícito), 'exact' (z[k+1] = Ad z[k] + bd com
+            Ad = expm(A dt), exato para qualquer dt), 'rk4' (passo fixo) ou
+            os adaptativos 'rk45', 'radau', 'bdf' e 'lsoda'
+        **solver_options
+            Opções dos métodos adaptativos (rtol, atol, max_step, ...)
             
         Returns
         -------
         dict
-            Dicionário com arrays de tempo, posições, velocidades e forças
+            Dicionário com arrays de tempo, posições, velocidades e forças,
+            e as estatísticas da integração em 'stats'
         """
+        check_method(method)
+        _check_solver_options(method, solver_options)
         n_steps = int(t_max / dt)
         
-        # Inicializar arrays
         t = np.linspace(0, t_max, n_steps)
-        x1 = np.zeros(n_steps)
-        x2 = np.zeros(n_steps)
-        x3 = np.zeros(n_steps)
-        x4 = np.zeros(n_steps)
-        
-        # Condições iniciais
-        x1[0] = x1_0
-        x2[0] = x2_0
-        x3[0] = x3_0
-        x4[0] = x4_0
-        
-        # Método de Euler
-        for i in range(n_steps - 1):
-            a1 = self.acceleration_m1(x1[i], x2[i], x3[i], x4[i])
-            a2 = self.acceleration_m2(x1[i], x2[i], x3[i], x4[i])
-            
-            x2[i+1] = x2[i] + a1 * dt
-            x1[i+1] = x1[i] + x2[i] * dt
+        z0 = [x1_0, x2_0, x3_0, x4_0]
+        stats = {'method': method, 'n_steps': max(n_steps - 1, 0), 'nfev': 0, 'njev': 0,
+                 'nlu': 0, 'success': True, 'message': ''}
+        if method == 'exact':
+            Ad, bd = self.discretize(dt)
+            z = affine_recurrence(Ad, bd, np.asarray(z0, dtype=float), n_steps)
+        elif method == 'euler':
+            z = euler_msd(z0, n_steps, dt,
+                          self.m1, self.m2, self.k1, self.k2, self.c, self.g,
+                          backend=backend)
+            stats['nfev'] = stats['n_steps']
+        else:
+            # O termo da gravidade entra como uma entrada unitária constante
+            A, b = msd_state_space(self.m1, self.m2, self.k1, self.k2, self.c, self.g)
+            z, stats = simulate_lti(A, b[:, None], np.arange(n_steps) * dt,
+                                    np.ones((n_steps, 1)), z0, method=method,
+                                    backend=backend, **solver_options)
+        
+        return {
+            'time': t,
+            'x1': z[:, 0],
+            'x2': z[:, 1],
+            'x3': z[:, 2],
+            'x4': z[:, 3],
+            'stats': stats
+        }
+    
+    @classmethod
+    def simulate_batch(cls, params, t_max, dt, x0, g=-9.81):
+        """
+        Simula vários conjuntos de parâmetros de uma só vez (Euler)
+        
+        Todos os conjuntos são integrados juntos em um estado vetorizado
+        (N, 4), evitando criar N objetos do modelo e N laços em Python
+        (por exemplo, em varreduras de grade sobre k1 e k2).
+        
+        Parameters
+        ----------
+        params : np.ndarray
+            Array (N, 5) com colunas [m1, m2, k1, k2, c]
+        t_max : float
+            Tempo total de simulação (s)
+        dt : float
+            Passo de tempo (s)
+        x0 : array_like
+            Condições iniciais [x1, x2, x3, x4], (4,) comuns a todos os
+            conjuntos ou (N, 4) uma linha por conjunto
+        g : float
+            Aceleração da gravidade (m/s²)
             
-            x4[i+1] = x4[i] + a2 * dt
-            x3[i+1] = x3[i] + x4[i] * dt
+        Returns
+        -------
+        dict
+            Dicionário com o vetor de tempo (n_steps,) e arrays (N, n_steps)
+            de posições e velocidades, uma linha por conjunto de parâmetros
+        """
+        n_steps = int(t_max / dt)
+        
+        t = np.linspace(0, t_max, n_steps)
+        z = euler_msd_batch(x0, n_steps, dt, params, g)
         
         return {
             'time': t,
-            'x1': x1,
-            'x2': x2,
-            'x3': x3,
-            'x4': x4
+            'x1': z[:, :, 0].T,
+            'x2': z[:, :, 1].T,
+            'x3': z[:, :, 2].T,
+            'x4': z[:, :, 3].T
         }
     
     def optimize_parameters(self, measured_grf, measured_acc, initial_guess=None):
@@ -185,3 +278,454 @@ class MassSpringDamperModel:
             'success': result.success
         }
 
+
+
+class LiuNigg4MassModel:
+    """
+    Modelo de 4 massas de Liu & Nigg (2000) em espaço de estados
+    
+    Massas: 1 = metatarso (pé), 2 = canela, 3 = coxa, 4 = crista ilíaca.
+    Convenção do modelo: positivo = para BAIXO, g > 0 e a MGRF atua
+    na massa 1 com sinal negativo.
+    
+    As matrizes M, K e C são montadas uma única vez (e de novo se um
+    parâmetro for alterado) e o sistema é escrito como
+    dz/dt = A z + B f(t) + b, com z = [p1..p4, v1..v4], f as forças
+    externas em cada massa e b o termo constante da gravidade.
+    """
+    
+    PARAMETERS = ('m1', 'm2', 'm3', 'm4', 'k1', 'k2', 'k3', 'k4', 'k5', 'c1', 'c2', 'c4', 'g')
+    
+    def __init__(self, m1, m2, m3, m4, k1, k2, k3, k4, k5, c1, c2, c4, g=9.81):
+        """
+        Inicializa o modelo de 4 massas
+        
+        Parameters
+        ----------
+        m1, m2, m3, m4 : float
+            Massas do pé, canela, coxa e crista ilíaca (kg)
+        k1, k2, k3, k4, k5 : float
+            Constantes das molas (N/m)
+        c1, c2, c4 : float
+            Coeficientes de amortecimento (N.s/m)
+        g : float
+            Aceleração da gravidade (m/s², positiva = para baixo)
+        """
+        self.m1, self.m2, self.m3, self.m4 = m1, m2, m3, m4
+        self.k1, self.k2, self.k3, self.k4, self.k5 = k1, k2, k3, k4, k5
+        self.c1, self.c2, self.c4 = c1, c2, c4
+        self.g = g
+        self._build_matrices()
+        self._discrete_cache = {}
+    
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        # Alterar um parâmetro depois de montado remonta M, K, C, A, B e b
+        if name in self.PARAMETERS and '_discrete_cache' in self.__dict__:
+            self._build_matrices()
+    
+    def _build_matrices(self):
+        """Monta M, K, C e as matrizes de estado a partir dos parâmetros"""
+        m1, m2, m3, m4 = self.m1, self.m2, self.m3, self.m4
+        k1, k2, k3, k4, k5 = self.k1, self.k2, self.k3, self.k4, self.k5
+        c1, c2, c4 = self.c1, self.c2, self.c4
+        self.M = np.diag([m1, m2, m3, m4]).astype(float)
+        self.K = np.array([
+            [k1 + k2, -k2, -k1, 0],
+            [-k2, k2 + k3, -k3, 0],
+            [-k1, -k3, k1 + k3 + k4 + k5, -(k4 + k5)],
+            [0, 0, -(k4 + k5), k4 + k5]
+        ], dtype=float)
+        self.C = np.array([
+            [c1 + c2, -c2, -c1, 0],
+            [-c2, c2, 0, 0],
+            [-c1, 0, c1 + c4, -c4],
+            [0, 0, -c4, c4]
+        ], dtype=float)
+        
+        # M é diagonal: a inversa é exata e barata
+        self.M_inv = np.diag(1.0 / np.diag(self.M))
+        self.M_inv_K = self.M_inv @ self.K
+        self.M_inv_C = self.M_inv @ self.C
+        
+        zeros = np.zeros((4, 4))
+        self.A = np.block([
+            [zeros, np.eye(4)],
+            [-self.M_inv_K, -self.M_inv_C]
+        ])
+        self.B = np.vstack([zeros, self.M_inv])
+        self.b = np.concatenate([np.zeros(4), np.full(4, float(self.g))])
+    
+    def external_forces(self, MGRF, forces=None):
+        """
+        Monta as forças externas em cada massa a partir da MGRF
+        
+        Parameters
+        ----------
+        MGRF : np.ndarray
+            Força de reação do solo vertical (N), positiva para cima
+        forces : np.ndarray or None
+            Forças adicionais (n_steps, 4) aplicadas em cada massa
+            
+        Returns
+        -------
+        np.ndarray
+            Forças (n_steps, 4) na convenção do modelo
+        """
+        MGRF = np.asarray(MGRF, dtype=float)
+        f = np.zeros((len(MGRF), 4))
+        if forces is not None:
+            f += forces
+        f[:, 0] -= MGRF
+        return f
+    
+    def derivatives(self, z, f=None):
+        """
+        Calcula dz/dt = A z + B f + b
+        
+        Parameters
+        ----------
+        z : np.ndarray
+            Estado (8,) ou (n, 8)
+        f : np.ndarray or None
+            Forças externas (4,) ou (n, 4)
+            
+        Returns
+        -------
+        np.ndarray
+            Derivada do estado, mesma forma de z
+        """
+        dz = z @ self.A.T + self.b
+        if f is not None:
+            dz = dz + f @ self.B.T
+        return dz
+    
+    def discretize(self, dt):
+        """
+        Matrizes de transição exatas com segurador de ordem zero
+        
+        A entrada é u = [f1, f2, f3, f4, 1]: as forças externas em cada massa,
+        constantes em cada intervalo, e o termo unitário da gravidade. O
+        resultado é guardado por dt e pelas matrizes do sistema (A, b).
+        
+        Parameters
+        ----------
+        dt : float
+            Passo de tempo (s)
+            
+        Returns
+        -------
+        tuple
+            (Ad, Bd) com formas (8, 8) e (8, 5)
+        """
+        key = (dt, self.A.tobytes(), self.B.tobytes(), self.b.tobytes())
+        if key not in self._discrete_cache:
+            self._discrete_cache[key] = discretize_zoh(self.A, np.column_stack([self.B, self.b]),
+                                                       dt)
+        return self._discrete_cache[key]
+    
+    def simulate(self, time, MGRF, z0=None, forces=None, backend='auto', method='euler',
+                 **solver_options):
+        """
+        Simula o sistema usando o método de integração escolhido
+        
+        Com method='exact' a MGRF é mantida constante em cada intervalo
+        (segurador de ordem zero) e não há restrição de estabilidade sobre
+        o passo: o sistema pode ser simulado diretamente na taxa dos
+        marcadores, sem sub-passos.
+        
+        Parameters
+        ----------
+        time : np.ndarray
+            Vetor de tempo uniforme (s)
+        MGRF : np.ndarray
+            Força de reação do solo em cada instante de ``time`` (N)
+        z0 : array_like or None
+            Estado inicial [p1..p4, v1..v4]; zeros se None
+        forces : np.ndarray or None
+            Forças adicionais (n_steps, 4) em cada massa
+        backend : str
+            Núcleo de integração ('auto', 'numba', 'numpy' ou 'python')
+        method : str
+            'euler' (Euler explícito), 'exact' (Ad = expm(A dt)), 'rk4' ou
+            os adaptativos 'rk45', 'radau', 'bdf' e 'lsoda'
+        **solver_options
+            Opções dos métodos adaptativos (rtol, atol, max_step, ...)
+            
+        Returns
+        -------
+        dict
+            Dicionário com tempo, posições p1..p4, velocidades v1..v4 e as
+            estatísticas da integração em 'stats'
+        """
+        check_method(method)
+        _check_solver_options(method, solver_options)
+        time = np.asarray(time, dtype=float)
+        dt = grid_step(time)
+        if z0 is None:
+            z0 = np.zeros(8)
+        
+        # Entradas de todos os passos montadas de uma vez: u = [f1..f4, 1]
+        f = self.external_forces(MGRF[:len(time)], forces)
+        U = np.column_stack([f, np.ones(len(f))])
+        discrete = self.discretize(dt) if method == 'exact' else None
+        z, stats = simulate_lti(self.A, np.column_stack([self.B, self.b]),
+                                time, U, z0, method=method, backend=backend,
+                                discrete=discrete, **solver_options)
+        
+        result = self._as_dict(time, z)
+        result['stats'] = stats
+        return result
+    
+    def pi_state_space(self, Kp, Ki):
+        """
+        Sistema em malha fechada com um controlador PI em cada massa
+        
+        A força de atuação em cada massa é F = Kp e + Ki ∫e, com
+        e = p_ref - p. O estado é aumentado com as integrais dos erros,
+        z = [p1..p4, v1..v4, I1..I4], e a entrada é
+        u = [p_ref1..p_ref4, f1..f4, 1].
+        
+        Parameters
+        ----------
+        Kp : array_like
+            Ganhos proporcionais das 4 massas
+        Ki : array_like
+            Ganhos integrais das 4 massas
+            
+        Returns
+        -------
+        tuple
+            (A_cl, B_cl) com formas (12, 12) e (12, 9)
+        """
+        Kp = np.diag(np.asarray(Kp, dtype=float))
+        Ki = np.diag(np.asarray(Ki, dtype=float))
+        zeros = np.zeros((4, 4))
+        eye = np.eye(4)
+        A_cl = np.block([
+            [zeros, eye, zeros],
+            [-self.M_inv @ (self.K + Kp), -self.M_inv_C, self.M_inv @ Ki],
+            [-eye, zeros, zeros]
+        ])
+        gravity = np.zeros((12, 1))
+        gravity[4:8, 0] = self.g
+        B_cl = np.block([
+            [zeros, zeros, np.zeros((4, 1))],
+            [self.M_inv @ Kp, self.M_inv, gravity[4:8]],
+            [eye, zeros, np.zeros((4, 1))]
+        ])
+        return A_cl, B_cl
+    
+    def pi_inputs(self, p_ref, MGRF=None):
+        """
+        Entradas do sistema em malha fechada: [p_ref (4), f (4), 1]
+        
+        Não dependem dos ganhos; podem ser calculadas uma vez e repassadas a
+        ``simulate_pi`` (argumento ``inputs``) em avaliações repetidas.
+        
+        Parameters
+        ----------
+        p_ref : np.ndarray
+            Posições de referência (n_steps, 4)
+        MGRF : np.ndarray or None
+            Força de reação do solo (N); ignorada se None
+            
+        Returns
+        -------
+        np.ndarray
+            Entradas (n_steps, 9)
+        """
+        p_ref = np.asarray(p_ref, dtype=float)
+        U = np.empty((len(p_ref), 9))
+        U[:, :4] = p_ref
+        U[:, 4:8] = self.external_forces(np.zeros(len(p_ref)) if MGRF is None
+                                         else MGRF[:len(p_ref)])
+        U[:, 8] = 1.0
+        return U
+    
+    def simulate_pi(self, time, p_ref, Kp, Ki, MGRF=None, z0=None, method='euler',
+                    backend='auto', inputs=None, **solver_options):
+        """
+        Simula o sistema rastreando as posições medidas com controladores PI
+        
+        Ganhos elevados tornam o sistema rígido: nesses casos 'radau',
+        'bdf' ou 'exact' terminam em poucos passos onde Euler explícito
+        diverge ou exige passos muito pequenos.
+        
+        Parameters
+        ----------
+        time : np.ndarray
+            Vetor de tempo uniforme (s)
+        p_ref : np.ndarray
+            Posições de referência (n_steps, 4) na convenção do modelo
+        Kp : array_like
+            Ganhos proporcionais [Kp1, Kp2, Kp3, Kp4]
+        Ki : array_like
+            Ganhos integrais [Ki1, Ki2, Ki3, Ki4]
+        MGRF : np.ndarray or None
+            Força de reação do solo (N); ignorada se None
+        z0 : array_like or None
+            Estado inicial [p1..p4, v1..v4]; p_ref[0] e velocidade nula se None
+        method : str
+            Método de integração (ver ``simulate``)
+        backend : str
+            Núcleo de integração dos métodos de passo fixo
+        inputs : np.ndarray or None
+            Entradas já montadas por ``pi_inputs``; se dadas, MGRF é ignorada
+        **solver_options
+            Opções dos métodos adaptativos (rtol, atol, max_step, ...)
+            
+        Returns
+        -------
+        dict
+            Dicionário com tempo, posições p1..p4, velocidades v1..v4,
+            forças de atuação F1..F4 e as estatísticas em 'stats'
+        """
+        check_method(method)
+        time = np.asarray(time, dtype=float)
+        p_ref = np.asarray(p_ref, dtype=float)[:len(time)]
+        if z0 is None:
+            z0 = np.concatenate([p_ref[0], np.zeros(4)])
+        z0 = np.concatenate([np.asarray(z0, dtype=float), np.zeros(4)])
+        
+        U = self.pi_inputs(p_ref, MGRF) if inputs is None else inputs
+        A_cl, B_cl = self.pi_state_space(Kp, Ki)
+        z, stats = simulate_lti(A_cl, B_cl, time, U, z0, method=method, backend=backend,
+                                **solver_options)
+        return self._pi_result(time, p_ref, Kp, Ki, z, stats)
+    
+    def simulate_pi_segments(self, time, p_ref, Kp, Ki, starts, MGRF=None, v_ref=None,
+                             method='exact', backend='auto', inputs=None, jobs=1,
+                             **solver_options):
+        """
+        Simula com controladores PI em segmentos independentes (um por passo)
+        
+        A grade é dividida nos índices ``starts`` (por exemplo os contatos
+        iniciais detectados na Fy); cada segmento parte do estado medido no
+        seu início (posição e, se dada, velocidade de referência, integrais
+        nulas). Os segmentos são simulados juntos (passo fixo, vetorizado)
+        ou em um pool de processos (métodos adaptativos) e concatenados.
+        
+        Parameters
+        ----------
+        time : np.ndarray
+            Vetor de tempo uniforme (s)
+        p_ref : np.ndarray
+            Posições de referência (n_steps, 4) na convenção do modelo
+        Kp, Ki : array_like
+            Ganhos proporcionais e integrais (4,)
+        starts : array_like
+            Índices de início dos segmentos na grade
+        MGRF : np.ndarray or None
+            Força de reação do solo (N); ignorada se None
+        v_ref : np.ndarray or None
+            Velocidades de referência (n_steps, 4); nulas se None
+        method : str
+            Método de integração (ver ``simulate``)
+        backend : str
+            Núcleo de integração dos segmentos simulados um a um
+        inputs : np.ndarray or None
+            Entradas já montadas por ``pi_inputs``; se dadas, MGRF é ignorada
+        jobs : int or None
+            Processos para os métodos adaptativos (1 = sem pool)
+        **solver_options
+            Controles de divergência (check_every, limit) e opções dos
+            métodos adaptativos (ver ``simulate_lti_segments``)
+            
+        Returns
+        -------
+        dict
+            Como ``simulate_pi``; os limites [início, fim) dos segmentos
+            ficam em stats['segments']
+        """
+        check_method(method)
+        time = np.asarray(time, dtype=float)
+        p_ref = np.asarray(p_ref, dtype=float)[:len(time)]
+        bounds = segment_bounds(len(time), starts)
+        Z0 = np.zeros((len(bounds), 12))
+        Z0[:, :4] = p_ref[bounds[:, 0]]
+        if v_ref is not None:
+            Z0[:, 4:8] = np.asarray(v_ref, dtype=float)[bounds[:, 0]]
+        
+        U = self.pi_inputs(p_ref, MGRF) if inputs is None else inputs
+        A_cl, B_cl = self.pi_state_space(Kp, Ki)
+        z, stats = simulate_lti_segments(A_cl, B_cl, time, U, Z0, bounds[:, 0], method=method,
+                                         backend=backend, jobs=jobs, **solver_options)
+        return self._pi_result(time, p_ref, Kp, Ki, z, stats)
+    
+    def _pi_result(self, time, p_ref, Kp, Ki, z, stats):
+        result = self._as_dict(time, z)
+        F = np.asarray(Kp) * (p_ref - z[:, :4]) + np.asarray(Ki) * z[:, 8:]
+        for j in range(4):
+            result[f'F{j + 1}'] = F[:, j]
+        result['stats'] = stats
+        return result
+    
+    def check_stability(self):
+        """
+        Verifica a estabilidade pelos autovalores da matriz de estado
+        
+        Returns
+        -------
+        tuple
+            (is_stable, eigenvalues, real_parts)
+        """
+        eigenvalues = np.linalg.eigvals(self.A)
+        real_parts = np.real(eigenvalues)
+        is_stable = np.all(real_parts <= 0)
+        return is_stable, eigenvalues, real_parts
+    
+    def modal_analysis(self):
+        """
+        Frequências naturais, amortecimentos e modos do sistema (K, M, C)
+
+        Returns
+        -------
+        dict
+            Resultado de ``modal.modal_analysis``
+        """
+        return modal_analysis(self.M, self.K, self.C)
+    
+    def pi_stability(self, Kp, Ki):
+        """
+        Estabilidade em malha fechada para um lote de ganhos PI
+
+        Parameters
+        ----------
+        Kp, Ki : array_like
+            Ganhos (4,) ou (N, 4)
+
+        Returns
+        -------
+        tuple
+            (stable (N,), max_real (N,)), ver ``modal.pi_stability``
+        """
+        return pi_stability(self.M, self.K, self.C, Kp, Ki)
+    
+    def frequency_response(self, freqs, output='position', Kp=None, Ki=None):
+        """
+        Resposta em frequência exata da MGRF para as 4 massas
+
+        Parameters
+        ----------
+        freqs : array_like
+            Frequências (Hz)
+        output : str
+            'position', 'velocity' ou 'acceleration'
+        Kp, Ki : array_like or None
+            Ganhos PI; malha aberta se None
+
+        Returns
+        -------
+        np.ndarray
+            H complexo (n_freqs, 4), ver ``modal.mgrf_response``
+        """
+        return mgrf_response(self.M, self.K, self.C, freqs, output, Kp, Ki)
+    
+    @staticmethod
+    def _as_dict(time, z):
+        result = {'time': time}
+        for j in range(4):
+            result[f'p{j + 1}'] = z[:, j]
+            result[f'v{j + 1}'] = z[:, j + 4]
+        return result
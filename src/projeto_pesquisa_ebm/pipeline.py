@@ -0,0 +1,343 @@
+"""
+Pipeline em lote sobre todos os sujeitos e velocidades do RBDS
+
+Para cada par (sujeito, velocidade) encontrado no diretório de dados:
+carregamento -> preenchimento de lacunas -> cinemática -> ajuste dos
+parâmetros de Liu & Nigg (2000) -> simulação com controladores PI. Os
+ensaios são processados em um pool de processos e o resultado é uma única
+tabela, uma linha por ensaio.
+
+Uso pela linha de comando::
+
+    python -m projeto_pesquisa_ebm.pipeline data/raw -o resultados.csv -j 8
+"""
+
+import argparse
+import re
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .experiment import PreparedExperiment
+from .gap_filling import RBDS_SEGMENTS, fill_gaps
+from .identification import (
+    PARAMETER_NAMES, equation_regressors, fit_joint, fit_sequential_lsq, segment_masses,
+)
+from .kinematics import marker_kinematics
+from .models import LiuNigg4MassModel
+from .spectral import band_power, welch_psd
+from .spectral_fit import fit_spectral
+from .synchronization import resample
+from .trial import AXES, VERTICAL_AXIS, Trial
+from .utils import get_data_path, load_subject_info, subject_metadata
+
+
+# Marcadores das 4 massas do modelo: pé, canela, coxa, crista ilíaca
+MODEL_MARKERS = ('R.MT1', 'R.Shank.Top.Medial', 'R.Thigh.Bottom.Lateral', 'R.Iliac.Crest')
+
+DEFAULT_BODY_MASS = 80.0  # kg, usado quando o sujeito não está na planilha
+DEFAULT_KP = (1e5, 5e4, 5e4, 5e4)
+DEFAULT_KI = (5e4, 5e3, 5e3, 5e3)
+FORCE_RATE = 300  # Hz
+FIT_METHODS = ('sequential', 'joint', 'spectral')
+SPECTRAL_CANDIDATES = 1000  # busca global do ajuste espectral
+
+# Marcadores do modelo e os demais dos seus segmentos (doadores do
+# preenchimento de lacunas por corpo rígido)
+LOADED_MARKERS = tuple(dict.fromkeys(
+    list(MODEL_MARKERS) + [m for members in RBDS_SEGMENTS.values()
+                           if set(members) & set(MODEL_MARKERS) for m in members]))
+
+_TRIAL_PATTERN = re.compile(r'RBDS(\d{3})runT(\d{2})(markers|forces)\.txt$')
+
+
+def discover_trials(data_dir):
+    """
+    Encontra todos os ensaios de corrida em um diretório de dados
+
+    Segue o padrão de nomes do RBDS: ``RBDS###runT{25,35,45}markers.txt``
+    e ``RBDS###runT{25,35,45}forces.txt``. Só ensaios com ambos os arquivos
+    são retornados.
+
+    Parameters
+    ----------
+    data_dir : str or Path
+        Diretório com os arquivos .txt
+
+    Returns
+    -------
+    list of dict
+        Um dicionário por ensaio com subject, speed, markers, forces e,
+        se existir, static
+    """
+    data_dir = Path(data_dir)
+    found = {}
+    for path in data_dir.iterdir():
+        match = _TRIAL_PATTERN.match(path.name)
+        if match is None:
+            continue
+        subject, speed, kind = int(match[1]), int(match[2]), match[3]
+        found.setdefault((subject, speed), {})[kind] = path
+
+    trials = []
+    for (subject, speed), files in sorted(found.items()):
+        if 'markers' not in files or 'forces' not in files:
+            continue
+        static = data_dir / f'RBDS{subject:03d}static.txt'
+        trials.append({
+            'subject': subject,
+            'speed': speed,
+            'markers': files['markers'],
+            'forces': files['forces'],
+            'static': static if static.exists() else None,
+        })
+    return trials
+
+
+def trial_kinematics(trial, markers=MODEL_MARKERS, method='savgol', **options):
+    """
+    Posição, velocidade e aceleração verticais das 4 massas do modelo
+
+    Parameters
+    ----------
+    trial : Trial
+        Ensaio carregado
+    markers : tuple of str
+        Marcadores das massas 1 a 4
+    method : str
+        Derivação (ver ``kinematics.marker_kinematics``);
+        'gradient' reproduz o ``np.gradient`` duplo dos notebooks
+    **options
+        Opções do método de derivação (window, cutoff, lam, ...)
+
+    Returns
+    -------
+    dict
+        time, p1..p4 (m), v1..v4 (m/s) e a1..a4 (m/s²)
+    """
+    time = np.arange(trial.n_frames) / trial.sampling_rate
+    block = trial.markers[:, [trial.marker_index[name] for name in markers]]
+    out = marker_kinematics(block, trial.sampling_rate, method=method, scale=1e-3, **options)
+    axis = AXES.index(VERTICAL_AXIS)
+    kin = {'time': time}
+    for j in range(len(markers)):
+        kin[f'p{j + 1}'] = out['position'][:, j, axis]
+        kin[f'v{j + 1}'] = out['velocity'][:, j, axis]
+        kin[f'a{j + 1}'] = out['acceleration'][:, j, axis]
+    return kin
+
+
+def trial_mgrf(trial, time, decimation='polyphase'):
+    """
+    Força vertical (Fy) reamostrada nos instantes dos marcadores
+
+    A plataforma (300 Hz) é reduzida à taxa dos marcadores com filtro
+    anti-aliasing; fora do intervalo gravado a força é nula.
+
+    Parameters
+    ----------
+    trial : Trial
+        Ensaio com a força Fy
+    time : np.ndarray
+        Instantes dos marcadores (s)
+    decimation : str or None
+        Filtro anti-aliasing (ver ``synchronization.resample``)
+
+    Returns
+    -------
+    np.ndarray
+        MGRF (N) em ``time``
+    """
+    MGRF = resample(trial.force('Fy'), trial.force_rate, time, decimation=decimation)
+    return np.nan_to_num(MGRF, nan=0.0)
+
+
+def process_trial(entry, metadata=None, Kp=DEFAULT_KP, Ki=DEFAULT_KI, g=9.81, fit='sequential'):
+    """
+    Processa um ensaio: cinemática, ajuste dos parâmetros e simulação
+
+    Parameters
+    ----------
+    entry : dict
+        Ensaio retornado por ``discover_trials``
+    metadata : dict or None
+        Informações do sujeito (usa a massa corporal 'Mass')
+    Kp, Ki : tuple
+        Ganhos dos controladores PI da simulação
+    g : float
+        Aceleração da gravidade (m/s², positiva = para baixo)
+    fit : str
+        'sequential' (``fit_sequential_lsq``), 'joint' (``fit_joint``) ou
+        'spectral' (``spectral_fit.fit_spectral``, com as posições sem
+        suavização)
+
+    Returns
+    -------
+    dict
+        Linha da tabela de resultados; erros são registrados na coluna
+        'error' em vez de interromper o lote (inclusive ensaios com
+        lacunas nos marcadores do modelo que não puderam ser preenchidas)
+    """
+    row = {'subject': entry['subject'], 'speed': entry['speed'],
+           'file': Path(entry['markers']).name}
+    start = time.perf_counter()
+    try:
+        metadata = metadata or {}
+        body_mass = float(metadata.get('Mass', DEFAULT_BODY_MASS))
+        masses = segment_masses(body_mass)
+        row['body_mass'] = body_mass
+
+        trial = Trial.from_files(entry['markers'], entry['forces'], markers=list(LOADED_MARKERS),
+                                 force_rate=FORCE_RATE, metadata=metadata)
+        trial.markers, gaps = fill_gaps(trial.markers, trial.sampling_rate, trial.marker_names,
+                                        RBDS_SEGMENTS)
+        model_gaps = gaps.loc[list(MODEL_MARKERS)]
+        row['missing_frames'] = int(model_gaps['missing'].sum())
+        row['longest_gap_s'] = float(model_gaps['longest_gap'].max())
+        if model_gaps['remaining'].any():
+            raise ValueError(f"lacunas não preenchidas em "
+                             f"{list(model_gaps.index[model_gaps['remaining'] > 0])}")
+        kin = trial_kinematics(trial)
+        MGRF = trial_mgrf(trial, kin['time'])
+        accelerations = np.column_stack([kin[f'a{j}'] for j in range(1, 5)])
+        bands = band_power(*welch_psd(accelerations, trial.sampling_rate))
+        for j in range(4):
+            row[f'active_power_a{j + 1}'] = float(bands['active'][j])
+            row[f'impact_power_a{j + 1}'] = float(bands['impact'][j])
+
+        if fit == 'joint':
+            params, info = fit_joint(kin, MGRF, masses, g=g, full_output=True)
+            sse = info['sse'][:3]
+        elif fit == 'spectral':
+            raw = trial_kinematics(trial, method='gradient')
+            params = fit_spectral(raw, MGRF, masses, n_candidates=SPECTRAL_CANDIDATES, seed=0)
+            # SSE das equações no tempo, comparável com os outros ajustes
+            theta = np.array([params[name] for name in PARAMETER_NAMES])
+            sse = [np.sum((y - Phi @ theta)**2)
+                   for Phi, y in equation_regressors(kin, MGRF, masses, g)[:3]]
+        else:
+            params, stages = fit_sequential_lsq(kin, MGRF, masses, g=g, full_output=True)
+            sse = [stage['sse'] for stage in stages]
+        row.update(params)
+        for j, value in enumerate(sse):
+            row[f'sse_{j}'] = float(value)
+
+        model = LiuNigg4MassModel(*masses, **params, g=g)
+        modes = model.modal_analysis()
+        row['open_loop_stable'] = bool(modes['stable'])
+        for j, frequency in enumerate(modes['natural_frequency']):
+            row[f'fn_{j}'] = float(frequency)
+
+        experiment = PreparedExperiment.from_kinematics(kin, MGRF)
+        sim = experiment.simulate(model, Kp, Ki, method='exact')
+        for j in range(1, 5):
+            error = sim[f'p{j}'] - experiment.p_ref[:, j - 1]
+            row[f'rmse_p{j}'] = float(np.sqrt(np.mean(error**2)))
+        row['error'] = ''
+    except Exception:
+        row['error'] = traceback.format_exc(limit=1).strip().splitlines()[-1]
+    row['elapsed_s'] = time.perf_counter() - start
+    return row
+
+
+def _process_entry(args):
+    return process_trial(*args)
+
+
+def run_pipeline(data_dir, output=None, jobs=None, info_path=None, subjects=None,
+                 speeds=None, fit='sequential'):
+    """
+    Executa o pipeline sobre todos os ensaios de um diretório
+
+    Parameters
+    ----------
+    data_dir : str or Path
+        Diretório com os arquivos .txt do RBDS
+    output : str, Path or None
+        Arquivo .csv de saída; nada é gravado se None
+    jobs : int or None
+        Número de processos; todos os núcleos se None, sem pool se 1
+    info_path : str, Path or None
+        Planilha de informações dos participantes; a padrão do projeto se
+        None (ensaios sem metadados usam a massa ``DEFAULT_BODY_MASS``)
+    subjects : list of int or None
+        Restringe aos sujeitos indicados
+    speeds : list of int or None
+        Restringe às velocidades indicadas (25, 35, 45)
+    fit : str
+        Método de ajuste dos parâmetros (``FIT_METHODS``)
+
+    Returns
+    -------
+    pd.DataFrame
+        Tabela de resultados, uma linha por ensaio
+    """
+    if fit not in FIT_METHODS:
+        raise ValueError(f"fit deve ser um de {FIT_METHODS}, recebido {fit!r}")
+    entries = discover_trials(data_dir)
+    if subjects:
+        entries = [e for e in entries if e['subject'] in subjects]
+    if speeds:
+        entries = [e for e in entries if e['speed'] in speeds]
+
+    try:
+        info = load_subject_info(info_path)
+    except (FileNotFoundError, ImportError):
+        info = None
+
+    tasks = []
+    for entry in entries:
+        metadata = None
+        if info is not None:
+            try:
+                metadata = subject_metadata(info, entry['subject'])
+            except KeyError:
+                metadata = None
+        tasks.append((entry, metadata, DEFAULT_KP, DEFAULT_KI, 9.81, fit))
+
+    if jobs == 1 or len(tasks) <= 1:
+        rows = [_process_entry(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            rows = list(pool.map(_process_entry, tasks))
+
+    results = pd.DataFrame(rows)
+    if output is not None:
+        Path(output).parent.mkdir(parents=True, exist_ok=True)
+        results.to_csv(output, index=False)
+    return results
+
+
+def main(argv=None):
+    """Ponto de entrada da linha de comando"""
+    parser = argparse.ArgumentParser(
+        description='Processa todos os ensaios RBDS de um diretório (Liu & Nigg 2000)')
+    parser.add_argument('data_dir', nargs='?', default=str(get_data_path('')),
+                        help='diretório com os arquivos .txt (padrão: data/raw)')
+    parser.add_argument('-o', '--output', default=str(get_data_path('rbds_results.csv',
+                                                                      'processed')),
+                        help='arquivo .csv de saída')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='número de processos (padrão: todos os núcleos)')
+    parser.add_argument('--info', default=None,
+                        help='planilha RBDSinfo com os metadados dos sujeitos')
+    parser.add_argument('--subjects', type=int, nargs='*', help='sujeitos a processar')
+    parser.add_argument('--speeds', type=int, nargs='*', help='velocidades (25, 35, 45)')
+    parser.add_argument('--fit', choices=FIT_METHODS, default='sequential',
+                        help='ajuste sequencial (como nos notebooks), simultâneo ou '
+                             'espectral')
+    args = parser.parse_args(argv)
+
+    results = run_pipeline(args.data_dir, args.output, jobs=args.jobs, info_path=args.info,
+                           subjects=args.subjects, speeds=args.speeds, fit=args.fit)
+    n_errors = int((results['error'] != '').sum()) if len(results) else 0
+    print(f"{len(results)} ensaios processados ({n_errors} com erro) -> {args.output}")
+    return 0 if n_errors == 0 else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,197 @@
+"""
+Análise espectral em lote: PSD, CSD e coerência pelo método de Welch
+
+Todos os canais de um ensaio (ou vários ensaios empilhados) são
+segmentados, janelados e transformados em uma única chamada ao longo de um
+eixo; a janela, a escala e o vetor de frequências são calculados uma vez
+por configuração (nperseg, taxa, janela) e reaproveitados. As convenções
+são as de ``scipy.signal.welch`` / ``csd`` (detrend constante, densidade
+unilateral, média dos segmentos).
+
+As potências em bandas seguem a literatura de vibração dos tecidos moles
+na corrida (Nikooyan & Zadpoor 2011; Nedergaard 2018): banda ativa
+(< 10 Hz, movimento voluntário) e banda de impacto (10-20 Hz).
+"""
+
+from functools import lru_cache
+
+import numpy as np
+from scipy.signal import get_window
+
+
+BANDS = {'active': (0.0, 10.0), 'impact': (10.0, 20.0)}  # Hz
+
+
+@lru_cache(maxsize=32)
+def welch_plan(nperseg, rate, window='hann'):
+    """
+    Janela, escala da densidade e frequências de uma configuração de Welch
+
+    Parameters
+    ----------
+    nperseg : int
+        Amostras por segmento
+    rate : float
+        Taxa de amostragem (Hz)
+    window : str
+        Janela de ``scipy.signal.get_window``
+
+    Returns
+    -------
+    tuple
+        (janela (nperseg,), escala, frequências (nperseg // 2 + 1,)); os
+        arrays são somente leitura porque ficam em cache
+    """
+    win = get_window(window, nperseg)
+    scale = 1.0 / (rate * np.sum(win**2))
+    freqs = np.fft.rfftfreq(nperseg, 1.0 / rate)
+    win.flags.writeable = False
+    freqs.flags.writeable = False
+    return win, scale, freqs
+
+
+def _spectra(x, rate, nperseg, noverlap, window, axis):
+    """FFT janelada dos segmentos: (..., n_segments, n_freqs) com o eixo do tempo no fim"""
+    x = np.moveaxis(np.asarray(x, dtype=float), axis, -1)
+    n = x.shape[-1]
+    nperseg = min(nperseg, n)
+    noverlap = nperseg // 2 if noverlap is None else noverlap
+    if not 0 <= noverlap < nperseg:
+        raise ValueError(f"noverlap deve estar em [0, nperseg) com nperseg={nperseg} "
+                         f"(limitado ao tamanho do sinal), recebido {noverlap}")
+    win, scale, freqs = welch_plan(nperseg, float(rate), window)
+    step = nperseg - noverlap
+    segments = np.lib.stride_tricks.sliding_window_view(x, nperseg, axis=-1)[..., ::step, :]
+    segments = segments - segments.mean(axis=-1, keepdims=True)
+    return freqs, np.fft.rfft(segments * win, axis=-1), scale, nperseg
+
+
+def _one_sided(P, nperseg, axis=-1):
+    """Dobra as frequências positivas (exceto DC e, com nperseg par, Nyquist)"""
+    index = [slice(None)] * P.ndim
+    index[axis] = slice(1, -1 if nperseg % 2 == 0 else None)
+    P[tuple(index)] *= 2
+    return P
+
+
+def welch_psd(x, rate, nperseg=256, noverlap=None, window='hann', axis=0):
+    """
+    Densidade espectral de potência de todos os canais em uma chamada
+
+    Parameters
+    ----------
+    x : np.ndarray
+        Sinais com o tempo no eixo ``axis``, por exemplo (n, 4) para
+        p1..p4 ou (n_trials, n, n_channels) com axis=1
+    rate : float
+        Taxa de amostragem (Hz)
+    nperseg : int
+        Amostras por segmento (limitado ao tamanho do sinal)
+    noverlap : int or None
+        Sobreposição, em [0, nperseg); nperseg // 2 se None
+    window : str
+        Janela
+    axis : int
+        Eixo do tempo
+
+    Returns
+    -------
+    tuple
+        (freqs, psd), psd com o eixo do tempo substituído pelo das
+        frequências (unidade²/Hz)
+
+    Raises
+    ------
+    ValueError
+        Se noverlap não estiver em [0, nperseg) após limitar nperseg
+    """
+    freqs, X, scale, nperseg = _spectra(x, rate, nperseg, noverlap, window, axis)
+    P = _one_sided(np.mean(np.abs(X)**2, axis=-2) * scale, nperseg)
+    return freqs, np.moveaxis(P, -1, axis)
+
+
+def cross_spectral_matrix(x, rate, nperseg=256, noverlap=None, window='hann', axis=0):
+    """
+    Matriz de densidades espectrais cruzadas entre todos os canais
+
+    S[..., f, i, j] é a CSD de x_i para x_j (convenção de
+    ``scipy.signal.csd(x_i, x_j)``: média de conj(X_i) X_j); a diagonal é a
+    PSD de cada canal.
+
+    Parameters
+    ----------
+    x : np.ndarray
+        Sinais (..., n, n_channels) com o tempo no eixo ``axis`` e os
+        canais no último eixo
+    rate : float
+        Taxa de amostragem (Hz)
+    nperseg, noverlap, window
+        Ver ``welch_psd``
+    axis : int
+        Eixo do tempo (não pode ser o último)
+
+    Returns
+    -------
+    tuple
+        (freqs, S) com S complexo (..., n_freqs, n_channels, n_channels)
+    """
+    x = np.asarray(x, dtype=float)
+    axis = axis % x.ndim
+    if axis == x.ndim - 1:
+        raise ValueError("O último eixo deve ser o dos canais")
+    # Canais antes do tempo: (..., n_channels, n) -> X (..., n_channels, n_seg, n_freqs)
+    freqs, X, scale, nperseg = _spectra(np.moveaxis(x, -1, axis), rate, nperseg, noverlap,
+                                        window, axis + 1)
+    S = np.einsum('...isf,...jsf->...fij', X.conj(), X) * (scale / X.shape[-2])
+    return freqs, _one_sided(S, nperseg, axis=-3)
+
+
+def coherence(S):
+    """
+    Coerência quadrática |S_ij|² / (S_ii S_jj) a partir da matriz de CSD
+
+    Parameters
+    ----------
+    S : np.ndarray
+        Matriz de ``cross_spectral_matrix`` (..., n_freqs, n, n)
+
+    Returns
+    -------
+    np.ndarray
+        Coerência real em [0, 1], mesma forma de S
+    """
+    power = np.real(np.diagonal(S, axis1=-2, axis2=-1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.abs(S)**2 / (power[..., :, None] * power[..., None, :])
+
+
+def band_power(freqs, psd, bands=None, axis=0):
+    """
+    Potência integrada em bandas de frequência
+
+    Parameters
+    ----------
+    freqs : np.ndarray
+        Frequências (Hz) de ``welch_psd``
+    psd : np.ndarray
+        Densidades com as frequências no eixo ``axis``
+    bands : dict or None
+        nome -> (f_min, f_max) em Hz, intervalo [f_min, f_max); ``BANDS``
+        (ativa < 10 Hz, impacto 10-20 Hz) se None
+    axis : int
+        Eixo das frequências em ``psd`` (o mesmo ``axis`` de ``welch_psd``)
+
+    Returns
+    -------
+    dict
+        nome -> potência (unidade²), com a forma de psd sem o eixo
+        ``axis``; também 'total' (todas as frequências)
+    """
+    psd = np.moveaxis(np.asarray(psd), axis, -1)
+    df = freqs[1] - freqs[0] if len(freqs) > 1 else 0.0
+    out = {}
+    for name, (low, high) in dict(BANDS if bands is None else bands).items():
+        mask = (freqs >= low) & (freqs < high)
+        out[name] = psd[..., mask].sum(axis=-1) * df
+    out['total'] = psd.sum(axis=-1) * df
+    return out
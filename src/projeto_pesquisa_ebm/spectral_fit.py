@@ -0,0 +1,182 @@
+"""
+Identificação dos parâmetros de Liu & Nigg no domínio da frequência
+
+Em vez dos resíduos das equações de movimento no tempo, o ajuste compara
+as funções de transferência MGRF -> p1..p4 do modelo (exatas, de
+``modal.mgrf_response``) com as estimadas dos sinais medidos pelas
+densidades espectrais cruzadas (estimador H1 = S_fp / S_ff), como nas
+comparações espectrais de modelos de vibração dos tecidos moles (Nikooyan
+& Zadpoor 2011; Nedergaard 2018).
+
+O resíduo de cada frequência é o erro complexo relativo ponderado pela
+raiz da coerência, de modo que as bandas em que a MGRF explica pouco do
+movimento dos marcadores pesam menos. Avaliar o objetivo custa alguns
+sistemas 4x4 por frequência e é vetorizado sobre lotes de parâmetros:
+milhares de candidatos são avaliados em uma chamada, o que torna viável
+uma busca global (multistart) em cada ensaio da coorte.
+"""
+
+import numpy as np
+from scipy.optimize import least_squares
+
+from .identification import DEFAULT_BOUNDS, DEFAULT_GUESS, PARAMETER_NAMES
+from .integrators import grid_step
+from .modal import mgrf_response, model_matrices
+from .spectral import coherence, cross_spectral_matrix
+
+
+FIT_BAND = (1.0, 20.0)  # Hz, banda ativa e de impacto (spectral.BANDS)
+
+
+def measured_response(kin, MGRF, rate, nperseg=256, noverlap=None):
+    """
+    Funções de transferência MGRF -> p1..p4 estimadas dos sinais medidos
+
+    As posições dos marcadores são positivas para cima e o modelo é
+    positivo para baixo, então o sinal das posições é invertido.
+
+    Parameters
+    ----------
+    kin : dict
+        Cinemática com p1..p4 (m)
+    MGRF : np.ndarray
+        Força de reação do solo no tempo dos marcadores (N)
+    rate : float
+        Taxa de amostragem (Hz)
+    nperseg, noverlap
+        Segmentos de Welch (ver ``spectral.welch_psd``)
+
+    Returns
+    -------
+    tuple
+        (freqs, H, coerência): H complexo (n_freqs, 4) em m/N e a
+        coerência MGRF-p_j (n_freqs, 4)
+    """
+    x = np.column_stack([MGRF] + [-kin[f'p{j}'] for j in range(1, 5)])
+    freqs, S = cross_spectral_matrix(x, rate, nperseg=nperseg, noverlap=noverlap)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        H = S[:, 0, 1:] / S[:, 0, :1]
+    return freqs, H, coherence(S)[:, 0, 1:]
+
+
+def spectral_residuals(theta, freqs, H, weights, masses):
+    """
+    Erro complexo relativo entre o modelo e as funções de transferência medidas
+
+    Parameters
+    ----------
+    theta : array_like
+        Parâmetros (8,) ou lote (N, 8) na ordem de ``PARAMETER_NAMES``
+    freqs : np.ndarray
+        Frequências (Hz), > 0
+    H : np.ndarray
+        Funções de transferência medidas (n_freqs, 4)
+    weights : np.ndarray
+        Pesos (n_freqs, 4), por exemplo a raiz da coerência
+    masses : tuple
+        (m1, m2, m3, m4) em kg
+
+    Returns
+    -------
+    np.ndarray
+        Partes real e imaginária empilhadas, (2 n_freqs 4,) ou
+        (N, 2 n_freqs 4)
+    """
+    theta = np.asarray(theta, dtype=float)
+    model = mgrf_response(*model_matrices(np.atleast_2d(theta), masses), freqs)
+    error = (weights / np.abs(H)) * (model - H)
+    r = np.concatenate([error.real, error.imag], axis=-1).reshape(len(model), -1)
+    return r[0] if theta.ndim == 1 else r
+
+
+def spectral_cost(theta, freqs, H, weights, masses):
+    """
+    Soma dos quadrados de ``spectral_residuals`` para um lote de parâmetros
+
+    Returns
+    -------
+    np.ndarray
+        Custo (N,) para theta (N, 8) ou escalar para theta (8,)
+    """
+    return np.sum(spectral_residuals(theta, freqs, H, weights, masses)**2, axis=-1)
+
+
+def fit_spectral(kin, MGRF, masses, rate=None, bounds=None, x0=None, band=FIT_BAND,
+                 nperseg=256, n_candidates=0, seed=None, full_output=False):
+    """
+    Ajuste dos 8 parâmetros pelas funções de transferência MGRF -> p1..p4
+
+    As posições devem ser as medidas, sem suavização (por exemplo
+    ``pipeline.trial_kinematics(trial, method='gradient')``): o filtro de
+    Savitzky-Golay atenua a banda de impacto e distorceria a magnitude
+    medida. Com ``n_candidates`` > 0, os candidatos sorteados
+    uniformemente nos limites (e o chute inicial) são avaliados em lote e
+    o melhor inicia ``scipy.optimize.least_squares``.
+
+    Parameters
+    ----------
+    kin : dict
+        Cinemática com time e p1..p4
+    MGRF : np.ndarray
+        Força de reação do solo no tempo dos marcadores (N)
+    masses : tuple
+        (m1, m2, m3, m4) em kg
+    rate : float or None
+        Taxa de amostragem (Hz); estimada de kin['time'] se None
+    bounds : dict or None
+        Limites por parâmetro; ``DEFAULT_BOUNDS`` se None
+    x0 : dict or None
+        Chutes iniciais por parâmetro; ``DEFAULT_GUESS`` se None
+    band : tuple
+        (f_min, f_max) em Hz das frequências ajustadas, f_min > 0
+    nperseg : int
+        Amostras por segmento de Welch
+    n_candidates : int
+        Candidatos da busca global antes do ajuste local
+    seed : int or None
+        Semente do sorteio dos candidatos
+    full_output : bool
+        Se True, retorna também as funções de transferência e o resultado
+        do otimizador
+
+    Returns
+    -------
+    dict or tuple
+        Parâmetros k1..k5, c1, c2, c4; com full_output, (params, info),
+        onde info tem cost, freqs, H_measured, H_model, coherence, nfev,
+        status e message
+    """
+    bounds = {**DEFAULT_BOUNDS, **(bounds or {})}
+    x0 = {**DEFAULT_GUESS, **(x0 or {})}
+    lb, ub = np.array([bounds[n] for n in PARAMETER_NAMES], dtype=float).T
+    theta0 = np.clip([x0[n] for n in PARAMETER_NAMES], lb, ub)
+    if rate is None:
+        rate = 1.0 / grid_step(kin['time'])
+
+    freqs, H, coh = measured_response(kin, MGRF, rate, nperseg=nperseg)
+    mask = (freqs >= band[0]) & (freqs < band[1])
+    freqs, H, coh = freqs[mask], H[mask], coh[mask]
+    weights = np.sqrt(coh)
+
+    if n_candidates > 0:
+        rng = np.random.default_rng(seed)
+        candidates = np.vstack([theta0, lb + (ub - lb) * rng.random((n_candidates, len(lb)))])
+        theta0 = candidates[np.argmin(spectral_cost(candidates, freqs, H, weights, masses))]
+
+    sol = least_squares(spectral_residuals, theta0, args=(freqs, H, weights, masses),
+                        bounds=(lb, ub), method='trf', x_scale='jac')
+    params = {n: float(v) for n, v in zip(PARAMETER_NAMES, sol.x)}
+    if not full_output:
+        return params
+
+    info = {
+        'cost': 2 * sol.cost,
+        'freqs': freqs,
+        'H_measured': H,
+        'H_model': mgrf_response(*model_matrices(sol.x, masses), freqs)[0],
+        'coherence': coh,
+        'nfev': sol.nfev,
+        'status': sol.status,
+        'message': sol.message,
+    }
+    return params, info
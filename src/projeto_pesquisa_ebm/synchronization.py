@@ -0,0 +1,212 @@
+"""
+Sincronização de canais amostrados em taxas diferentes
+
+Marcadores (150 Hz) e plataforma de força (300 Hz) são levados a uma base
+de tempo comum em uma única chamada: canais com a mesma taxa e o mesmo
+deslocamento são processados juntos, como colunas de um único array.
+
+- Redução de taxa com filtro anti-aliasing: polifásica
+  (``scipy.signal.resample_poly``) ou Butterworth de fase zero seguido de
+  interpolação
+- Aumento de taxa por interpolação linear ou spline cúbica
+- Deslocamentos de tempo explícitos por canal (atrasos entre sistemas)
+"""
+
+from fractions import Fraction
+
+import numpy as np
+from scipy.interpolate import CubicSpline
+from scipy.signal import butter, resample_poly, sosfiltfilt
+
+
+INTERPOLATION_METHODS = ('linear', 'cubic')
+DECIMATION_METHODS = ('polyphase', 'filter', None)
+
+
+def _interpolate(x, t0, rate, time, method='linear'):
+    """Interpola as colunas de x (amostras em t0 + i/rate) nos instantes time"""
+    n = x.shape[0]
+    if method == 'cubic':
+        return CubicSpline(t0 + np.arange(n) / rate, x, axis=0, extrapolate=False)(time)
+    # Índices e pesos calculados uma vez e aplicados a todas as colunas
+    pos = (time - t0) * rate
+    i = np.clip(np.floor(pos).astype(np.intp), 0, n - 2)
+    w = (pos - i)[:, None]
+    out = x[i] * (1.0 - w) + x[i + 1] * w
+    out[(pos < -1e-9) | (pos > n - 1 + 1e-9)] = np.nan
+    return out
+
+
+def _decimate(x, rate, target_rate, method='polyphase', order=4):
+    """Filtra (e, se polifásico, reamostra) x para a taxa alvo; retorna (y, nova taxa)"""
+    if method == 'polyphase':
+        ratio = Fraction(target_rate / rate).limit_denominator(1000)
+        y = resample_poly(x, ratio.numerator, ratio.denominator, axis=0, padtype='line')
+        return y, rate * ratio.numerator / ratio.denominator
+    # Butterworth de fase zero com corte em 80% da nova frequência de Nyquist
+    sos = butter(order, 0.8 * target_rate / rate, output='sos')
+    return sosfiltfilt(sos, x, axis=0), rate
+
+
+def resample(data, rate, time, offset=0.0, method='linear', decimation='polyphase'):
+    """
+    Reamostra um canal (ou um bloco de canais) em instantes arbitrários
+
+    Parameters
+    ----------
+    data : np.ndarray
+        Amostras (n, ...) tomadas em ``offset + i / rate``
+    rate : float
+        Taxa de amostragem original (Hz)
+    time : np.ndarray
+        Instantes de saída (s), uniformes quando há redução de taxa
+    offset : float
+        Instante da primeira amostra (s)
+    method : str
+        Interpolação: 'linear' ou 'cubic'
+    decimation : str or None
+        Filtro anti-aliasing quando a taxa de saída é menor: 'polyphase',
+        'filter' (Butterworth de fase zero) ou None (sem filtro)
+
+    Returns
+    -------
+    np.ndarray
+        Amostras (len(time), ...); NaN fora do intervalo dos dados
+    """
+    if method not in INTERPOLATION_METHODS:
+        raise ValueError(f"method deve ser um de {INTERPOLATION_METHODS}, recebido {method!r}")
+    if decimation not in DECIMATION_METHODS:
+        raise ValueError(f"decimation deve ser um de {DECIMATION_METHODS}, "
+                         f"recebido {decimation!r}")
+    data = np.asarray(data, dtype=float)
+    time = np.asarray(time, dtype=float)
+    x = data.reshape(len(data), -1)
+    rate = float(rate)
+    if decimation is not None and len(time) > 1:
+        target_rate = (len(time) - 1) / (time[-1] - time[0])
+        if target_rate < rate * (1 - 1e-9):
+            x, rate = _decimate(x, rate, target_rate, decimation)
+    out = _interpolate(x, offset, rate, time, method)
+    return out.reshape((len(time),) + data.shape[1:])
+
+
+def common_time(channels, rate, span='overlap'):
+    """
+    Base de tempo uniforme comum a vários canais
+
+    Parameters
+    ----------
+    channels : dict
+        nome -> (data, rate) ou (data, rate, offset)
+    rate : float
+        Taxa da base comum (Hz)
+    span : str
+        'overlap' (intervalo em que todos os canais têm dados) ou 'union'
+
+    Returns
+    -------
+    np.ndarray
+        Instantes da base comum (s)
+    """
+    starts, stops = [], []
+    for spec in channels.values():
+        data, channel_rate = spec[0], spec[1]
+        offset = spec[2] if len(spec) > 2 else 0.0
+        starts.append(offset)
+        stops.append(offset + (len(data) - 1) / channel_rate)
+    if span == 'overlap':
+        start, stop = max(starts), min(stops)
+    elif span == 'union':
+        start, stop = min(starts), max(stops)
+    else:
+        raise ValueError(f"span deve ser 'overlap' ou 'union', recebido {span!r}")
+    if stop < start:
+        raise ValueError("Os canais não se sobrepõem no tempo")
+    n = int(np.floor((stop - start) * rate + 1e-9)) + 1
+    return start + np.arange(n) / rate
+
+
+def synchronize(channels, rate=None, span='overlap', method='linear',
+                decimation='polyphase'):
+    """
+    Leva vários canais a uma base de tempo comum em uma única chamada
+
+    Canais com a mesma taxa e o mesmo deslocamento são empilhados e
+    reamostrados juntos (filtro e pesos de interpolação calculados uma vez).
+
+    Parameters
+    ----------
+    channels : dict
+        nome -> (data, rate) ou (data, rate, offset); data com forma
+        (n, ...), por exemplo (n,) para Fy ou (n, n_markers, 3)
+    rate : float or None
+        Taxa da base comum (Hz); a menor taxa entre os canais se None
+    span : str
+        'overlap' ou 'union' (ver ``common_time``)
+    method : str
+        Interpolação para aumento de taxa e alinhamento: 'linear' ou 'cubic'
+    decimation : str or None
+        Filtro anti-aliasing para redução de taxa (ver ``resample``)
+
+    Returns
+    -------
+    tuple
+        (time, dict nome -> array (len(time), ...))
+
+    Examples
+    --------
+    >>> time, out = synchronize({'markers': (trial.markers, 150),
+    ...                          'Fy': (trial.force('Fy'), 300, 0.002)})
+    """
+    if rate is None:
+        rate = min(float(spec[1]) for spec in channels.values())
+    time = common_time(channels, rate, span)
+
+    groups = {}
+    for name, spec in channels.items():
+        data = np.asarray(spec[0], dtype=float)
+        key = (float(spec[1]), float(spec[2]) if len(spec) > 2 else 0.0, len(data))
+        groups.setdefault(key, []).append((name, data))
+
+    out = {}
+    for (channel_rate, offset, n), members in groups.items():
+        widths = [int(np.prod(data.shape[1:], dtype=int)) for _, data in members]
+        block = np.concatenate([data.reshape(n, -1) for _, data in members], axis=1)
+        resampled = resample(block, channel_rate, time, offset, method, decimation)
+        bounds = np.cumsum([0] + widths)
+        for (name, data), a, b in zip(members, bounds[:-1], bounds[1:]):
+            out[name] = resampled[:, a:b].reshape((len(time),) + data.shape[1:])
+    return time, out
+
+
+def synchronize_trial(trial, rate=None, force_offset=0.0, method='linear',
+                      decimation='polyphase'):
+    """
+    Alinha marcadores e plataforma de força de um ensaio
+
+    Parameters
+    ----------
+    trial : Trial
+        Ensaio com marcadores e, opcionalmente, forças
+    rate : float or None
+        Taxa da base comum (Hz); a dos marcadores se None
+    force_offset : float
+        Instante da primeira amostra de força (s); 0 como em
+        ``Trial.force_time``, positivo se a plataforma começou depois
+    method : str
+        Interpolação: 'linear' ou 'cubic'
+    decimation : str or None
+        Filtro anti-aliasing para redução de taxa
+
+    Returns
+    -------
+    tuple
+        (time, markers (n, n_markers, 3), forces (n, n_channels) ou None)
+    """
+    t0 = float(trial.time[0])
+    channels = {'markers': (trial.markers, trial.sampling_rate, t0)}
+    if trial.forces is not None:
+        channels['forces'] = (trial.forces, trial.force_rate, force_offset)
+    time, out = synchronize(channels, rate or trial.sampling_rate, method=method,
+                            decimation=decimation)
+    return time, out['markers'], out.get('forces')
@@ -0,0 +1,248 @@
+"""
+Estrutura de dados para um ensaio (trial) de corrida do RBDS
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+from .integrators import grid_step
+from .kinematics import marker_kinematics
+from .utils import _marker_columns, load_forces_data, load_markers_data
+
+
+AXES = 'XYZ'
+VERTICAL_AXIS = 'Y'  # eixo Y = vertical (Fukuchi 2017)
+
+
+class Trial:
+    """
+    Ensaio com marcadores, plataforma de força e metadados do sujeito
+
+    Os marcadores ficam em um único array contíguo (n_frames, n_markers, 3)
+    com um mapa nome -> índice, de modo que extrair um marcador ou um eixo
+    é uma view, sem cópia (ao contrário de ``data[['R.MT1X', ...]].values``).
+    """
+
+    def __init__(self, markers, marker_names, time, sampling_rate=None, forces=None,
+                 force_channels=None, force_rate=None, metadata=None, name=None):
+        """
+        Inicializa o ensaio
+
+        Parameters
+        ----------
+        markers : np.ndarray
+            Posições dos marcadores (n_frames, n_markers, 3), em mm
+        marker_names : list of str
+            Nomes dos marcadores, na ordem do segundo eixo de ``markers``
+        time : np.ndarray
+            Vetor de tempo dos marcadores (s)
+        sampling_rate : float or None
+            Taxa de amostragem dos marcadores (Hz); estimada de ``time`` se None
+        forces : np.ndarray or None
+            Canais da plataforma de força (n_samples, n_channels)
+        force_channels : list of str or None
+            Nomes dos canais de força (por exemplo ['Fx', 'Fy', 'Fz', ...])
+        force_rate : float or None
+            Taxa de amostragem da plataforma de força (Hz)
+        metadata : dict or None
+            Informações do sujeito (idade, massa, altura, ...)
+        name : str or None
+            Identificação do ensaio (por exemplo 'RBDS002runT25')
+        """
+        markers = np.ascontiguousarray(markers)
+        if markers.ndim != 3 or markers.shape[2] != 3:
+            raise ValueError(f"markers deve ter forma (n_frames, n_markers, 3), "
+                             f"recebido {markers.shape}")
+        if len(marker_names) != markers.shape[1]:
+            raise ValueError("marker_names deve ter um nome por marcador")
+        self.markers = markers
+        self.marker_names = list(marker_names)
+        self.marker_index = {m: i for i, m in enumerate(self.marker_names)}
+        self.time = np.asarray(time, dtype=float)
+        if sampling_rate is None:
+            # Time é arredondado em ms: 29.993 s em vez de 29.99333 s
+            sampling_rate = np.round(1.0 / grid_step(self.time), 1)
+        self.sampling_rate = float(sampling_rate)
+
+        self.forces = None if forces is None else np.ascontiguousarray(forces)
+        self.force_channels = list(force_channels or [])
+        self.force_index = {c: i for i, c in enumerate(self.force_channels)}
+        self.force_rate = None if force_rate is None else float(force_rate)
+        self.metadata = dict(metadata or {})
+        self.name = name
+
+    @property
+    def n_frames(self):
+        """Número de quadros dos marcadores"""
+        return self.markers.shape[0]
+
+    @property
+    def n_markers(self):
+        """Número de marcadores"""
+        return self.markers.shape[1]
+
+    @property
+    def force_time(self):
+        """Vetor de tempo da plataforma de força (s), começando em 0"""
+        if self.forces is None:
+            return None
+        return np.arange(self.forces.shape[0]) / self.force_rate
+
+    def marker(self, name):
+        """
+        Trajetória 3D de um marcador (view, sem cópia)
+
+        Parameters
+        ----------
+        name : str
+            Nome do marcador (por exemplo 'R.MT1')
+
+        Returns
+        -------
+        np.ndarray
+            View (n_frames, 3)
+        """
+        return self.markers[:, self.marker_index[name], :]
+
+    def position(self, name, axis=VERTICAL_AXIS, scale=1.0):
+        """
+        Coordenada de um marcador em um eixo
+
+        Parameters
+        ----------
+        name : str
+            Nome do marcador
+        axis : str
+            'X', 'Y' ou 'Z' (padrão: eixo vertical Y)
+        scale : float
+            Fator de escala; 1.0 devolve uma view sem cópia, 1e-3 converte
+            mm para m (gera um novo array)
+
+        Returns
+        -------
+        np.ndarray
+            Array (n_frames,)
+        """
+        view = self.markers[:, self.marker_index[name], AXES.index(axis)]
+        return view if scale == 1.0 else view * scale
+
+    def force(self, channel):
+        """
+        Canal da plataforma de força (view, sem cópia)
+
+        Parameters
+        ----------
+        channel : str
+            Nome do canal (por exemplo 'Fy' = força vertical)
+
+        Returns
+        -------
+        np.ndarray
+            View (n_samples,)
+        """
+        if self.forces is None:
+            raise ValueError("Ensaio sem dados de força")
+        return self.forces[:, self.force_index[channel]]
+
+    def kinematics(self, segments=None, method='gradient', scale=1e-3, out=None, **options):
+        """
+        Posição, velocidade e aceleração de todos os marcadores e centroides
+
+        Parameters
+        ----------
+        segments : dict or None
+            nome -> marcadores de cada centroide, por exemplo
+            ``{'trunk': kinematics.TRUNK_MARKERS}``
+        method : str
+            Derivação (ver ``kinematics.marker_kinematics``)
+        scale : float
+            Fator aplicado às posições (padrão: mm para m)
+        out : tuple of np.ndarray or None
+            Buffers (posição, velocidade, aceleração) reaproveitados
+        **options
+            Opções do método de derivação
+
+        Returns
+        -------
+        dict
+            Resultado de ``kinematics.marker_kinematics``
+        """
+        return marker_kinematics(self.markers, self.sampling_rate, self.marker_names,
+                                 segments, method, scale, out, **options)
+
+    @classmethod
+    def from_dataframes(cls, markers_df, forces_df=None, markers=None, force_rate=300,
+                        dtype=np.float64, metadata=None, name=None):
+        """
+        Cria o ensaio a partir dos DataFrames largos dos arquivos RBDS
+
+        Parameters
+        ----------
+        markers_df : pd.DataFrame
+            Dados de markers (coluna Time + '<marker>X/Y/Z')
+        forces_df : pd.DataFrame or None
+            Dados de força (coluna Time = índice da amostra + canais)
+        markers : list of str or None
+            Marcadores a manter; todos se None
+        force_rate : float
+            Taxa de amostragem da plataforma de força (Hz)
+        dtype : np.dtype
+            Tipo do array de marcadores
+        metadata : dict or None
+            Informações do sujeito
+        name : str or None
+            Identificação do ensaio
+
+        Returns
+        -------
+        Trial
+        """
+        columns = _marker_columns(list(markers_df.columns), markers, AXES)[1:]
+        names = [c[:-1] for c in columns[::3]]
+        values = markers_df[columns].to_numpy(dtype=dtype)
+        forces = channels = None
+        if forces_df is not None:
+            channels = [c for c in forces_df.columns if c != 'Time']
+            forces = forces_df[channels].to_numpy(dtype=np.float64)
+        return cls(values.reshape(len(markers_df), len(names), 3), names,
+                   markers_df['Time'].to_numpy(dtype=float), forces=forces,
+                   force_channels=channels, force_rate=force_rate if forces_df is not None
+                   else None, metadata=metadata, name=name)
+
+    @classmethod
+    def from_files(cls, markers_path, forces_path=None, markers=None, force_rate=300,
+                   dtype=np.float64, metadata=None, name=None, cache=True):
+        """
+        Carrega o ensaio dos arquivos .txt do RBDS
+
+        Parameters
+        ----------
+        markers_path : str or Path
+            Arquivo de markers (por exemplo 'RBDS002runT25markers.txt')
+        forces_path : str, Path or None
+            Arquivo de forças correspondente
+        markers : list of str or None
+            Marcadores a carregar; todos se None
+        force_rate : float
+            Taxa de amostragem da plataforma de força (Hz)
+        dtype : np.dtype
+            Tipo do array de marcadores (np.float32 reduz a memória à metade)
+        metadata : dict or None
+            Informações do sujeito
+        name : str or None
+            Identificação do ensaio; nome do arquivo de markers se None
+        cache : bool
+            Usa o cache binário dos carregadores
+
+        Returns
+        -------
+        Trial
+        """
+        markers_df = load_markers_data(markers_path, markers=markers,
+                                       axes=None if markers is None else AXES, cache=cache)
+        forces_df = None if forces_path is None else load_forces_data(forces_path, cache=cache)
+        if name is None:
+            name = Path(markers_path).stem.replace('markers', '')
+        return cls.from_dataframes(markers_df, forces_df, force_rate=force_rate, dtype=dtype,
+                                   metadata=metadata, name=name)
@@ -0,0 +1,369 @@
+"""
+Ajuste dos ganhos dos controladores PI com Optuna em vários processos
+
+Os processos compartilham um mesmo estudo por um armazenamento local em
+arquivo (journal ``.log`` ou SQLite ``.db``), de modo que o estudo pode ser
+interrompido, retomado e estendido com mais trials.
+
+Uso pela linha de comando::
+
+    python -m projeto_pesquisa_ebm.tuning data/raw/RBDS002runT25markers.txt \\
+        data/raw/RBDS002runT25forces.txt --storage estudo.log -n 500 -j 32
+"""
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import optuna
+
+from .experiment import PreparedExperiment
+from .identification import fit_joint, fit_sequential_lsq, segment_masses
+from .models import LiuNigg4MassModel
+from .pipeline import (
+    DEFAULT_BODY_MASS, FIT_METHODS, FORCE_RATE, MODEL_MARKERS, SPECTRAL_CANDIDATES,
+    trial_kinematics, trial_mgrf,
+)
+from .spectral_fit import fit_spectral
+from .trial import Trial
+
+
+# Espaço de busca do notebook analysis_rbds_r12 (escala logarítmica)
+SEARCH_SPACE = {
+    'Kp1': (1e4, 1e6), 'Kp2': (1e3, 5e5), 'Kp3': (1e3, 5e5), 'Kp4': (1e3, 5e5),
+    'Ki1': (1e3, 5e5), 'Ki2': (1e2, 5e4), 'Ki3': (1e2, 5e4), 'Ki4': (1e2, 5e4),
+}
+FAILED_VALUE = 1e10  # valor das simulações instáveis, como no notebook
+DIVERGENCE_LIMIT = 100.0  # |z| acima disso (m, m/s, m·s) = simulação divergente
+DEFAULT_STUDY_NAME = 'pi_controller_optimization'
+
+
+class PIObjective:
+    """
+    Função objetivo: soma dos erros quadráticos médios das posições p1..p4
+
+    É um objeto (e não uma closure) para poder ser enviado aos processos.
+    """
+
+    def __init__(self, model, experiment, method='exact', search_space=None,
+                 check_interval=0.05, divergence_limit=DIVERGENCE_LIMIT, screen=True):
+        """
+        Inicializa a função objetivo
+
+        Parameters
+        ----------
+        model : LiuNigg4MassModel
+            Modelo com os parâmetros já identificados
+        experiment : PreparedExperiment
+            Referências e MGRF já reamostradas na grade de simulação (o
+            notebook usa Euler com ``dt_d/100``: method='euler' e um
+            experimento com oversample=100)
+        method : str
+            Método de integração de ``simulate_pi``
+        search_space : dict or None
+            Limites (log) por ganho; ``SEARCH_SPACE`` se None
+        check_interval : float or None
+            Intervalo de tempo simulado (s) entre as verificações de
+            divergência e os relatos do erro parcial ao Optuna; None
+            verifica só no final
+        divergence_limit : float or None
+            Limite de |z| que interrompe a simulação
+        screen : bool
+            Rejeita ganhos com malha fechada instável pelos autovalores
+            (``LiuNigg4MassModel.pi_stability``), sem simular
+        """
+        self.model = model
+        self.experiment = experiment
+        self.method = method
+        self.search_space = dict(search_space or SEARCH_SPACE)
+        self.check_interval = check_interval
+        self.divergence_limit = divergence_limit
+        self.screen = screen
+
+    @classmethod
+    def from_trial(cls, trial, body_mass=DEFAULT_BODY_MASS, fit='sequential', g=9.81,
+                   oversample=1, **kwargs):
+        """
+        Monta a função objetivo de um ensaio: cinemática, ajuste e referências
+
+        Parameters
+        ----------
+        trial : Trial
+            Ensaio com os marcadores de ``MODEL_MARKERS`` e a força Fy
+        body_mass : float
+            Massa corporal (kg)
+        fit : str
+            'sequential', 'joint' ou 'spectral'
+        g : float
+            Aceleração da gravidade (m/s², positiva = para baixo)
+        oversample : int
+            Passos de simulação por amostra dos marcadores
+        **kwargs
+            Repassados ao construtor (method, search_space, ...)
+
+        Returns
+        -------
+        PIObjective
+        """
+        masses = segment_masses(body_mass)
+        kin = trial_kinematics(trial)
+        MGRF = trial_mgrf(trial, kin['time'])
+        if fit == 'spectral':
+            params = fit_spectral(trial_kinematics(trial, method='gradient'), MGRF, masses,
+                                  n_candidates=SPECTRAL_CANDIDATES, seed=0)
+        else:
+            fit_params = fit_joint if fit == 'joint' else fit_sequential_lsq
+            params = fit_params(kin, MGRF, masses, g=g)
+        model = LiuNigg4MassModel(*masses, **params, g=g)
+        experiment = PreparedExperiment.from_kinematics(kin, MGRF, oversample=oversample)
+        return cls(model, experiment, **kwargs)
+
+    def simulate(self, Kp, Ki, trial=None):
+        """
+        Simula o sistema em malha fechada e retorna o erro das posições
+
+        A cada ``check_interval`` a simulação verifica se divergiu (e para
+        imediatamente se sim) e, com um ``trial``, relata o erro parcial
+        (soma dos MSE até o instante atual) com ``trial.report``.
+
+        Parameters
+        ----------
+        Kp, Ki : array_like
+            Ganhos proporcionais e integrais (4,)
+        trial : optuna.Trial or None
+            Trial que recebe os erros parciais
+
+        Returns
+        -------
+        float
+            Soma dos MSE de p1..p4; ``FAILED_VALUE`` se a malha fechada for
+            instável ou a simulação divergir
+
+        Raises
+        ------
+        optuna.TrialPruned
+            Se o pruner do estudo decidir interromper o trial
+        """
+        if self.screen and not self.model.pi_stability(Kp, Ki)[0][0]:
+            return FAILED_VALUE
+        return self._simulate(Kp, Ki, trial)
+
+    def _simulate(self, Kp, Ki, trial=None):
+        experiment = self.experiment
+        check_every = None
+        if self.check_interval is not None:
+            check_every = max(int(round(self.check_interval / experiment.dt)), 1)
+        progress = {'done': 0, 'sse': 0.0}
+
+        def report(i, z):
+            # Soma acumulada dos erros quadráticos: só o trecho novo é somado
+            progress['sse'] += experiment.squared_error(z, progress['done'], i + 1)
+            progress['done'] = i + 1
+            if trial is not None:
+                trial.report(progress['sse'] / (i + 1), step=i)
+                if trial.should_prune():
+                    raise optuna.TrialPruned(f"interrompido no passo {i}")
+            return False
+
+        with np.errstate(over='ignore', invalid='ignore'):
+            sim = experiment.simulate(self.model, Kp, Ki, method=self.method,
+                                      check_every=check_every, limit=self.divergence_limit,
+                                      callback=report)
+        if not sim['stats']['success']:
+            return FAILED_VALUE
+        value = progress['sse'] / experiment.n_steps
+        return value if np.isfinite(value) else FAILED_VALUE
+
+    def evaluate(self, Kp, Ki):
+        """
+        Avalia um lote de ganhos (varredura em grade), simulando só os estáveis
+
+        Parameters
+        ----------
+        Kp, Ki : array_like
+            Ganhos (N, 4)
+
+        Returns
+        -------
+        np.ndarray
+            Soma dos MSE de p1..p4 por candidato (N,); ``FAILED_VALUE`` nos
+            instáveis ou divergentes
+        """
+        Kp = np.atleast_2d(np.asarray(Kp, dtype=float))
+        Ki = np.atleast_2d(np.asarray(Ki, dtype=float))
+        values = np.full(len(Kp), FAILED_VALUE)
+        stable = self.model.pi_stability(Kp, Ki)[0] if self.screen else np.ones(len(Kp), bool)
+        for i in np.flatnonzero(stable):
+            values[i] = self._simulate(Kp[i], Ki[i])
+        return values
+
+    def __call__(self, trial):
+        gains = {name: trial.suggest_float(name, low, high, log=True)
+                 for name, (low, high) in self.search_space.items()}
+        Kp = [gains[f'Kp{j}'] for j in range(1, 5)]
+        Ki = [gains[f'Ki{j}'] for j in range(1, 5)]
+        return self.simulate(Kp, Ki, trial=trial)
+
+
+def make_storage(path):
+    """
+    Armazenamento local em arquivo para um estudo compartilhado
+
+    Parameters
+    ----------
+    path : str or Path
+        Arquivo ``.db``/``.sqlite`` (SQLite) ou qualquer outro (journal)
+
+    Returns
+    -------
+    optuna.storages.BaseStorage
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix in ('.db', '.sqlite', '.sqlite3'):
+        return optuna.storages.RDBStorage(f'sqlite:///{path}',
+                                          engine_kwargs={'connect_args': {'timeout': 60}})
+    try:
+        backend = optuna.storages.journal.JournalFileBackend(str(path))
+    except AttributeError:  # optuna < 4.0
+        backend = optuna.storages.JournalFileStorage(str(path))
+    return optuna.storages.JournalStorage(backend)
+
+
+def make_sampler(seed=42, n_startup_trials=50):
+    """
+    Sampler TPE do notebook, com ``constant_liar`` para trials em paralelo
+
+    Parameters
+    ----------
+    seed : int or None
+        Semente (cada processo deve usar uma diferente)
+    n_startup_trials : int
+        Trials aleatórios iniciais
+
+    Returns
+    -------
+    optuna.samplers.TPESampler
+    """
+    return optuna.samplers.TPESampler(n_startup_trials=n_startup_trials, multivariate=True,
+                                      constant_liar=True, seed=seed)
+
+
+def make_pruner(n_startup_trials=10, n_warmup_steps=0):
+    """
+    Pruner para os erros parciais relatados por ``PIObjective``
+
+    Parameters
+    ----------
+    n_startup_trials : int
+        Trials completos antes de começar a interromper
+    n_warmup_steps : int
+        Passos iniciais de cada trial em que não há interrupção
+
+    Returns
+    -------
+    optuna.pruners.MedianPruner
+    """
+    return optuna.pruners.MedianPruner(n_startup_trials=n_startup_trials,
+                                       n_warmup_steps=n_warmup_steps)
+
+
+def _optimize_worker(args):
+    objective, storage_path, study_name, n_trials, seed, n_startup_trials, pruner = args
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    study = optuna.load_study(study_name=study_name, storage=make_storage(storage_path),
+                              sampler=make_sampler(seed, n_startup_trials), pruner=pruner)
+    study.optimize(objective, n_trials=n_trials)
+    return n_trials
+
+
+def run_study(objective, storage_path, n_trials, jobs=None, study_name=DEFAULT_STUDY_NAME,
+              seed=42, n_startup_trials=50, pruner=None):
+    """
+    Executa (ou retoma) um estudo Optuna em vários processos
+
+    Cada processo abre o mesmo estudo no armazenamento compartilhado e
+    executa sua parte dos trials; chamar de novo com o mesmo arquivo e nome
+    acrescenta ``n_trials`` trials ao estudo existente.
+
+    Parameters
+    ----------
+    objective : callable
+        Função objetivo serializável (por exemplo ``PIObjective``)
+    storage_path : str or Path
+        Arquivo do armazenamento (ver ``make_storage``)
+    n_trials : int
+        Número de trials a acrescentar
+    jobs : int or None
+        Número de processos; todos os núcleos se None, sem pool se 1
+    study_name : str
+        Nome do estudo no armazenamento
+    seed : int or None
+        Semente base; o processo i usa ``seed + i``
+    n_startup_trials : int
+        Trials aleatórios iniciais do TPE
+    pruner : optuna.pruners.BasePruner or None
+        Pruner dos trials; ``make_pruner()`` se None
+
+    Returns
+    -------
+    optuna.Study
+        Estudo carregado do armazenamento, com todos os trials
+    """
+    jobs = min(jobs or os.cpu_count() or 1, n_trials) or 1
+    pruner = make_pruner() if pruner is None else pruner
+    optuna.create_study(study_name=study_name, storage=make_storage(storage_path),
+                        direction='minimize', load_if_exists=True)
+    shares = [n_trials // jobs + (i < n_trials % jobs) for i in range(jobs)]
+    tasks = [(objective, str(storage_path), study_name, n,
+              None if seed is None else seed + i, n_startup_trials, pruner)
+             for i, n in enumerate(shares) if n > 0]
+    if len(tasks) == 1:
+        _optimize_worker(tasks[0])
+    else:
+        with ProcessPoolExecutor(max_workers=len(tasks)) as pool:
+            list(pool.map(_optimize_worker, tasks))
+    return optuna.load_study(study_name=study_name, storage=make_storage(storage_path))
+
+
+def main(argv=None):
+    """Ponto de entrada da linha de comando"""
+    parser = argparse.ArgumentParser(
+        description='Ajusta os ganhos PI do modelo de Liu & Nigg (2000) com Optuna')
+    parser.add_argument('markers', help='arquivo de markers do ensaio')
+    parser.add_argument('forces', help='arquivo de forças do ensaio')
+    parser.add_argument('--storage', required=True,
+                        help='arquivo do estudo (.log = journal, .db = SQLite)')
+    parser.add_argument('--study-name', default=DEFAULT_STUDY_NAME)
+    parser.add_argument('-n', '--n-trials', type=int, default=100)
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='número de processos (padrão: todos os núcleos)')
+    parser.add_argument('--mass', type=float, default=DEFAULT_BODY_MASS,
+                        help='massa corporal (kg)')
+    parser.add_argument('--fit', choices=FIT_METHODS, default='sequential')
+    parser.add_argument('--method', default='exact', help='método de integração')
+    parser.add_argument('--oversample', type=int, default=1,
+                        help='passos de simulação por amostra dos marcadores')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-pruning', action='store_true',
+                        help='não interrompe trials pelo erro parcial')
+    args = parser.parse_args(argv)
+
+    trial = Trial.from_files(args.markers, args.forces, markers=list(MODEL_MARKERS),
+                             force_rate=FORCE_RATE)
+    objective = PIObjective.from_trial(trial, body_mass=args.mass, fit=args.fit,
+                                       method=args.method, oversample=args.oversample)
+    study = run_study(objective, args.storage, args.n_trials, jobs=args.jobs,
+                      study_name=args.study_name, seed=args.seed,
+                      pruner=optuna.pruners.NopPruner() if args.no_pruning else None)
+    best = study.best_trial
+    print(f"{len(study.trials)} trials no estudo; melhor #{best.number}: {best.value:.6g}")
+    for name, value in best.params.items():
+        print(f"  {name} = {value:.6g}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
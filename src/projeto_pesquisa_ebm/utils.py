@@ -2,12 +2,143 @@
 Funções utilitárias para análise de dados biomecânicos
 """
 
+import hashlib
+import json
+import os
+
 import numpy as np
 import pandas as pd
 from pathlib import Path
 
 
-def load_markers_data(filepath):
+CACHE_ENV = 'PROJETO_PESQUISA_EBM_CACHE'
+
+
+def default_cache_dir():
+    """
+    Diretório padrão do cache binário dos arquivos de texto
+    
+    A variável de ambiente ``PROJETO_PESQUISA_EBM_CACHE`` tem prioridade;
+    sem ela, usa ``projeto_pesquisa_ebm`` no diretório de cache do usuário
+    (``$XDG_CACHE_HOME`` ou ``~/.cache``), nunca a pasta do pacote.
+    
+    Returns
+    -------
+    Path
+        Diretório do cache (não é criado aqui)
+    """
+    if os.environ.get(CACHE_ENV):
+        return Path(os.environ[CACHE_ENV]).expanduser()
+    base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base).expanduser() / 'projeto_pesquisa_ebm'
+
+
+def _cache_entry(filepath, cache_dir):
+    """
+    Caminhos do cache binário de um arquivo de texto
+    
+    A chave combina o caminho absoluto, o mtime e o tamanho do arquivo,
+    de forma que qualquer modificação no .txt invalida o cache.
+    """
+    filepath = Path(filepath).resolve()
+    st = filepath.stat()
+    path_hash = hashlib.sha1(str(filepath).encode()).hexdigest()[:12]
+    key_hash = hashlib.sha1(f'{st.st_mtime_ns}:{st.st_size}'.encode()).hexdigest()[:12]
+    prefix = f'{filepath.stem}-{path_hash}'
+    base = Path(cache_dir) / f'{prefix}-{key_hash}'
+    return prefix, base.with_suffix('.npy'), base.with_suffix('.json')
+
+
+def _read_table(filepath, cache=True, cache_dir=None):
+    """
+    Lê um arquivo .txt separado por tabulações, com cache binário opcional
+    
+    Na primeira leitura o arquivo é convertido para um .npy (valores) e um
+    .json (nomes e tipos das colunas) em ``cache_dir``. As leituras
+    seguintes mapeiam o .npy em memória em vez de reinterpretar o texto.
+    Arquivos com colunas não numéricas não são colocados em cache.
+    """
+    if not cache:
+        return pd.read_csv(filepath, sep='\t')
+    if cache_dir is None:
+        cache_dir = default_cache_dir()
+    
+    prefix, npy_path, meta_path = _cache_entry(filepath, cache_dir)
+    if npy_path.exists() and meta_path.exists():
+        meta = json.loads(meta_path.read_text())
+        # mmap_mode='c': cópia na escrita, o arquivo em disco nunca é alterado
+        values = np.load(npy_path, mmap_mode='c')
+        df = pd.DataFrame(values, columns=meta['columns'], copy=False)
+        int_columns = [c for c, dt in zip(meta['columns'], meta['dtypes']) if dt != 'float64']
+        if int_columns:
+            df[int_columns] = df[int_columns].astype('int64')
+        return df
+    
+    df = pd.read_csv(filepath, sep='\t')
+    dtypes = [str(dt) for dt in df.dtypes]
+    if not all(dt in ('float64', 'int64') for dt in dtypes):
+        return df
+    
+    try:
+        _write_cache(df, filepath, dtypes, prefix, npy_path, meta_path)
+    except OSError:
+        # Diretório sem permissão de escrita ou corrida perdida com outro
+        # processo gravando a mesma entrada: os dados lidos valem sem cache
+        pass
+    return df
+
+
+def _write_cache(df, filepath, dtypes, prefix, npy_path, meta_path):
+    """Grava a entrada do cache e remove as entradas antigas do mesmo arquivo"""
+    cache_dir = npy_path.parent
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    # Mantém a entrada atual e os temporários de outros processos em escrita
+    for old in cache_dir.glob(f'{prefix}-*'):
+        if '.tmp' not in old.suffixes and not old.name.startswith(npy_path.stem):
+            old.unlink(missing_ok=True)
+    # Escrita atômica: outro processo nunca vê um arquivo parcial
+    pid = os.getpid()
+    tmp = npy_path.with_name(npy_path.stem + f'.{pid}.tmp.npy')
+    meta_tmp = meta_path.with_name(meta_path.name + f'.{pid}.tmp')
+    try:
+        np.save(tmp, df.to_numpy(dtype=np.float64))
+        os.replace(tmp, npy_path)
+        meta_tmp.write_text(json.dumps({'source': str(Path(filepath).resolve()),
+                                        'columns': list(df.columns), 'dtypes': dtypes}))
+        os.replace(meta_tmp, meta_path)
+    finally:
+        tmp.unlink(missing_ok=True)
+        meta_tmp.unlink(missing_ok=True)
+
+
+def _read_header(filepath):
+    """Lê apenas a linha de cabeçalho de um arquivo separado por tabulações"""
+    with open(filepath) as f:
+        return f.readline().rstrip('\r\n').split('\t')
+
+
+def _marker_columns(header, markers=None, axes=None):
+    """
+    Resolve as colunas pedidas a partir do cabeçalho do arquivo
+    
+    As colunas de markers seguem o padrão '<marker><eixo>', por exemplo
+    'R.MT1Y'. A coluna 'Time' é sempre incluída.
+    """
+    if markers is None:
+        # Mantém a ordem do arquivo
+        markers = list(dict.fromkeys(c[:-1] for c in header if c != 'Time'))
+    if isinstance(markers, str):
+        markers = [markers]
+    axes = list(axes or 'XYZ')
+    columns = ['Time'] + [f'{m}{a}' for m in markers for a in axes]
+    missing = [c for c in columns if c not in header]
+    if missing:
+        raise KeyError(f"Colunas não encontradas no arquivo: {missing}")
+    return columns
+
+
+def load_markers_data(filepath, markers=None, axes=None, dtype=None, cache=True,
+                      cache_dir=None):
     """
     Carrega dados de markers de um arquivo .txt
     
@@ -15,16 +146,50 @@ def load_markers_data(filepath):
     ----------
     filepath : str or Path
         Caminho para o arquivo de markers
+    markers : list of str or None
+        Markers a carregar (por exemplo ['R.MT1', 'R.Iliac.Crest']);
+        todos se None
+    axes : str or None
+        Eixos a carregar (por exemplo 'Y'); 'XYZ' se None
+    dtype : np.dtype or None
+        Tipo das colunas de markers (por exemplo np.float32); a coluna
+        Time mantém float64
+    cache : bool
+        Se True, usa o cache binário em ``cache_dir`` (ver ``_read_table``)
+    cache_dir : str, Path or None
+        Diretório do cache; ``default_cache_dir()`` se None
         
     Returns
     -------
     pd.DataFrame
         DataFrame com os dados de markers
+        
+    Notes
+    -----
+    Com uma seleção de markers/eixos, o cache completo é fatiado quando já
+    existe; caso contrário só as colunas pedidas são interpretadas
+    (``usecols``) e nada é gravado no cache.
     """
-    return pd.read_csv(filepath, sep='\t')
+    if markers is None and axes is None:
+        df = _read_table(filepath, cache=cache, cache_dir=cache_dir)
+        if dtype is not None:
+            df = df.astype({c: dtype for c in df.columns if c != 'Time'})
+        return df
+    
+    columns = _marker_columns(_read_header(filepath), markers, axes)
+    col_dtypes = {c: (dtype or np.float64) for c in columns if c != 'Time'}
+    if cache:
+        if cache_dir is None:
+            cache_dir = default_cache_dir()
+        _, npy_path, meta_path = _cache_entry(filepath, cache_dir)
+        if npy_path.exists() and meta_path.exists():
+            full = _read_table(filepath, cache=True, cache_dir=cache_dir)
+            return full[columns].astype(col_dtypes)
+    df = pd.read_csv(filepath, sep='\t', usecols=columns, dtype=col_dtypes)
+    return df[columns]
 
 
-def load_forces_data(filepath):
+def load_forces_data(filepath, cache=True, cache_dir=None):
     """
     Carrega dados de forças de um arquivo .txt
     
@@ -32,13 +197,61 @@ def load_forces_data(filepath):
     ----------
     filepath : str or Path
         Caminho para o arquivo de forças
+    cache : bool
+        Se True, usa o cache binário em ``cache_dir`` (ver ``_read_table``)
+    cache_dir : str, Path or None
+        Diretório do cache; ``default_cache_dir()`` se None
         
     Returns
     -------
     pd.DataFrame
         DataFrame com os dados de forças
     """
-    return pd.read_csv(filepath, sep='\t')
+    return _read_table(filepath, cache=cache, cache_dir=cache_dir)
+
+
+def load_subject_info(filepath=None):
+    """
+    Carrega a planilha de informações dos participantes do RBDS
+    
+    Parameters
+    ----------
+    filepath : str, Path or None
+        Caminho da planilha; ``data/raw/39452935_RBDSinfo_entrevistas.xlsx``
+        se None
+        
+    Returns
+    -------
+    pd.DataFrame
+        Uma linha por arquivo (FileName), com as colunas Subject, Age,
+        Height, Mass, ...
+    """
+    if filepath is None:
+        filepath = get_data_path('39452935_RBDSinfo_entrevistas.xlsx')
+    return pd.read_excel(filepath)
+
+
+def subject_metadata(info, subject):
+    """
+    Metadados de um sujeito a partir da planilha do RBDS
+    
+    Parameters
+    ----------
+    info : pd.DataFrame
+        Planilha retornada por ``load_subject_info``
+    subject : int
+        Número do sujeito (por exemplo 2 para RBDS002)
+        
+    Returns
+    -------
+    dict
+        Colunas da primeira linha do sujeito, sem FileName
+    """
+    rows = info[info['Subject'] == subject]
+    if rows.empty:
+        raise KeyError(f"Sujeito {subject} não encontrado")
+    meta = rows.iloc[0].drop(labels=['FileName'], errors='ignore').to_dict()
+    return {k: (v.item() if hasattr(v, 'item') else v) for k, v in meta.items()}
 
 
 def calculate_trunk_cm(data, markers=['R.ASIS', 'L.ASIS', 'R.PSIS', 'L.PSIS']):
@@ -57,14 +270,9 @@ def calculate_trunk_cm(data, markers=['R.ASIS', 'L.ASIS', 'R.PSIS', 'L.PSIS']):
     np.ndarray
         Array com as coordenadas do centro de massa (x, y, z)
     """
-    coords = []
-    for marker in markers:
-        x = data[f'{marker}X'].values
-        y = data[f'{marker}Y'].values
-        z = data[f'{marker}Z'].values
-        coords.append(np.column_stack([x, y, z]))
-    
-    return np.mean(coords, axis=0)
+    columns = [f'{marker}{axis}' for marker in markers for axis in 'XYZ']
+    coords = data[columns].to_numpy(dtype=float).reshape(len(data), len(markers), 3)
+    return coords.mean(axis=1)
 
 
 def calculate_velocity(position, dt):
@@ -0,0 +1,62 @@
+"""
+Testes para o experimento preparado (referências na grade de simulação)
+"""
+
+import numpy as np
+
+from projeto_pesquisa_ebm import LiuNigg4MassModel, PreparedExperiment
+
+
+def make_model():
+    return LiuNigg4MassModel(1.2, 3.7, 8.0, 11.4, 6000, 6000, 10000, 10000, 18000,
+                             300, 650, 1900)
+
+
+def make_kinematics(n=151, rate=150):
+    time = np.arange(n) / rate
+    kin = {'time': time}
+    for j in range(1, 5):
+        kin[f'p{j}'] = 1.0 - 0.1 * j + 0.01 * np.sin(2 * np.pi * 3 * time + j)
+    return kin, 1000 * np.clip(np.sin(2 * np.pi * 1.5 * time), 0, None)
+
+
+def test_oversample_grid():
+    """Referências e MGRF são interpoladas uma vez na grade fina"""
+    kin, MGRF = make_kinematics()
+    exp = PreparedExperiment.from_kinematics(kin, MGRF, oversample=10)
+
+    assert exp.n_steps == 1501
+    np.testing.assert_allclose(exp.time[::10], kin['time'], atol=1e-12)
+    np.testing.assert_allclose(exp.p_ref[::10, 1], np.mean(kin['p1']) - kin['p2'])
+    np.testing.assert_allclose(exp.MGRF[5], 0.5 * (MGRF[0] + MGRF[1]))
+    assert np.isclose(exp.dt, 1 / 1500)
+
+
+def test_simulate_matches_simulate_pi():
+    """Entradas em cache dão o mesmo resultado que simulate_pi direto"""
+    kin, MGRF = make_kinematics()
+    exp = PreparedExperiment.from_kinematics(kin, MGRF, oversample=4)
+    model = make_model()
+    Kp, Ki = [1e5, 5e4, 5e4, 5e4], [5e4, 5e3, 5e3, 5e3]
+
+    res = exp.simulate(model, Kp, Ki)
+    direto = model.simulate_pi(exp.time, exp.p_ref, Kp, Ki, MGRF=exp.MGRF, method='exact')
+
+    assert exp.inputs(model) is exp.inputs(model)
+    np.testing.assert_allclose(res['p1'], direto['p1'])
+    mse = sum(np.mean((res[f'p{j}'] - exp.p_ref[:, j - 1])**2) for j in range(1, 5))
+    assert np.isclose(exp.score(res), mse)
+
+
+def test_simulate_segments_oversample():
+    """Índices dos segmentos em amostras dos marcadores são levados à grade fina"""
+    kin, MGRF = make_kinematics()
+    kin.update({f'v{j}': np.gradient(kin[f'p{j}'], kin['time']) for j in range(1, 5)})
+    exp = PreparedExperiment.from_kinematics(kin, MGRF, oversample=5)
+    model = make_model()
+
+    res = exp.simulate_segments(model, [1e5, 5e4, 5e4, 5e4], [5e4, 5e3, 5e3, 5e3], [50, 100])
+
+    np.testing.assert_array_equal(res['stats']['segments'][:, 0], [0, 250, 500])
+    np.testing.assert_allclose(res['p1'][250], exp.p_ref[250, 0])
+    np.testing.assert_allclose(res['v2'][500], -kin['v2'][100])
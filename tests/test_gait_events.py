@@ -0,0 +1,92 @@
+"""
+Testes para a detecção de eventos da marcha pela Fy
+"""
+
+import numpy as np
+import pytest
+
+from projeto_pesquisa_ebm.gait_events import (
+    GaitEventDetector, detect_gait_events, stance_windows,
+)
+
+
+def synthetic_fy(rate=300, n_steps=5, stance=0.25, swing=0.15, noise=5.0, seed=0):
+    """Meias senoides de apoio separadas por voo, com ruído perto de zero"""
+    rng = np.random.default_rng(seed)
+    period = stance + swing
+    t = np.arange(int(n_steps * period * rate)) / rate
+    phase = t % period
+    fy = np.where(phase < stance, 1500 * np.sin(np.pi * phase / stance), 0.0)
+    return fy + rng.normal(scale=noise, size=len(t))
+
+
+def test_detects_each_stance():
+    """Um apoio por passo, com duração próxima da sintética"""
+    fy = synthetic_fy()
+
+    strikes, toe_offs = detect_gait_events(fy, rate=300)
+
+    assert len(strikes) == len(toe_offs) == 5
+    assert strikes[0] < 5
+    np.testing.assert_allclose(np.diff(strikes), 0.4 * 300, atol=1)
+    assert np.all((toe_offs - strikes) / 300 > 0.2)
+
+
+def test_hysteresis_ignores_noise_between_thresholds():
+    """Oscilações entre os limiares não geram eventos"""
+    fy = np.array([0, 0, 60, 30, 55, 30, 25, 10, 40, 15, 0], dtype=float)
+
+    strikes, toe_offs = detect_gait_events(fy)
+
+    np.testing.assert_array_equal(strikes, [2])
+    np.testing.assert_array_equal(toe_offs, [7])
+
+
+def test_incomplete_stances_are_dropped():
+    """Apoios cortados no início ou no fim da gravação não são retornados"""
+    fy = synthetic_fy(noise=0.0)
+    offset = 30  # começa no meio de um apoio
+
+    strikes, toe_offs = detect_gait_events(fy[offset:-50])
+
+    assert np.all(toe_offs > strikes)
+    assert len(strikes) == 3
+
+
+def test_min_stance():
+    """Contatos curtos são descartados"""
+    fy = np.zeros(300)
+    fy[10:13] = 100
+    fy[100:200] = 1000
+
+    strikes, _ = detect_gait_events(fy, rate=300, min_stance=0.05)
+    np.testing.assert_array_equal(strikes, [100])
+    with pytest.raises(ValueError):
+        detect_gait_events(fy, min_stance=0.05)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 13, 120, 1000])
+def test_streaming_matches_batch(chunk_size):
+    """Processar em blocos dá exatamente o mesmo resultado"""
+    fy = synthetic_fy(n_steps=20, noise=15.0)
+
+    batch = detect_gait_events(fy, rate=300, min_stance=0.05)
+    stream = detect_gait_events(fy, rate=300, min_stance=0.05, chunk_size=chunk_size)
+
+    np.testing.assert_array_equal(batch[0], stream[0])
+    np.testing.assert_array_equal(batch[1], stream[1])
+
+
+def test_detector_update_and_windows():
+    """Apoio que atravessa blocos é reportado no bloco em que termina"""
+    detector = GaitEventDetector()
+    fy = np.zeros(60)
+    fy[10:40] = 800
+
+    first = detector.update(fy[:20])
+    second = detector.update(fy[20:])
+
+    assert len(first[0]) == 0
+    np.testing.assert_array_equal(second[0], [10])
+    np.testing.assert_array_equal(second[1], [40])
+    np.testing.assert_allclose(stance_windows(*second, rate=300), [[10 / 300, 40 / 300]])
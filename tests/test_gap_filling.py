@@ -0,0 +1,83 @@
+"""
+Testes para o preenchimento de lacunas dos marcadores
+"""
+
+import numpy as np
+import pytest
+
+from projeto_pesquisa_ebm.gap_filling import (fill_gaps, find_gaps, gap_statistics,
+                                              interpolate_gaps, rigid_body_fill)
+
+
+RATE = 150.0
+
+
+@pytest.fixture
+def rigid_segment():
+    """4 marcadores de um corpo rígido em rotação e translação"""
+    n = 300
+    t = np.arange(n) / RATE
+    local = np.array([[0, 0, 0], [100, 0, 0], [0, 80, 0], [30, 40, 60]], dtype=float)
+    angle = 0.8 * np.sin(2 * np.pi * t)
+    c, s = np.cos(angle), np.sin(angle)
+    R = np.zeros((n, 3, 3))
+    R[:, 0, 0], R[:, 0, 1], R[:, 1, 0], R[:, 1, 1], R[:, 2, 2] = c, -s, s, c, 1
+    shift = np.column_stack([1000 * t, 50 * np.sin(4 * np.pi * t), np.zeros(n)])
+    markers = np.einsum('kij,mj->kmi', R, local) + shift[:, None]
+    return markers, ['a', 'b', 'c', 'd'], {'seg': ('a', 'b', 'c', 'd')}
+
+
+def test_find_gaps_por_coluna():
+    x = np.zeros((10, 2))
+    x[2:4, 0] = x[7, 0] = x[0, 1] = np.nan
+    column, start, stop = find_gaps(x)
+    np.testing.assert_array_equal(column, [0, 0, 1])
+    np.testing.assert_array_equal(start, [2, 7, 0])
+    np.testing.assert_array_equal(stop, [4, 8, 1])
+
+
+@pytest.mark.parametrize('method, atol', [('cubic', 1e-4), ('linear', 1e-2)])
+def test_interpolate_gaps_curtas(method, atol):
+    """Lacunas curtas internas preenchidas; longas e das bordas continuam NaN"""
+    t = np.arange(300) / RATE
+    x = np.column_stack([np.sin(2 * np.pi * t), np.cos(2 * np.pi * t)])
+    y = x.copy()
+    y[100:105, 0] = y[200:203, 1] = np.nan
+    y[:3, 1] = y[150:200, 0] = np.nan
+    filled = interpolate_gaps(y, max_gap=10, method=method)
+
+    np.testing.assert_allclose(filled[100:105, 0], x[100:105, 0], atol=atol)
+    np.testing.assert_allclose(filled[200:203, 1], x[200:203, 1], atol=atol)
+    assert np.isnan(filled[:3, 1]).all() and np.isnan(filled[150:200, 0]).all()
+    assert np.isnan(y[100:105, 0]).all()  # entrada não é modificada
+
+
+def test_rigid_body_fill_reconstroi(rigid_segment):
+    markers, names, segments = rigid_segment
+    gappy = markers.copy()
+    gappy[100:180, 3] = np.nan
+    filled = rigid_body_fill(gappy, names, segments)
+    np.testing.assert_allclose(filled[100:180, 3], markers[100:180, 3], atol=1e-6)
+
+
+def test_fill_gaps_relatorio(rigid_segment):
+    markers, names, segments = rigid_segment
+    gappy = markers.copy()
+    gappy[50:53, 0] = np.nan    # curta: interpolação
+    gappy[100:180, 3] = np.nan  # longa: corpo rígido
+    gappy[290:, 1] = np.nan     # no fim: sem referência posterior, corpo rígido
+
+    stats = gap_statistics(gappy, RATE, names)
+    assert stats.loc['d', 'n_gaps'] == 1
+    assert stats.loc['d', 'longest_gap'] == pytest.approx(80 / RATE)
+
+    filled, report = fill_gaps(gappy, RATE, names, segments)
+    assert report.loc['a', 'interpolated'] == 3
+    assert report.loc['d', 'rigid'] == 80
+    assert report.loc['b', 'rigid'] == 10
+    assert report['remaining'].sum() == 0
+    np.testing.assert_allclose(filled, markers, atol=1e-2)
+
+    # Sem segmentos as lacunas longas permanecem
+    _, report = fill_gaps(gappy, RATE, names)
+    assert report.loc['d', 'remaining'] == 80
@@ -0,0 +1,112 @@
+"""
+Testes para a identificação dos parâmetros de Liu & Nigg (2000)
+"""
+
+import numpy as np
+import pytest
+
+from projeto_pesquisa_ebm.identification import (
+    PARAMETER_NAMES, equation_regressors, fit_joint, fit_sequential_lsq, fit_sequential_tnc,
+    joint_jacobian, segment_masses,
+)
+
+
+TRUE_PARAMS = {'k1': 5000.0, 'k2': 6000.0, 'k3': 9000.0, 'k4': 9000.0, 'k5': 17000.0,
+               'c1': 300.0, 'c2': 600.0, 'c4': 1800.0}
+
+
+def synthetic_kinematics(params, masses, g=9.81, n=400, seed=0):
+    """Cinemática aleatória com acelerações que satisfazem as equações de movimento"""
+    rng = np.random.default_rng(seed)
+    kin = {f'{s}{j}': rng.normal(scale=0.05, size=n) for s in 'pv' for j in range(1, 5)}
+    MGRF = rng.uniform(0, 2000, size=n)
+    for j in range(1, 5):
+        kin[f'a{j}'] = np.zeros(n)
+    theta = np.array([params[name] for name in PARAMETER_NAMES])
+    for j, (Phi, y) in enumerate(equation_regressors(kin, MGRF, masses, g), start=1):
+        # resíduo y - Phi theta = 0 com a_j = 0 em y -> a_j = (Phi theta - y) / m_j
+        kin[f'a{j}'] = (Phi @ theta - y) / masses[j - 1]
+    return kin, MGRF
+
+
+def test_regressors_match_equations():
+    """Resíduo dos regressores é zero para a cinemática gerada pelas equações"""
+    masses = segment_masses(70)
+    kin, MGRF = synthetic_kinematics(TRUE_PARAMS, masses)
+    theta = np.array([TRUE_PARAMS[n] for n in PARAMETER_NAMES])
+
+    for Phi, y in equation_regressors(kin, MGRF, masses):
+        np.testing.assert_allclose(Phi @ theta, y, atol=1e-8)
+
+    m1 = masses[0]
+    a1 = (m1*9.81 - MGRF - 5000*(kin['p1'] - kin['p3']) - 6000*(kin['p1'] - kin['p2'])
+          - 300*(kin['v1'] - kin['v3']) - 600*(kin['v1'] - kin['v2'])) / m1
+    np.testing.assert_allclose(kin['a1'], a1)
+
+
+def test_lsq_recovers_parameters():
+    """Sem ruído, o ajuste linear recupera os parâmetros (k4 + k5 somados)"""
+    masses = segment_masses(70)
+    kin, MGRF = synthetic_kinematics(TRUE_PARAMS, masses)
+
+    params, stages = fit_sequential_lsq(kin, MGRF, masses, full_output=True)
+
+    for name in ('k1', 'k2', 'k3', 'c1', 'c2', 'c4'):
+        assert params[name] == pytest.approx(TRUE_PARAMS[name], rel=1e-6)
+    assert params['k4'] + params['k5'] == pytest.approx(26000, rel=1e-6)
+    assert [s['names'] for s in stages] == [('k1', 'k2', 'c1', 'c2'), ('k3',), ('k4', 'k5', 'c4')]
+    assert all(s['sse'] < 1e-12 for s in stages)
+    assert stages[0]['covariance'].shape == (4, 4)
+    for stage in stages:
+        assert stage['residuals'].shape == (len(MGRF),)
+        assert float(stage['residuals'] @ stage['residuals']) == pytest.approx(stage['sse'])
+
+
+def test_lsq_matches_tnc_with_active_bounds():
+    """Com ruído e limites ativos, o resultado coincide com o TNC dos notebooks"""
+    masses = segment_masses(80)
+    params = dict(TRUE_PARAMS, k1=3000.0, c2=800.0)  # fora dos limites padrão
+    kin, MGRF = synthetic_kinematics(params, masses, seed=1)
+    MGRF = MGRF + np.random.default_rng(2).normal(scale=5, size=len(MGRF))
+
+    lsq = fit_sequential_lsq(kin, MGRF, masses)
+    tnc = fit_sequential_tnc(kin, MGRF, masses)
+
+    assert lsq['k1'] == 4000 and lsq['c2'] == 750
+    for name in ('k1', 'k2', 'k3', 'c1', 'c2', 'c4'):
+        assert lsq[name] == pytest.approx(tnc[name], rel=1e-3)
+    assert lsq['k4'] + lsq['k5'] == pytest.approx(tnc['k4'] + tnc['k5'], rel=1e-3)
+
+
+def test_joint_recovers_parameters():
+    """Sem ruído, o ajuste simultâneo recupera os parâmetros"""
+    masses = segment_masses(70)
+    kin, MGRF = synthetic_kinematics(TRUE_PARAMS, masses)
+
+    params, info = fit_joint(kin, MGRF, masses, full_output=True)
+
+    for name in ('k1', 'k2', 'k3', 'c1', 'c2', 'c4'):
+        assert params[name] == pytest.approx(TRUE_PARAMS[name], rel=1e-4)
+    assert params['k4'] + params['k5'] == pytest.approx(26000, rel=1e-4)
+    assert info['sse'].shape == (4,)
+    assert info['covariance'].shape == (8, 8)
+
+
+def test_joint_not_worse_than_sequential():
+    """Com ruído, o ajuste simultâneo tem soma de resíduos <= sequencial"""
+    masses = segment_masses(80)
+    kin, MGRF = synthetic_kinematics(TRUE_PARAMS, masses, seed=3)
+    rng = np.random.default_rng(4)
+    for j in range(1, 5):
+        kin[f'a{j}'] = kin[f'a{j}'] + rng.normal(scale=2.0, size=len(MGRF))
+    J, y = joint_jacobian(kin, MGRF, masses)
+    assert J.nnz == sum(np.count_nonzero(Phi) for Phi, _ in equation_regressors(kin, MGRF, masses))
+
+    def total_sse(params):
+        theta = np.array([params[n] for n in PARAMETER_NAMES])
+        return np.sum((J @ theta + y)**2)
+
+    joint = fit_joint(kin, MGRF, masses)
+    sequential = fit_sequential_lsq(kin, MGRF, masses)
+
+    assert total_sse(joint) <= total_sse(sequential) * (1 + 1e-9)
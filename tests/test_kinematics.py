@@ -0,0 +1,68 @@
+"""
+Testes para a cinemática vetorizada dos marcadores
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from projeto_pesquisa_ebm import Trial, calculate_trunk_cm
+from projeto_pesquisa_ebm.kinematics import TRUNK_MARKERS, marker_kinematics
+
+
+RATE = 150.0
+
+
+@pytest.fixture
+def trial():
+    n = 300
+    rng = np.random.default_rng(3)
+    names = ['R.MT1'] + list(TRUNK_MARKERS)
+    markers = rng.normal(size=(n, len(names), 3)).cumsum(axis=0)
+    return Trial(markers, names, np.arange(n) / RATE)
+
+
+def test_gradient_igual_ao_np_gradient(trial):
+    """Método 'gradient' reproduz o np.gradient duplo por marcador"""
+    out = trial.kinematics(scale=1e-3)
+    p = trial.position('R.MT1', scale=1e-3)
+    v = np.gradient(p, 1 / RATE)
+    j = out['names'].index('R.MT1')
+    np.testing.assert_allclose(out['position'][:, j, 1], p)
+    np.testing.assert_allclose(out['velocity'][:, j, 1], v)
+    np.testing.assert_allclose(out['acceleration'][:, j, 1], np.gradient(v, 1 / RATE))
+
+
+def test_centroide_igual_calculate_trunk_cm(trial):
+    """Centroide do tronco (e suas derivadas) igual à média dos marcadores"""
+    out = trial.kinematics(segments={'trunk': TRUNK_MARKERS}, scale=1.0)
+    columns = {f'{m}{a}': trial.markers[:, i, k] for i, m in enumerate(trial.marker_names)
+               for k, a in enumerate('XYZ')}
+    expected = calculate_trunk_cm(pd.DataFrame(columns))
+
+    assert out['names'][-1] == 'trunk'
+    np.testing.assert_allclose(out['position'][:, -1], expected)
+    np.testing.assert_allclose(out['velocity'][:, -1],
+                               np.gradient(expected, 1 / RATE, axis=0))
+
+
+def test_buffers_reaproveitados(trial):
+    """Os resultados são escritos nos buffers passados em out"""
+    shape = (trial.n_frames, trial.n_markers + 1, 3)
+    buffers = tuple(np.empty(shape) for _ in range(3))
+    out = trial.kinematics(segments={'trunk': TRUNK_MARKERS}, method='savgol', out=buffers)
+    for key, buffer in zip(('position', 'velocity', 'acceleration'), buffers):
+        assert out[key] is buffer
+    assert np.isfinite(buffers[2]).all()
+
+    with pytest.raises(ValueError):
+        trial.kinematics(out=buffers)  # sem o segmento a forma não confere
+
+
+def test_erros():
+    with pytest.raises(ValueError):
+        marker_kinematics(np.zeros((10, 3)), RATE)
+    with pytest.raises(ValueError):
+        marker_kinematics(np.zeros((10, 2, 3)), RATE, method='nope')
+    with pytest.raises(KeyError):
+        marker_kinematics(np.zeros((10, 2, 3)), RATE, ['a', 'b'], {'s': ['c']})
@@ -0,0 +1,118 @@
+"""
+Testes para a análise modal numérica
+"""
+
+import numpy as np
+import pytest
+from scipy.linalg import eigh
+
+from projeto_pesquisa_ebm import LiuNigg4MassModel
+from projeto_pesquisa_ebm.identification import DEFAULT_GUESS, PARAMETER_NAMES, segment_masses
+from projeto_pesquisa_ebm.modal import (closed_loop_matrix, first_order_matrix,
+                                        frequency_response, mgrf_response, modal_analysis,
+                                        model_matrices)
+
+
+MASSES = segment_masses(80.0)
+
+
+@pytest.fixture
+def model():
+    return LiuNigg4MassModel(*MASSES, **DEFAULT_GUESS)
+
+
+def test_modal_igual_ao_modelo(model):
+    """Autovalores e ω² iguais aos do modelo e do eigh generalizado"""
+    result = model.modal_analysis()
+    np.testing.assert_allclose(np.sort_complex(result['eigenvalues']),
+                               np.sort_complex(np.linalg.eigvals(model.A)), atol=1e-6)
+    np.testing.assert_allclose(result['omega2'], eigh(model.K, model.M, eigvals_only=True),
+                               atol=1e-6)
+    assert result['stable']
+    # Modo de corpo rígido (K singular) e modos normalizados pela massa
+    assert result['natural_frequency'][0] == 0.0 and np.isnan(result['damping_ratio'][0])
+    shapes = result['mode_shapes']
+    np.testing.assert_allclose(shapes.T @ model.M @ shapes, np.eye(4), atol=1e-10)
+
+
+def test_lote_igual_a_um_por_vez(model):
+    rng = np.random.default_rng(0)
+    guess = np.array([DEFAULT_GUESS[name] for name in PARAMETER_NAMES])
+    params = guess * rng.uniform(-0.5, 2.0, size=(50, 8))
+    batch = modal_analysis(*model_matrices(params, MASSES))
+
+    assert batch['eigenvalues'].shape == (50, 8)
+    assert 0 < batch['stable'].sum() < 50
+    for p, stable, omega2 in zip(params, batch['stable'], batch['omega2']):
+        single = LiuNigg4MassModel(*MASSES, **dict(zip(PARAMETER_NAMES, p)))
+        np.testing.assert_allclose(omega2, eigh(single.K, single.M, eigvals_only=True),
+                                   rtol=1e-8, atol=1e-6)
+        assert stable == (np.linalg.eigvals(single.A).real.max() <= 1e-6 * np.abs(
+            np.linalg.eigvals(single.A)).max())
+
+
+def test_model_matrices_dict(model):
+    M, K, C = model_matrices(DEFAULT_GUESS, MASSES)
+    np.testing.assert_allclose(M[0], model.M)
+    np.testing.assert_allclose(K[0], model.K)
+    np.testing.assert_allclose(C[0], model.C)
+    np.testing.assert_allclose(first_order_matrix(M, K, C)[0], model.A)
+
+
+def test_closed_loop_igual_pi_state_space(model):
+    rng = np.random.default_rng(1)
+    Kp = 10**rng.uniform(3, 6, size=(20, 4))
+    Ki = 10**rng.uniform(2, 5, size=(20, 4))
+    stable, max_real = model.pi_stability(Kp, Ki)
+    for j in range(20):
+        A, _ = model.pi_state_space(Kp[j], Ki[j])
+        np.testing.assert_allclose(closed_loop_matrix(model.M, model.K, model.C,
+                                                      Kp[j], Ki[j])[0], A)
+        assert max_real[j] == pytest.approx(np.linalg.eigvals(A).real.max(), abs=1e-6)
+
+
+def test_mgrf_response_igual_espaco_de_estados(model):
+    """Forma de segunda ordem igual a C (jωI - A)⁻¹ B, em malha aberta e fechada"""
+    freqs = np.linspace(0.5, 30, 60)
+    Kp, Ki = [1e5, 5e4, 5e4, 5e4], [5e4, 5e3, 5e3, 5e3]
+    positions = np.hstack([np.eye(4), np.zeros((4, 8))])
+
+    A_cl, B_cl = model.pi_state_space(Kp, Ki)
+    expected = frequency_response(A_cl, -B_cl[:, 4:5], positions, freqs)[..., 0]
+    np.testing.assert_allclose(model.frequency_response(freqs, Kp=Kp, Ki=Ki), expected,
+                               rtol=1e-8, atol=1e-14)
+
+    expected = frequency_response(model.A, -model.B[:, :1], positions[:, :8], freqs)[..., 0]
+    H = model.frequency_response(freqs)
+    np.testing.assert_allclose(H, expected, rtol=1e-8)
+    np.testing.assert_allclose(model.frequency_response(freqs, 'acceleration'),
+                               H * (2j * np.pi * freqs[:, None])**2)
+
+
+def test_mgrf_response_senoide(model):
+    """Amplitude e fase em regime permanente de uma MGRF senoidal"""
+    Kp, Ki = [1e5, 5e4, 5e4, 5e4], [5e4, 5e3, 5e3, 5e3]
+    time = np.arange(0, 6, 1 / 1000)
+    MGRF = 100 * np.sin(2 * np.pi * 5 * time)
+    sim = model.simulate_pi(time, np.zeros((len(time), 4)), Kp, Ki, MGRF=MGRF,
+                            method='exact')
+    H = model.frequency_response([5.0], Kp=Kp, Ki=Ki)[0, 0]
+    # Regime senoidal somado ao transitório lento da gravidade (reta)
+    t = time[time > 3]
+    X = np.column_stack([np.sin(2 * np.pi * 5 * t), np.cos(2 * np.pi * 5 * t),
+                         np.ones_like(t), t])
+    coef = np.linalg.lstsq(X, sim['p1'][time > 3], rcond=None)[0]
+    assert abs(complex(coef[0], coef[1]) - 100 * H) < 0.03 * abs(100 * H)
+
+
+def test_mgrf_response_lote(model):
+    rng = np.random.default_rng(2)
+    guess = np.array([DEFAULT_GUESS[name] for name in PARAMETER_NAMES])
+    M, K, C = model_matrices(guess * rng.uniform(0.5, 2, size=(7, 8)), MASSES)
+    freqs = np.linspace(1, 20, 11)
+    H = mgrf_response(M, K, C, freqs, Kp=np.full((7, 4), 1e5), Ki=[1e3] * 4)
+    assert H.shape == (7, 11, 4)
+    np.testing.assert_allclose(H[4], mgrf_response(M[4], K[4], C[4], freqs,
+                                                   Kp=[1e5] * 4, Ki=[1e3] * 4))
+    with pytest.raises(ValueError):
+        mgrf_response(M, K, C, [0.0, 1.0])
@@ -0,0 +1,406 @@
+"""
+Testes para os modelos biomecânicos
+"""
+
+import numpy as np
+import pytest
+
+from projeto_pesquisa_ebm import MassSpringDamperModel, LiuNigg4MassModel
+
+
+def _euler_referencia(model, t_max, dt, z0):
+    """Laço de Euler original, usado como referência"""
+    n_steps = int(t_max / dt)
+    z = np.zeros((n_steps, 4))
+    z[0] = z0
+    for i in range(n_steps - 1):
+        a1 = model.acceleration_m1(*z[i])
+        a2 = model.acceleration_m2(*z[i])
+        z[i + 1, 1] = z[i, 1] + a1 * dt
+        z[i + 1, 0] = z[i, 0] + z[i, 1] * dt
+        z[i + 1, 3] = z[i, 3] + a2 * dt
+        z[i + 1, 2] = z[i, 2] + z[i, 3] * dt
+    return z
+
+
+@pytest.fixture
+def model():
+    return MassSpringDamperModel(56.0, 14.0, 34.1, 78.4, 0.35)
+
+
+@pytest.mark.parametrize("backend", ["numpy", "python", "auto"])
+def test_simulate_backends_igual_euler_original(model, backend):
+    """Todos os backends reproduzem o Euler original"""
+    z0 = [0.864, 0.0, 0.456, 0.0]
+    ref = _euler_referencia(model, 5.0, 0.001, z0)
+    res = model.simulate(5.0, 0.001, *z0, backend=backend)
+
+    for j, key in enumerate(['x1', 'x2', 'x3', 'x4']):
+        np.testing.assert_allclose(res[key], ref[:, j], rtol=1e-9, atol=1e-12)
+    assert len(res['time']) == ref.shape[0]
+
+
+def test_simulate_backend_numba(model):
+    """Backend compilado reproduz o Euler original"""
+    pytest.importorskip("numba")
+    z0 = [0.864, 0.0, 0.456, 0.0]
+    ref = _euler_referencia(model, 5.0, 0.001, z0)
+    res = model.simulate(5.0, 0.001, *z0, backend='numba')
+    np.testing.assert_allclose(res['x1'], ref[:, 0], rtol=1e-9, atol=1e-12)
+
+
+def test_simulate_backend_invalido(model):
+    """Backend desconhecido gera ValueError"""
+    with pytest.raises(ValueError):
+        model.simulate(1.0, 0.01, 0.0, 0.0, 0.0, 0.0, backend='fortran')
+
+
+def test_simulate_batch_igual_simulacoes_individuais():
+    """Simulação em lote reproduz simulações individuais"""
+    k1, k2 = np.meshgrid(np.linspace(20, 60, 4), np.linspace(50, 100, 3))
+    n_sets = k1.size
+    params = np.column_stack([
+        np.full(n_sets, 56.0), np.full(n_sets, 14.0),
+        k1.ravel(), k2.ravel(), np.full(n_sets, 0.35),
+    ])
+    z0 = [0.864, 0.0, 0.456, 0.0]
+
+    res = MassSpringDamperModel.simulate_batch(params, 2.0, 0.001, z0)
+
+    assert res['x1'].shape == (n_sets, len(res['time']))
+    for n, p in enumerate(params):
+        single = MassSpringDamperModel(*p).simulate(2.0, 0.001, *z0, backend='python')
+        for key in ['x1', 'x2', 'x3', 'x4']:
+            np.testing.assert_allclose(res[key][n], single[key], rtol=1e-9, atol=1e-12)
+
+
+def test_simulate_batch_forma_invalida():
+    """params com número errado de colunas gera ValueError"""
+    with pytest.raises(ValueError):
+        MassSpringDamperModel.simulate_batch(np.ones((3, 4)), 1.0, 0.01, np.zeros(4))
+
+
+@pytest.fixture
+def liu_params():
+    m = 80
+    return dict(m1=m * 0.0145, m2=m * 0.0465, m3=m * 0.1000, m4=m * 0.1420,
+                k1=6000, k2=6000, k3=10000, k4=10000, k5=18000,
+                c1=300, c2=650, c4=1900)
+
+
+def test_liu_nigg_equacoes_escalares(liu_params):
+    """Forma matricial reproduz as quatro equações de movimento escalares"""
+    model = LiuNigg4MassModel(**liu_params)
+    p = liu_params
+    rng = np.random.default_rng(0)
+    pos = rng.normal(size=4)
+    vel = rng.normal(size=4)
+    MGRF = 1500.0
+
+    dz = model.derivatives(np.concatenate([pos, vel]),
+                           model.external_forces([MGRF])[0])
+
+    p1, p2, p3, p4 = pos
+    v1, v2, v3, v4 = vel
+    g = 9.81
+    a1 = (p['m1'] * g - MGRF - p['k1'] * (p1 - p3) - p['k2'] * (p1 - p2)
+          - p['c1'] * (v1 - v3) - p['c2'] * (v1 - v2)) / p['m1']
+    a2 = (p['m2'] * g + p['k2'] * (p1 - p2) - p['k3'] * (p2 - p3)
+          + p['c2'] * (v1 - v2)) / p['m2']
+    a3 = (p['m3'] * g + p['k1'] * (p1 - p3) + p['k3'] * (p2 - p3)
+          - (p['k4'] + p['k5']) * (p3 - p4) + p['c1'] * (v1 - v3)
+          - p['c4'] * (v3 - v4)) / p['m3']
+    a4 = (p['m4'] * g + (p['k4'] + p['k5']) * (p3 - p4)
+          + p['c4'] * (v3 - v4)) / p['m4']
+
+    np.testing.assert_allclose(dz[:4], vel)
+    np.testing.assert_allclose(dz[4:], [a1, a2, a3, a4], rtol=1e-12)
+
+
+@pytest.mark.parametrize("backend", ["numpy", "auto"])
+def test_liu_nigg_simulate_euler(liu_params, backend):
+    """simulate reproduz o passo de Euler explícito"""
+    model = LiuNigg4MassModel(**liu_params)
+    time = np.arange(2000) * 1e-4
+    MGRF = 800 + 400 * np.sin(20 * time)
+
+    sim = model.simulate(time, MGRF, backend=backend)
+
+    z = np.zeros(8)
+    dt = time[1] - time[0]
+    f = model.external_forces(MGRF)
+    for i in range(len(time) - 1):
+        z = z + dt * model.derivatives(z, f[i])
+    np.testing.assert_allclose(sim['p1'][-1], z[0], rtol=1e-9)
+    np.testing.assert_allclose(sim['v4'][-1], z[7], rtol=1e-9)
+
+
+def test_discretize_zoh_escalar():
+    """Discretização exata de dx/dt = a x + b u"""
+    from projeto_pesquisa_ebm.integrators import discretize_zoh
+    a, b, dt = -2.0, 3.0, 0.1
+    Ad, Bd = discretize_zoh([[a]], [b], dt)
+    np.testing.assert_allclose(Ad[0, 0], np.exp(a * dt))
+    np.testing.assert_allclose(Bd[0], b * (np.exp(a * dt) - 1) / a)
+
+
+@pytest.mark.parametrize("backend", ["numpy", "python", "auto"])
+def test_linear_recurrence_backends(backend):
+    """Todos os backends da recorrência linear coincidem com o laço explícito"""
+    from projeto_pesquisa_ebm.integrators import linear_recurrence
+    rng = np.random.default_rng(0)
+    Phi = 0.3 * rng.normal(size=(3, 3))
+    W = rng.normal(size=(20, 3))
+    z = [np.ones(3)]
+    for w in W:
+        z.append(Phi @ z[-1] + w)
+    np.testing.assert_allclose(linear_recurrence(Phi, W, np.ones(3), backend=backend),
+                               np.array(z), rtol=1e-12)
+
+
+def test_simulate_exact_converge_para_euler_fino(model):
+    """Passo exato grosso coincide com Euler de passo muito fino"""
+    fino = model.simulate(2.0, 1e-6, 0.864, 0.0, 0.456, 0.0)
+    exato = model.simulate(2.0, 1e-2, 0.864, 0.0, 0.456, 0.0, method='exact')
+    n = len(exato['x1']) - 1
+    np.testing.assert_allclose(fino['x1'][n * 10000], exato['x1'][-1], rtol=1e-4)
+    np.testing.assert_allclose(fino['x3'][n * 10000], exato['x3'][-1], rtol=1e-4)
+
+
+def test_discretize_cache_acompanha_parametros(model):
+    """Alterar um parâmetro invalida a discretização guardada"""
+    Ad, _ = model.discretize(0.01)
+    model.k1 = 1000.0
+    Ad_novo, _ = model.discretize(0.01)
+    referencia = MassSpringDamperModel(56.0, 14.0, 1000.0, 78.4, 0.35).discretize(0.01)[0]
+    assert not np.allclose(Ad, Ad_novo)
+    np.testing.assert_allclose(Ad_novo, referencia)
+
+
+def test_liu_nigg_acompanha_parametros(liu_params):
+    """Alterar um parâmetro remonta as matrizes usadas por todos os métodos"""
+    model = LiuNigg4MassModel(**liu_params)
+    time = np.arange(150) / 150
+    MGRF = 800 + 500 * np.abs(np.sin(3 * time))
+    model.discretize(time[1])
+    model.simulate(time, MGRF, method='exact')
+
+    model.k1 = 5000.0
+    referencia = LiuNigg4MassModel(**{**liu_params, 'k1': 5000.0})
+
+    np.testing.assert_allclose(model.K, referencia.K)
+    np.testing.assert_allclose(model.discretize(time[1])[0], referencia.discretize(time[1])[0])
+    for method in ('exact', 'euler'):
+        np.testing.assert_allclose(model.simulate(time, MGRF, method=method)['p1'],
+                                   referencia.simulate(time, MGRF, method=method)['p1'])
+    np.testing.assert_allclose(model.modal_analysis()['omega2'],
+                               referencia.modal_analysis()['omega2'])
+
+
+def test_liu_nigg_exact_na_taxa_dos_marcadores(liu_params):
+    """Passo exato a 150 Hz coincide com Euler sub-amostrado 1000x"""
+    model = LiuNigg4MassModel(**liu_params)
+    time = np.arange(150) / 150
+    MGRF = 800 + 500 * np.abs(np.sin(3 * time))
+
+    exato = model.simulate(time, MGRF, method='exact')
+
+    sub = 1000
+    fino = model.simulate(np.arange(150 * sub) / (150 * sub), np.repeat(MGRF, sub))
+    for key in ['p1', 'p3', 'v4']:
+        np.testing.assert_allclose(exato[key], fino[key][::sub], rtol=1e-3, atol=1e-4)
+
+
+def test_metodo_invalido(model):
+    """Método de integração desconhecido gera ValueError"""
+    with pytest.raises(ValueError):
+        model.simulate(1.0, 0.01, 0.0, 0.0, 0.0, 0.0, method='leapfrog')
+
+
+@pytest.mark.parametrize("method", ["euler", "rk4", "exact"])
+def test_opcoes_de_solver_em_passo_fixo(model, liu_params, method):
+    """Opções dos solvers adaptativos não são ignoradas em silêncio"""
+    liu = LiuNigg4MassModel(**liu_params)
+    time = np.arange(10) / 150
+    with pytest.raises(TypeError, match='rtol'):
+        liu.simulate(time, np.zeros(10), method=method, rtol=1e-8)
+    with pytest.raises(TypeError, match='max_step'):
+        model.simulate(0.1, 0.01, 0.0, 0.0, 0.0, 0.0, method=method, rtol=1e-9,
+                       max_step=0.1)
+
+
+@pytest.mark.parametrize("method", ["rk4", "rk45", "radau", "bdf", "lsoda"])
+def test_liu_nigg_solvers_concordam_com_exato(liu_params, method):
+    """Todos os solvers convergem para a solução exata com entrada suave"""
+    model = LiuNigg4MassModel(**liu_params)
+    time = np.arange(3001) * 1e-4
+    MGRF = 800 + 400 * np.sin(20 * time)
+
+    exato = model.simulate(time, MGRF, method='exact')
+    res = model.simulate(time, MGRF, method=method, rtol=1e-8, atol=1e-10) \
+        if method != 'rk4' else model.simulate(time, MGRF, method=method)
+
+    assert res['stats']['success']
+    assert res['stats']['n_steps'] > 0
+    # exato usa segurador de ordem zero: diferença O(dt)
+    np.testing.assert_allclose(res['p1'], exato['p1'], atol=1e-4)
+
+
+def test_simulate_pi_rigido_com_radau(liu_params):
+    """Ganhos PI elevados: Euler no passo dos dados diverge, Radau não"""
+    model = LiuNigg4MassModel(**liu_params)
+    time = np.arange(151) / 150
+    p_ref = 0.01 * np.sin(2 * np.pi * 3 * time)[:, None] * np.ones(4)
+    Kp = [1e6, 5e5, 5e5, 5e5]
+    Ki = [5e5, 5e4, 5e4, 5e4]
+
+    with np.errstate(all='ignore'):
+        euler = model.simulate_pi(time, p_ref, Kp, Ki, method='euler')
+    radau = model.simulate_pi(time, p_ref, Kp, Ki, method='radau')
+
+    assert not np.all(np.abs(euler['p1']) < 1.0)
+    assert radau['stats']['success']
+    assert radau['stats']['njev'] == 0  # Jacobiano constante fornecido
+    np.testing.assert_allclose(radau['p1'], p_ref[:, 0], atol=2e-3)
+    assert set(['F1', 'F2', 'F3', 'F4']) <= set(radau)
+
+
+def test_simulate_msd_rk4(model):
+    """RK4 no modelo de 2 graus de liberdade coincide com o passo exato"""
+    rk4 = model.simulate(2.0, 1e-3, 0.864, 0.0, 0.456, 0.0, method='rk4')
+    exato = model.simulate(2.0, 1e-3, 0.864, 0.0, 0.456, 0.0, method='exact')
+    np.testing.assert_allclose(rk4['x1'], exato['x1'], rtol=1e-9)
+    assert rk4['stats']['nfev'] == 4 * rk4['stats']['n_steps']
+
+
+@pytest.mark.parametrize('method', ['euler', 'rk4', 'exact', 'radau'])
+def test_simulate_pi_verificacao_em_blocos_igual(liu_params, method):
+    """Integrar em blocos com verificações não altera a trajetória"""
+    model = LiuNigg4MassModel(**liu_params)
+    time = np.arange(1501) / 1500
+    p_ref = 0.01 * np.sin(2 * np.pi * 3 * time)[:, None] * np.ones(4)
+    Kp, Ki = [1e5, 5e4, 5e4, 5e4], [5e4, 5e3, 5e3, 5e3]
+    steps = []
+
+    inteiro = model.simulate_pi(time, p_ref, Kp, Ki, method=method)
+    blocos = model.simulate_pi(time, p_ref, Kp, Ki, method=method, check_every=100,
+                               limit=10.0, callback=lambda i, z: steps.append(i))
+
+    np.testing.assert_allclose(blocos['p1'], inteiro['p1'], rtol=1e-9, atol=1e-12)
+    assert blocos['stats']['success']
+    assert steps[-1] == len(time) - 1
+    if method != 'radau':
+        assert steps[:3] == [100, 200, 300]
+
+
+def test_simulate_pi_para_ao_divergir(liu_params):
+    """Euler instável para no primeiro bloco em que |z| passa do limite"""
+    model = LiuNigg4MassModel(**liu_params)
+    time = np.arange(1501) / 150
+    p_ref = np.zeros((len(time), 4))
+    z0 = [0.01, 0, 0, 0, 0, 0, 0, 0]
+
+    res = model.simulate_pi(time, p_ref, [1e6] * 4, [5e5] * 4, z0=z0, method='euler',
+                            check_every=10, limit=1.0)
+
+    stats = res['stats']
+    assert not stats['success'] and 'divergiu' in stats['message']
+    assert stats['n_steps'] < 100
+    assert np.all(np.isnan(res['p1'][stats['n_steps'] + 1:]))
+
+
+def test_simulate_pi_callback_interrompe(liu_params):
+    """Callback que retorna True interrompe a integração"""
+    model = LiuNigg4MassModel(**liu_params)
+    time = np.arange(301) / 150
+    p_ref = np.zeros((len(time), 4))
+
+    res = model.simulate_pi(time, p_ref, [1e5] * 4, [5e3] * 4, method='exact',
+                            check_every=50, callback=lambda i, z: i >= 100)
+
+    assert res['stats']['n_steps'] == 100
+    assert res['stats']['message'] == 'interrompido pelo callback'
+
+
+@pytest.mark.parametrize('backend', ['numpy', 'python', 'auto'])
+def test_simulate_pi_segments_igual_segmentos_individuais(liu_params, backend):
+    """Cada segmento parte do estado medido e coincide com uma simulação isolada"""
+    model = LiuNigg4MassModel(**liu_params)
+    time = np.arange(600) / 150
+    p_ref = 0.01 * np.sin(2 * np.pi * 3 * time)[:, None] * np.arange(1, 5)
+    v_ref = np.gradient(p_ref, time, axis=0)
+    Kp, Ki = [1e5, 5e4, 5e4, 5e4], [5e4, 5e3, 5e3, 5e3]
+    starts = [120, 250, 251, 400]
+
+    res = model.simulate_pi_segments(time, p_ref, Kp, Ki, starts, v_ref=v_ref,
+                                     backend=backend)
+
+    bounds = res['stats']['segments']
+    np.testing.assert_array_equal(bounds[:, 0], [0, 120, 250, 251, 400])
+    for a, b in bounds:
+        if b - a < 2:
+            continue
+        sozinho = model.simulate_pi(time[a:b], p_ref[a:b], Kp, Ki, method='exact',
+                                    z0=np.concatenate([p_ref[a], v_ref[a]]))
+        np.testing.assert_allclose(res['p2'][a:b], sozinho['p2'], atol=1e-12)
+    assert res['p1'][251] == p_ref[251, 0]
+    assert res['stats']['n_steps'] == 600 - 5
+
+
+def test_simulate_pi_segments_um_segmento_igual_simulate_pi(liu_params):
+    """Sem pontos de corte o resultado é o da simulação contínua"""
+    model = LiuNigg4MassModel(**liu_params)
+    time = np.arange(1500) / 1500
+    p_ref = 0.01 * np.sin(2 * np.pi * 3 * time)[:, None] * np.ones(4)
+    Kp, Ki = [1e5, 5e4, 5e4, 5e4], [5e4, 5e3, 5e3, 5e3]
+
+    seg = model.simulate_pi_segments(time, p_ref, Kp, Ki, [], method='rk4', backend='numpy')
+    cont = model.simulate_pi(time, p_ref, Kp, Ki, method='rk4')
+
+    assert np.all(np.isfinite(cont['p3']))
+    np.testing.assert_allclose(seg['p3'], cont['p3'], rtol=1e-10, atol=1e-14)
+
+
+@pytest.mark.parametrize('method, backend, limit', [('euler', 'numpy', 1.0),
+                                                    ('euler', 'auto', 1.0),
+                                                    ('euler', 'auto', None),
+                                                    ('radau', 'auto', 0.005)])
+def test_simulate_pi_segments_para_ao_divergir(liu_params, method, backend, limit):
+    """Os segmentos param no primeiro bloco em que |z| passa do limite"""
+    model = LiuNigg4MassModel(**liu_params)
+    time = np.arange(1501) / 150
+    p_ref = np.full((len(time), 4), 0.01)
+    p_ref[:, 1:] = 0.0
+
+    with np.errstate(all='ignore'):
+        res = model.simulate_pi_segments(time, p_ref, [1e6] * 4, [5e5] * 4, [500, 1000],
+                                         method=method, backend=backend, check_every=10,
+                                         limit=limit)
+
+    stats = res['stats']
+    assert not stats['success'] and 'divergiu' in stats['message']
+    assert np.isnan(res['p1'][499]) and np.isnan(res['p1'][-1])
+
+
+def test_simulate_pi_segments_rejeita_callback(liu_params):
+    model = LiuNigg4MassModel(**liu_params)
+    time = np.arange(10) / 150
+    with pytest.raises(TypeError):
+        model.simulate_pi_segments(time, np.zeros((10, 4)), [1e5] * 4, [5e3] * 4, [5],
+                                   callback=lambda i, z: False)
+
+
+def test_simulate_pi_segments_adaptativo_em_processos(liu_params):
+    """Métodos adaptativos: pool de processos dá o mesmo resultado que em série"""
+    model = LiuNigg4MassModel(**liu_params)
+    time = np.arange(300) / 150
+    p_ref = 0.01 * np.sin(2 * np.pi * 3 * time)[:, None] * np.ones(4)
+    Kp, Ki = [1e5, 5e4, 5e4, 5e4], [5e4, 5e3, 5e3, 5e3]
+
+    serie = model.simulate_pi_segments(time, p_ref, Kp, Ki, [100, 200], method='radau')
+    pool = model.simulate_pi_segments(time, p_ref, Kp, Ki, [100, 200], method='radau', jobs=2)
+    exato = model.simulate_pi_segments(time, p_ref, Kp, Ki, [100, 200], method='exact')
+
+    assert serie['stats']['success'] and serie['stats']['nfev'] > 0
+    np.testing.assert_allclose(pool['p1'], serie['p1'])
+    np.testing.assert_allclose(serie['p1'], exato['p1'], atol=2e-3)
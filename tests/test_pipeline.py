@@ -0,0 +1,41 @@
+"""
+Testes para o pipeline em lote do RBDS
+"""
+
+import pytest
+
+from projeto_pesquisa_ebm import get_data_path
+from projeto_pesquisa_ebm.pipeline import discover_trials, run_pipeline
+
+
+def test_discover_trials(tmp_path):
+    """Encontra pares markers/forces pelo padrão de nomes do RBDS"""
+    for name in ['RBDS001runT25markers.txt', 'RBDS001runT25forces.txt',
+                 'RBDS001runT35markers.txt', 'RBDS001static.txt',
+                 'RBDS010runT45markers.txt', 'RBDS010runT45forces.txt', 'outro.txt']:
+        (tmp_path / name).write_text('Time\n')
+
+    trials = discover_trials(tmp_path)
+
+    assert [(t['subject'], t['speed']) for t in trials] == [(1, 25), (10, 45)]
+    assert trials[0]['static'].name == 'RBDS001static.txt'
+    assert trials[1]['static'] is None
+
+
+@pytest.mark.parametrize('fit', ['sequential', 'joint', 'spectral'])
+def test_run_pipeline_rbds(tmp_path, monkeypatch, fit):
+    """Processa um ensaio real e grava a tabela de resultados"""
+    monkeypatch.setenv('PROJETO_PESQUISA_EBM_CACHE', str(tmp_path / 'cache'))
+    data_dir = get_data_path('')
+    if not (data_dir / 'RBDS008runT35markers.txt').exists():
+        pytest.skip("Dados RBDS não disponíveis")
+    output = tmp_path / 'resultados.csv'
+
+    results = run_pipeline(data_dir, output, jobs=1, subjects=[8], fit=fit)
+
+    assert output.exists()
+    assert len(results) == 1
+    row = results.iloc[0]
+    assert row['error'] == ''
+    assert row['speed'] == 35
+    assert row['k1'] > 0 and row['rmse_p1'] >= 0
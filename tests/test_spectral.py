@@ -0,0 +1,69 @@
+"""
+Testes para a análise espectral em lote
+"""
+
+import numpy as np
+import pytest
+from scipy import signal
+
+from projeto_pesquisa_ebm.spectral import (band_power, coherence, cross_spectral_matrix,
+                                           welch_plan, welch_psd)
+
+
+RATE = 150.0
+
+
+@pytest.fixture
+def channels():
+    rng = np.random.default_rng(0)
+    t = np.arange(3000) / RATE
+    common = np.sin(2 * np.pi * 15 * t)
+    return np.column_stack([common + 0.1 * rng.normal(size=len(t)),
+                            0.5 * common + 0.1 * rng.normal(size=len(t)),
+                            np.sin(2 * np.pi * 4 * t) + rng.normal(size=len(t))])
+
+
+def test_psd_csd_coerencia_iguais_scipy(channels):
+    freqs, psd = welch_psd(channels, RATE)
+    f_ref, psd_ref = signal.welch(channels, RATE, nperseg=256, axis=0)
+    np.testing.assert_allclose(freqs, f_ref)
+    np.testing.assert_allclose(psd, psd_ref, rtol=1e-10, atol=1e-16)
+
+    _, S = cross_spectral_matrix(channels, RATE)
+    assert S.shape == (len(freqs), 3, 3)
+    np.testing.assert_allclose(np.real(np.diagonal(S, axis1=1, axis2=2)), psd, rtol=1e-10)
+    _, csd_ref = signal.csd(channels[:, 0], channels[:, 2], RATE, nperseg=256)
+    np.testing.assert_allclose(S[:, 0, 2], csd_ref, rtol=1e-10, atol=1e-16)
+    _, coh_ref = signal.coherence(channels[:, 0], channels[:, 1], RATE, nperseg=256)
+    np.testing.assert_allclose(coherence(S)[:, 0, 1], coh_ref, rtol=1e-8)
+
+
+def test_lote_de_ensaios(channels):
+    """Vários ensaios empilhados: mesmo resultado que um por vez"""
+    trials = np.stack([channels, 2 * channels[::-1]])
+    freqs, psd = welch_psd(trials, RATE, nperseg=255, axis=1)
+    _, S = cross_spectral_matrix(trials, RATE, nperseg=255, axis=1)
+    for k in range(2):
+        np.testing.assert_allclose(psd[k], welch_psd(trials[k], RATE, nperseg=255)[1])
+        np.testing.assert_allclose(S[k], cross_spectral_matrix(trials[k], RATE, nperseg=255)[1])
+    assert welch_plan.cache_info().hits > 0
+
+
+def test_band_power(channels):
+    freqs, psd = welch_psd(channels, RATE)
+    bands = band_power(freqs, psd)
+    # Canais 0 e 1: senoide de 15 Hz (impacto); canal 2: 4 Hz (ativa)
+    assert bands['impact'][0] > 10 * bands['active'][0]
+    assert bands['active'][2] > bands['impact'][2]
+    # Potência total ~ variância do sinal (Parseval)
+    np.testing.assert_allclose(bands['total'], channels.var(axis=0), rtol=0.05)
+
+
+def test_noverlap_invalido(channels):
+    """noverlap fora de [0, nperseg) após limitar nperseg ao sinal gera ValueError"""
+    with pytest.raises(ValueError):
+        welch_psd(channels[:50], RATE, noverlap=128)
+    with pytest.raises(ValueError):
+        welch_psd(channels, RATE, noverlap=-1)
+    freqs, psd = welch_psd(channels[:50], RATE)
+    assert psd.shape == (26, channels.shape[1])
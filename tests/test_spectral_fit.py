@@ -0,0 +1,85 @@
+"""
+Testes para o ajuste dos parâmetros no domínio da frequência
+"""
+
+import numpy as np
+import pytest
+
+from projeto_pesquisa_ebm.identification import PARAMETER_NAMES, segment_masses
+from projeto_pesquisa_ebm.modal import mgrf_response, model_matrices
+from projeto_pesquisa_ebm.spectral_fit import (fit_spectral, measured_response,
+                                               spectral_cost, spectral_residuals)
+
+
+TRUE_PARAMS = {'k1': 5000.0, 'k2': 6000.0, 'k3': 9000.0, 'k4': 9000.0, 'k5': 17000.0,
+               'c1': 300.0, 'c2': 600.0, 'c4': 1800.0}
+MASSES = segment_masses(70)
+RATE = 150.0
+
+
+def simulated_trial(params, n=8192, seed=0):
+    """MGRF de banda larga e posições do modelo (positivas para cima) pela FFT"""
+    rng = np.random.default_rng(seed)
+    MGRF = rng.normal(scale=300.0, size=n)
+    freqs = np.fft.rfftfreq(n, 1.0 / RATE)
+    H = np.zeros((len(freqs), 4), dtype=complex)
+    H[1:] = mgrf_response(*model_matrices(params, MASSES), freqs[1:])[0]
+    p = np.fft.irfft(H * np.fft.rfft(MGRF)[:, None], n, axis=0)
+    kin = {'time': np.arange(n) / RATE}
+    kin.update({f'p{j + 1}': -p[:, j] for j in range(4)})
+    return kin, MGRF
+
+
+def test_measured_response_igual_ao_modelo():
+    """O estimador H1 reproduz a resposta do modelo onde a coerência é alta
+
+    Abaixo de ~5 Hz a posição de um corpo livre sob força branca vaza pela
+    janela e a coerência cai; o ajuste pondera essas frequências por ela.
+    """
+    kin, MGRF = simulated_trial(TRUE_PARAMS)
+    freqs, H, coh = measured_response(kin, MGRF, RATE, nperseg=512)
+    band = (freqs > 6) & (freqs < 20)
+    expected = mgrf_response(*model_matrices(TRUE_PARAMS, MASSES), freqs[band])[0]
+
+    assert coh[band].min() > 0.9
+    np.testing.assert_allclose(np.abs(H[band]), np.abs(expected), rtol=0.06)
+
+
+def test_residuos_em_lote_iguais_a_um_por_vez():
+    kin, MGRF = simulated_trial(TRUE_PARAMS, n=2048)
+    freqs, H, coh = measured_response(kin, MGRF, RATE)
+    freqs, H, weights = freqs[1:30], H[1:30], np.sqrt(coh[1:30])
+    rng = np.random.default_rng(1)
+    theta = np.array([TRUE_PARAMS[n] for n in PARAMETER_NAMES]) * rng.uniform(0.8, 1.2, (5, 8))
+
+    batch = spectral_residuals(theta, freqs, H, weights, MASSES)
+    for i in range(len(theta)):
+        np.testing.assert_allclose(batch[i], spectral_residuals(theta[i], freqs, H, weights,
+                                                                MASSES))
+    np.testing.assert_allclose(spectral_cost(theta, freqs, H, weights, MASSES),
+                               (batch**2).sum(axis=1))
+    assert batch.shape == (5, 2 * len(freqs) * 4)
+
+
+def test_custo_nulo_na_resposta_exata():
+    freqs = np.linspace(1, 20, 40)
+    H = mgrf_response(*model_matrices(TRUE_PARAMS, MASSES), freqs)[0]
+    theta = np.array([TRUE_PARAMS[n] for n in PARAMETER_NAMES])
+
+    assert spectral_cost(theta, freqs, H, np.ones_like(freqs)[:, None], MASSES) < 1e-20
+
+
+def test_fit_spectral_recupera_parametros():
+    """Sinais simulados: recupera os parâmetros (k4 + k5 somados) com multistart"""
+    kin, MGRF = simulated_trial(TRUE_PARAMS)
+
+    params, info = fit_spectral(kin, MGRF, MASSES, nperseg=512, n_candidates=500, seed=0,
+                                full_output=True)
+
+    for name in ('k1', 'k3', 'c1', 'c2', 'c4'):
+        assert params[name] == pytest.approx(TRUE_PARAMS[name], rel=0.05)
+    assert params['k2'] == pytest.approx(TRUE_PARAMS['k2'], rel=0.1)
+    assert params['k4'] + params['k5'] == pytest.approx(26000, rel=0.05)
+    assert info['freqs'].min() >= 1.0 and info['freqs'].max() < 20.0
+    assert info['H_model'].shape == info['H_measured'].shape == (len(info['freqs']), 4)
+    assert info['cost'] >= 0
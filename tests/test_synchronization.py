@@ -0,0 +1,91 @@
+"""
+Testes para a sincronização de canais com taxas diferentes
+"""
+
+import numpy as np
+import pytest
+
+from projeto_pesquisa_ebm import Trial
+from projeto_pesquisa_ebm.synchronization import (
+    common_time, resample, synchronize, synchronize_trial,
+)
+
+
+def test_common_time_overlap_and_union():
+    """Base comum cobre a interseção (ou a união) dos canais"""
+    channels = {'a': (np.zeros(301), 300), 'b': (np.zeros(101), 100, 0.5)}
+
+    overlap = common_time(channels, 100)
+    union = common_time(channels, 100, span='union')
+
+    assert overlap[0] == 0.5 and np.isclose(overlap[-1], 1.0) and len(overlap) == 51
+    assert union[0] == 0.0 and np.isclose(union[-1], 1.5)
+
+
+def test_upsampling_linear_and_cubic():
+    """Aumento de taxa recupera um sinal suave"""
+    t = np.arange(151) / 150
+    x = np.sin(2 * np.pi * 2 * t)
+    t_new = np.arange(301) / 300
+
+    linear = resample(x, 150, t_new)
+    cubic = resample(x, 150, t_new, method='cubic')
+
+    np.testing.assert_allclose(linear, np.sin(2 * np.pi * 2 * t_new), atol=2e-3)
+    np.testing.assert_allclose(cubic, np.sin(2 * np.pi * 2 * t_new), atol=1e-5)
+
+
+@pytest.mark.parametrize('decimation', ['polyphase', 'filter'])
+def test_decimation_removes_alias(decimation):
+    """Componente acima da nova Nyquist é atenuada; a baixa frequência fica"""
+    t = np.arange(3000) / 300
+    low = np.sin(2 * np.pi * 5 * t)
+    x = low + np.sin(2 * np.pi * 140 * t)  # 140 Hz vira 10 Hz sem filtro a 150 Hz
+    t_new = np.arange(1500) / 150
+
+    y = resample(x, 300, t_new, decimation=decimation)
+    alias = resample(x, 300, t_new, decimation=None)
+
+    inner = slice(50, -50)
+    expected = np.sin(2 * np.pi * 5 * t_new)
+    assert np.max(np.abs(y[inner] - expected[inner])) < 0.05
+    assert np.max(np.abs(alias[inner] - expected[inner])) > 0.5
+
+
+def test_offset_and_shapes():
+    """Deslocamento explícito e canais multidimensionais no mesmo chamado"""
+    markers = np.random.default_rng(0).normal(size=(150, 2, 3))
+    ramp = np.arange(300) / 300.0  # rampa = instante da amostra sem deslocamento
+
+    time, out = synchronize({'markers': (markers, 150), 'ramp': (ramp, 300, 0.1),
+                             'ramp2': (2 * ramp, 300, 0.1)})
+
+    assert time[0] == pytest.approx(0.1)
+    assert out['markers'].shape == (len(time), 2, 3)
+    np.testing.assert_allclose(out['markers'], markers[15:15 + len(time)], atol=1e-12)
+    inner = slice(10, -10)
+    np.testing.assert_allclose(out['ramp'][inner], (time - 0.1)[inner], atol=1e-6)
+    np.testing.assert_allclose(out['ramp2'], 2 * out['ramp'])
+
+
+def test_invalid_options():
+    with pytest.raises(ValueError):
+        resample(np.zeros(10), 100, np.arange(5) / 100, method='quadratic')
+    with pytest.raises(ValueError):
+        synchronize({'a': (np.zeros(10), 100), 'b': (np.zeros(10), 100, 5.0)})
+
+
+def test_synchronize_trial():
+    """Ensaio com marcadores a 150 Hz e forças a 300 Hz alinhados em uma chamada"""
+    n = 300
+    time = np.arange(n) / 150
+    markers = np.repeat(time[:, None, None], 3, axis=2) * np.ones((1, 2, 1))
+    force_time = np.arange(2 * n) / 300
+    forces = np.column_stack([np.sin(2 * np.pi * force_time), np.cos(2 * np.pi * force_time)])
+    trial = Trial(markers, ['A', 'B'], time, forces=forces, force_channels=['Fx', 'Fy'],
+                  force_rate=300)
+
+    t, m, f = synchronize_trial(trial)
+
+    assert len(t) == n and m.shape == (n, 2, 3) and f.shape == (n, 2)
+    np.testing.assert_allclose(f[10:-10, 1], np.cos(2 * np.pi * t[10:-10]), atol=1e-3)
@@ -0,0 +1,58 @@
+"""
+Testes para a estrutura Trial
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from projeto_pesquisa_ebm import Trial, get_data_path
+
+
+@pytest.fixture
+def dataframes():
+    n = 20
+    rng = np.random.default_rng(1)
+    markers = {'Time': np.arange(n) / 150}
+    for m in ['R.MT1', 'R.Iliac.Crest']:
+        for a in 'XYZ':
+            markers[f'{m}{a}'] = rng.normal(size=n)
+    forces = pd.DataFrame({'Time': np.arange(1, 2 * n + 1), 'Fx': rng.normal(size=2 * n),
+                           'Fy': rng.normal(size=2 * n)})
+    return pd.DataFrame(markers), forces
+
+
+def test_trial_from_dataframes(dataframes):
+    """Marcadores em array (n_frames, n_markers, 3) com mapa de nomes"""
+    markers_df, forces_df = dataframes
+    trial = Trial.from_dataframes(markers_df, forces_df, metadata={'Mass': 80.0})
+
+    assert trial.markers.shape == (20, 2, 3)
+    assert trial.marker_names == ['R.MT1', 'R.Iliac.Crest']
+    assert trial.sampling_rate == 150.0
+    np.testing.assert_array_equal(trial.marker('R.Iliac.Crest'),
+                                  markers_df[['R.Iliac.CrestX', 'R.Iliac.CrestY',
+                                              'R.Iliac.CrestZ']].values)
+    np.testing.assert_array_equal(trial.force('Fy'), forces_df['Fy'].values)
+    np.testing.assert_allclose(trial.force_time[:2], [0.0, 1 / 300])
+    assert trial.metadata['Mass'] == 80.0
+
+
+def test_trial_eixo_vertical_sem_copia(dataframes):
+    """Eixo vertical de um marcador é uma view do array de marcadores"""
+    trial = Trial.from_dataframes(*dataframes)
+    y = trial.position('R.MT1')
+    assert np.shares_memory(y, trial.markers)
+    np.testing.assert_array_equal(y, dataframes[0]['R.MT1Y'].values)
+    np.testing.assert_allclose(trial.position('R.MT1', scale=1e-3), y / 1000)
+
+
+def test_trial_from_files_rbds():
+    """Carrega um ensaio real do RBDS"""
+    path = get_data_path('RBDS002runT25markers.txt')
+    if not path.exists():
+        pytest.skip("Dados RBDS não disponíveis")
+    trial = Trial.from_files(path, get_data_path('RBDS002runT25forces.txt'), cache=False)
+    assert trial.name == 'RBDS002runT25'
+    assert trial.sampling_rate == 150.0
+    assert trial.forces.shape[0] == 2 * trial.n_frames
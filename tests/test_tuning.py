@@ -0,0 +1,104 @@
+"""
+Testes para o ajuste dos ganhos PI com Optuna
+"""
+
+import numpy as np
+import optuna
+import pytest
+
+from projeto_pesquisa_ebm.experiment import PreparedExperiment
+from projeto_pesquisa_ebm.models import LiuNigg4MassModel
+from projeto_pesquisa_ebm.tuning import FAILED_VALUE, PIObjective, run_study
+
+
+def quadratic(trial):
+    x = trial.suggest_float('x', -10, 10)
+    return (x - 2)**2
+
+
+def make_objective(oversample=1, **kwargs):
+    model = LiuNigg4MassModel(1.2, 3.7, 8.0, 11.4, 6000, 6000, 10000, 10000, 18000,
+                              300, 650, 1900)
+    time = np.arange(300) / 150
+    p_ref = 0.01 * np.sin(2 * np.pi * 3 * time)[:, None] * np.ones(4)
+    return PIObjective(model, PreparedExperiment(time, p_ref, oversample=oversample), **kwargs)
+
+
+def test_objective_finite_for_stable_gains():
+    """Ganhos moderados dão um erro finito e pequeno"""
+    objective = make_objective()
+    value = objective.simulate([1e5, 5e4, 5e4, 5e4], [5e4, 5e3, 5e3, 5e3])
+    assert 0 <= value < 1e-3
+
+
+def test_objective_oversample_euler():
+    """Euler com passo fino (como no notebook) se aproxima do método exato"""
+    Kp, Ki = [1e5, 5e4, 5e4, 5e4], [5e4, 5e3, 5e3, 5e3]
+    exact = make_objective().simulate(Kp, Ki)
+    euler = make_objective(method='euler', oversample=100).simulate(Kp, Ki)
+    assert np.isclose(euler, exact, rtol=0.2)
+
+
+def test_objective_diverging_returns_failed_value():
+    """Euler no passo dos marcadores diverge e é penalizado"""
+    objective = make_objective(method='euler')
+    assert objective.simulate([1e6] * 4, [5e5] * 4) == FAILED_VALUE
+
+
+def test_objective_screens_unstable_gains(monkeypatch):
+    """Ganhos instáveis são rejeitados pelos autovalores, sem simular"""
+    objective = make_objective()
+    Kp = np.array([[1e5, 5e4, 5e4, 5e4], [-1e5, 5e4, 5e4, 5e4]])
+    Ki = np.array([[5e4, 5e3, 5e3, 5e3], [5e4, 5e3, 5e3, 5e3]])
+    stable, max_real = objective.model.pi_stability(Kp, Ki)
+    np.testing.assert_array_equal(stable, [True, False])
+    assert max_real[1] > 0
+
+    values = objective.evaluate(Kp, Ki)
+    assert values[0] == objective.simulate(Kp[0], Ki[0]) and values[1] == FAILED_VALUE
+
+    monkeypatch.setattr(objective, '_simulate', lambda *args: pytest.fail('simulou'))
+    assert objective.simulate(Kp[1], Ki[1]) == FAILED_VALUE
+
+
+class PruneAlways:
+    """Trial falso que pede para interromper no primeiro relato"""
+
+    def __init__(self):
+        self.reports = []
+
+    def report(self, value, step):
+        self.reports.append((step, value))
+
+    def should_prune(self):
+        return True
+
+
+def test_objective_reports_and_prunes():
+    """Erro parcial é relatado durante a simulação e o trial é interrompido"""
+    objective = make_objective(check_interval=0.1)
+    trial = PruneAlways()
+
+    with pytest.raises(optuna.TrialPruned):
+        objective.simulate([1e5, 5e4, 5e4, 5e4], [5e4, 5e3, 5e3, 5e3], trial=trial)
+
+    assert len(trial.reports) == 1
+    assert trial.reports[0][0] == 15
+
+
+def test_run_study_parallel_and_resume(tmp_path):
+    """Processos compartilham o estudo e uma nova execução o estende"""
+    storage = tmp_path / 'estudo.log'
+
+    study = run_study(quadratic, storage, n_trials=8, jobs=2, n_startup_trials=4)
+    assert len(study.trials) == 8
+
+    study = run_study(quadratic, storage, n_trials=4, jobs=1)
+    assert len(study.trials) == 12
+    assert abs(study.best_params['x'] - 2) < 3
+
+
+def test_run_study_sqlite(tmp_path):
+    """Arquivos .db usam o armazenamento SQLite"""
+    study = run_study(quadratic, tmp_path / 'estudo.db', n_trials=3, jobs=1)
+    assert len(study.trials) == 3
@@ -0,0 +1,122 @@
+"""
+Testes para as funções utilitárias
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from projeto_pesquisa_ebm import load_markers_data, load_forces_data
+from projeto_pesquisa_ebm.utils import default_cache_dir
+
+
+@pytest.fixture
+def markers_file(tmp_path):
+    df = pd.DataFrame({
+        'Time': np.arange(10) / 150,
+        'R.MT1X': np.linspace(0, 1, 10),
+        'R.MT1Y': np.linspace(50, 60, 10),
+        'R.MT1Z': np.full(10, np.nan),
+    })
+    path = tmp_path / 'RBDS999runT25markers.txt'
+    df.to_csv(path, sep='\t', index=False)
+    return path
+
+
+def test_cache_binario_igual_texto(markers_file, tmp_path):
+    """Leitura pelo cache reproduz a leitura do texto"""
+    cache_dir = tmp_path / 'cache'
+    texto = load_markers_data(markers_file, cache=False)
+    primeira = load_markers_data(markers_file, cache_dir=cache_dir)
+    segunda = load_markers_data(markers_file, cache_dir=cache_dir)
+
+    assert len(list(cache_dir.glob('*.npy'))) == 1
+    pd.testing.assert_frame_equal(texto, primeira)
+    pd.testing.assert_frame_equal(texto, segunda)
+
+
+def test_cache_invalidado_quando_arquivo_muda(markers_file, tmp_path):
+    """Alterar o arquivo de texto gera uma nova entrada de cache"""
+    cache_dir = tmp_path / 'cache'
+    load_markers_data(markers_file, cache_dir=cache_dir)
+
+    df = pd.read_csv(markers_file, sep='\t')
+    df['R.MT1Y'] += 1.0
+    df.to_csv(markers_file, sep='\t', index=False)
+    st = os.stat(markers_file)
+    os.utime(markers_file, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+    novo = load_markers_data(markers_file, cache_dir=cache_dir)
+    np.testing.assert_allclose(novo['R.MT1Y'], df['R.MT1Y'])
+    assert len(list(cache_dir.glob('*.npy'))) == 1
+
+
+def test_cache_preserva_temporarios_de_outros_processos(markers_file, tmp_path):
+    """A limpeza das entradas antigas não apaga escritas em andamento"""
+    cache_dir = tmp_path / 'cache'
+    load_markers_data(markers_file, cache_dir=cache_dir)
+    entry = next(cache_dir.glob('*.npy'))
+    in_flight = entry.with_name(entry.stem.rsplit('-', 1)[0] + '-outra.99999.tmp.npy')
+    in_flight.write_bytes(b'')
+    st = os.stat(markers_file)
+    os.utime(markers_file, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+    load_markers_data(markers_file, cache_dir=cache_dir)
+
+    assert in_flight.exists()
+    assert not entry.exists()
+
+
+def test_cache_sem_permissao_de_escrita(markers_file, tmp_path):
+    """Sem poder gravar o cache, os dados lidos do texto são retornados"""
+    cache_dir = tmp_path / 'arquivo'
+    cache_dir.write_text('não é um diretório')
+
+    df = load_markers_data(markers_file, cache_dir=cache_dir)
+
+    pd.testing.assert_frame_equal(df, load_markers_data(markers_file, cache=False))
+
+
+def test_cache_preserva_colunas_inteiras(tmp_path):
+    """Coluna Time inteira dos arquivos de força mantém o tipo"""
+    path = tmp_path / 'RBDS999runT25forces.txt'
+    pd.DataFrame({'Time': np.arange(1, 6), 'Fy': np.linspace(0, 1500, 5)}).to_csv(
+        path, sep='\t', index=False)
+    load_forces_data(path, cache_dir=tmp_path)
+    df = load_forces_data(path, cache_dir=tmp_path)
+    assert df['Time'].dtype == np.int64
+
+
+def test_selecao_de_markers_e_eixos(markers_file, tmp_path):
+    """Seleção por markers/eixos e dtype, com e sem cache"""
+    sem_cache = load_markers_data(markers_file, markers=['R.MT1'], axes='Y',
+                                  dtype=np.float32, cache=False)
+    assert list(sem_cache.columns) == ['Time', 'R.MT1Y']
+    assert sem_cache['R.MT1Y'].dtype == np.float32
+    assert sem_cache['Time'].dtype == np.float64
+
+    cache_dir = tmp_path / 'cache'
+    load_markers_data(markers_file, cache_dir=cache_dir)
+    com_cache = load_markers_data(markers_file, markers=['R.MT1'], axes='Y',
+                                  dtype=np.float32, cache_dir=cache_dir)
+    pd.testing.assert_frame_equal(sem_cache, com_cache)
+
+
+def test_marker_inexistente(markers_file):
+    """Marker ausente no cabeçalho gera KeyError"""
+    with pytest.raises(KeyError):
+        load_markers_data(markers_file, markers=['L.MT1'], cache=False)
+
+
+def test_cache_padrao_fora_do_pacote(markers_file, tmp_path, monkeypatch):
+    """Sem cache_dir, o cache vai para o diretório do usuário ou da variável de ambiente"""
+    monkeypatch.delenv('PROJETO_PESQUISA_EBM_CACHE', raising=False)
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'xdg'))
+    assert default_cache_dir() == tmp_path / 'xdg' / 'projeto_pesquisa_ebm'
+
+    monkeypatch.setenv('PROJETO_PESQUISA_EBM_CACHE', str(tmp_path / 'env'))
+    load_markers_data(markers_file)
+    assert len(list((tmp_path / 'env').glob('*.npy'))) == 1
+    assert not (tmp_path / 'xdg').exists()